@@ -0,0 +1,72 @@
+"""
+Command line entry point.
+
+    python -m libansiscreen convert [options] FILE_OR_DIR...
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from .batch import AUTO_MODE, OUTPUT_MODES, ConvertResult, convert_batch
+from .parser.charsets import CODECS
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m libansiscreen")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    conv = sub.add_parser("convert", help="re-render ANSI files in parallel")
+    conv.add_argument("paths", nargs="+", help="ANSI files or directories")
+    conv.add_argument(
+        "-m", "--mode", dest="modes", action="append",
+        choices=OUTPUT_MODES + (AUTO_MODE,),
+        help="output mode (repeatable, default: modern; auto follows SAUCE)",
+    )
+    conv.add_argument("-o", "--out", default="out", help="output directory")
+    conv.add_argument("-j", "--jobs", type=int, default=None,
+                      help="worker processes (default: CPU count)")
+    conv.add_argument("-w", "--width", type=int, default=None,
+                      help="screen width (default: SAUCE width, else 80)")
+    conv.add_argument("-c", "--codec", default=None, choices=CODECS,
+                      help="input codec (default: cp437 for SAUCE art, else utf-8)")
+    conv.add_argument("-q", "--quiet", action="store_true",
+                      help="only print the summary")
+    return parser
+
+
+def _print_result(r: ConvertResult) -> None:
+    if r.ok:
+        print(
+            f"{r.seconds * 1000:8.1f} ms  {r.bytes_in:>9} -> {r.bytes_out:>9} B  "
+            f"[{r.mode}] {r.source}"
+        )
+    else:
+        print(f"  FAILED  [{r.mode}] {r.source}: {r.error}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+
+    if args.command == "convert":
+        try:
+            report = convert_batch(
+                args.paths,
+                args.out,
+                args.modes or ["modern"],
+                width=args.width,
+                codec=args.codec,
+                workers=args.jobs,
+                on_result=None if args.quiet else _print_result,
+            )
+        except ValueError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 2
+        print(report.summary())
+        return 1 if report.failed else 0
+
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+batch.py
+
+Parallel conversion of ANSI files: parse each file into a Screen and
+re-emit it with ANSIEmitter in one or more output modes.
+
+Files are fanned out over a ProcessPoolExecutor. Each worker maps its
+input, strips SAUCE metadata, parses in place and writes its own output
+file, so results stream to disk as they finish and only timing data
+returns to the parent process.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .parser.sauce import SauceRecord, load_ansi
+from .renderer.ansi_emitter import ANSIEmitter
+from .color.palette import create_ansi_16_palette, create_ansi_256_palette
+
+# ----------------------------------------------------------------------
+# Output modes
+# ----------------------------------------------------------------------
+
+OUTPUT_MODES = ("modern", "ansi256", "ansi16", "dos", "dos+ice")
+
+# "auto" picks dos / dos+ice from the file's SAUCE record, else modern
+AUTO_MODE = "auto"
+
+ANSI_SUFFIXES = (".ans", ".asc", ".diz", ".nfo")
+
+
+def make_emitter(mode: str, sauce: Optional[SauceRecord] = None) -> ANSIEmitter:
+    """
+    Build the ANSIEmitter for an output mode name.
+    """
+    if mode == AUTO_MODE:
+        return ANSIEmitter(**(sauce.emitter_options() if sauce else {}))
+    if mode == "modern":
+        return ANSIEmitter()
+    if mode == "ansi256":
+        return ANSIEmitter(palette=create_ansi_256_palette())
+    if mode == "ansi16":
+        return ANSIEmitter(palette=create_ansi_16_palette())
+    if mode == "dos":
+        return ANSIEmitter(dos_mode=True)
+    if mode == "dos+ice":
+        return ANSIEmitter(dos_mode=True, ice_mode=True)
+    raise ValueError(
+        f"Unknown output mode: {mode!r} "
+        f"(expected one of {', '.join(OUTPUT_MODES + (AUTO_MODE,))})"
+    )
+
+
+def output_path(source: Path, out_dir: Path, mode: str, root: Optional[Path] = None) -> Path:
+    """
+    Destination for `source` in `mode`: <out_dir>/<stem>.<mode>.ans, or
+    for a file found under directory `root`, the same name in the
+    matching subdirectory of out_dir.
+    """
+    if root is not None:
+        out_dir = out_dir / source.parent.relative_to(root)
+    return out_dir / f"{source.stem}.{mode.replace('+', '_')}.ans"
+
+
+# ----------------------------------------------------------------------
+# Results
+# ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ConvertResult:
+    source: Path
+    dest: Path
+    mode: str
+    bytes_in: int
+    bytes_out: int
+    seconds: float
+    error: Optional[str] = None
+    cpu_seconds: float = 0.0  # process CPU time, measured in the worker
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchReport:
+    results: List[ConvertResult] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def converted(self) -> int:
+        return sum(1 for r in self.results if r.ok)
+
+    @property
+    def failed(self) -> List[ConvertResult]:
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def bytes_in(self) -> int:
+        return sum(r.bytes_in for r in self.results if r.ok)
+
+    @property
+    def bytes_out(self) -> int:
+        return sum(r.bytes_out for r in self.results if r.ok)
+
+    @property
+    def cpu_seconds(self) -> float:
+        return sum(r.cpu_seconds for r in self.results)
+
+    def summary(self) -> str:
+        wall = self.wall_seconds or 1e-9
+        return (
+            f"{self.converted} converted, {len(self.failed)} failed, "
+            f"{self.bytes_in / 1024:.1f} KiB in -> {self.bytes_out / 1024:.1f} KiB out, "
+            f"{self.wall_seconds:.2f}s wall / {self.cpu_seconds:.2f}s cpu, "
+            f"{self.converted / wall:.1f} files/s, "
+            f"{self.bytes_in / wall / (1024 * 1024):.2f} MiB/s"
+        )
+
+
+# ----------------------------------------------------------------------
+# Single file
+# ----------------------------------------------------------------------
+
+def convert_file(
+    source,
+    dest,
+    mode: str = "modern",
+    *,
+    width: Optional[int] = None,
+    codec: Optional[str] = None,
+) -> ConvertResult:
+    """
+    Parse `source` and write it to `dest` in output mode `mode`.
+
+    Width and codec default to what the SAUCE record declares (see
+    load_ansi). The output is streamed in the emitter's codec: CP437
+    for the DOS modes, UTF-8 otherwise. Errors are reported in the result instead of raised, so
+    one bad file does not abort a batch.
+    """
+    source, dest = Path(source), Path(dest)
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        screen, sauce = load_ansi(source, width=width, codec=codec)
+        emitter = make_emitter(mode, sauce)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with open(dest, "wb") as f:
+            written = emitter.emit_to(f, screen)
+        return ConvertResult(
+            source, dest, mode,
+            source.stat().st_size, written,
+            time.perf_counter() - start,
+            cpu_seconds=time.process_time() - cpu_start,
+        )
+    except Exception as exc:
+        return ConvertResult(
+            source, dest, mode, 0, 0,
+            time.perf_counter() - start,
+            f"{type(exc).__name__}: {exc}",
+            cpu_seconds=time.process_time() - cpu_start,
+        )
+
+
+# ----------------------------------------------------------------------
+# Batch
+# ----------------------------------------------------------------------
+
+def iter_sources(paths: Iterable, suffixes: Sequence[str] = ANSI_SUFFIXES) -> Iterator[Path]:
+    """
+    Expand files and directories (recursively) into ANSI source files.
+    """
+    for path, _ in _walk_sources(paths, suffixes):
+        yield path
+
+
+def _walk_sources(paths: Iterable, suffixes: Sequence[str]) -> Iterator[Tuple[Path, Optional[Path]]]:
+    """iter_sources() as (file, directory it was found under or None)."""
+    for p in map(Path, paths):
+        if p.is_dir():
+            for child in sorted(p.rglob("*")):
+                if child.is_file() and child.suffix.lower() in suffixes:
+                    yield child, p
+        else:
+            yield p, None
+
+
+def convert_batch(
+    sources: Iterable,
+    out_dir,
+    modes: Sequence[str] = ("modern",),
+    *,
+    width: Optional[int] = None,
+    codec: Optional[str] = None,
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[ConvertResult], None]] = None,
+) -> BatchReport:
+    """
+    Convert every source file into every mode in `modes`.
+
+    Files found in directories keep their subdirectory under out_dir.
+    Raises ValueError before converting anything when two different
+    sources would be written to the same output file.
+
+    workers=None uses one process per CPU; workers=1 converts in the
+    calling process. `on_result` is called as each file finishes.
+    """
+    for mode in modes:
+        make_emitter(mode)  # fail fast on a bad mode name
+    out_dir = Path(out_dir)
+    jobs: List[Tuple[Path, Path, str]] = []
+    claimed: Dict[Path, Path] = {}
+    for src, root in _walk_sources(sources, ANSI_SUFFIXES):
+        for mode in modes:
+            dest = output_path(src, out_dir, mode, root)
+            other = claimed.get(dest)
+            if other is None:
+                claimed[dest] = src
+                jobs.append((src, dest, mode))
+            elif other != src:
+                raise ValueError(f"{src} and {other} would both be written to {dest}")
+            # else: the same file was listed twice
+
+    report = BatchReport()
+    start = time.perf_counter()
+
+    def done(result: ConvertResult) -> None:
+        report.results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        for src, dest, mode in jobs:
+            done(convert_file(src, dest, mode, width=width, codec=codec))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(convert_file, src, dest, mode, width=width, codec=codec)
+                for src, dest, mode in jobs
+            ]
+            for fut in as_completed(futures):
+                done(fut.result())
+
+    report.wall_seconds = time.perf_counter() - start
+    return report
@@ -103,3 +103,26 @@ class Cell:
             bg=self.bg,
             attrs=self.attrs,
         )
+
+
+class SharedCell(Cell):
+    """
+    Immutable Cell for values shared between many slots (flyweight).
+
+    Assigning to a field raises; copy() returns a regular, mutable Cell.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, char=None, fg=None, bg=DEFAULT_BG, attrs=0):
+        object.__setattr__(self, "char", char)
+        object.__setattr__(self, "fg", fg)
+        object.__setattr__(self, "bg", bg)
+        object.__setattr__(self, "attrs", attrs)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("shared cell is read-only; copy() it before changing it")
+
+
+# The default (blank) cell every unwritten slot refers to
+BLANK_CELL = SharedCell()
@@ -1,10 +1,21 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError
 import colorsys
-from typing import Tuple
+import weakref
+from typing import Dict, Tuple
+
+
+# Interned instances by packed 0xRRGGBB value. _LIVE holds every
+# color still in use (by a cell, a palette, a cache) weakly, so equal
+# live colors are always identical but colour-rich input does not keep
+# its colors alive after the screens that held them are gone. _INTERN
+# keeps the recently used ones alive and answers most lookups; it is
+# dropped when full.
+_LIVE: "weakref.WeakValueDictionary[int, Color]" = weakref.WeakValueDictionary()
+_INTERN: Dict[int, "Color"] = {}
+_INTERN_MAX = 1 << 12
 
 
-@dataclass(frozen=True, slots=True)
 class Color:
     """
     Immutable RGB color.
@@ -12,11 +23,34 @@ class Color:
     - Components are integers in range 0–255
     - Hashable and safe as dict keys
     - Value equality semantics
+
+    Colors are interned: Color(r, g, b) returns the shared instance for
+    that value, so equal colors are usually identical and comparisons
+    short-circuit on identity. `value` is the packed 0xRRGGBB int and
+    `lum` the precomputed luminance. Color.from_packed() skips
+    validation for trusted internal callers.
     """
 
-    r: int
-    g: int
-    b: int
+    __slots__ = ("r", "g", "b", "value", "lum", "__weakref__")
+
+    def __new__(cls, r: int, g: int, b: int) -> "Color":
+        if not (0 <= r <= 255):
+            raise ValueError(f"Invalid r value: {r}")
+        if not (0 <= g <= 255):
+            raise ValueError(f"Invalid g value: {g}")
+        if not (0 <= b <= 255):
+            raise ValueError(f"Invalid b value: {b}")
+        if type(r) is not int or type(g) is not int or type(b) is not int:
+            r, g, b = int(r), int(g), int(b)
+        value = (r << 16) | (g << 8) | b
+        color = _INTERN.get(value)
+        if color is None:
+            color = _intern(value)
+        return color
+
+    def __init__(self, r: int, g: int, b: int):
+        # All state is set once by _intern()
+        pass
 
     # ------------------------------------------------------------
     # Validation
@@ -25,6 +59,17 @@ class Color:
     def rgb(cls, r: int, g: int, b: int) -> "Color":
         return cls(r, g, b)
 
+    @staticmethod
+    def from_packed(value: int) -> "Color":
+        """
+        Color for a packed 0xRRGGBB int. Unchecked: the caller
+        guarantees 0 <= value <= 0xFFFFFF.
+        """
+        color = _INTERN.get(value)
+        if color is None:
+            color = _intern(value)
+        return color
+
     @classmethod
     def hsv(cls, h: float, s: float, v: float) -> "Color":
         if not (0.0 <= h <= 6.29 and 0.0 <= s <= 1.0 and 0.0 <= v <= 1.0):
@@ -36,43 +81,58 @@ class Color:
             int(round(bf * 255)),
         )
 
-    def __post_init__(self):
-        if not (0 <= self.r <= 255):
-            raise ValueError(f"Invalid r value: {self.r}")
-        if not (0 <= self.g <= 255):
-            raise ValueError(f"Invalid g value: {self.g}")
-        if not (0 <= self.b <= 255):
-            raise ValueError(f"Invalid b value: {self.b}")
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __reduce__(self):
+        # Unpickling goes through the constructor and so re-interns
+        return (Color, (self.r, self.g, self.b))
+
+    def __copy__(self) -> "Color":
+        return self
+
+    def __deepcopy__(self, memo) -> "Color":
+        return self
+
+    # ------------------------------------------------------------
+    # Comparison (None compares as black)
+    # ------------------------------------------------------------
 
     def __eq__(self, other: object) -> bool:
-        if other==None:
-            other=Color(0,0,0)
+        if other is self:
+            return True
+        if other is None:
+            return self.value == 0
         if not isinstance(other, Color):
             return NotImplemented
-        return (self.r == other.r
-            and self.g == other.g
-            and self.b == other.b)
+        return self.value == other.value
+
+    def __ne__(self, other: object) -> bool:
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __hash__(self) -> int:
+        return self.value
 
     def luminance(self):
-        return (
-            0.2126 * self.r +
-            0.7152 * self.g +
-            0.0722 * self.b
-        )
+        return self.lum
 
     def __gt__(self, other: object) -> bool:
-        if other==None:
-            other=Color(0,0,0)
+        if other is None:
+            return self.lum > 0.0
         if not isinstance(other, Color):
             return NotImplemented
-        return self.luminance()>other.luminance()
+        return self.lum > other.lum
 
     def __lt__(self, other: object) -> bool:
-        if other==None:
-            other=Color(0,0,0) 
+        if other is None:
+            return False
         if not isinstance(other, Color):
             return NotImplemented
-        return self.luminance()<other.luminance()
+        return self.lum < other.lum
 
     # ------------------------------------------------------------
     # Conversions
@@ -145,3 +205,22 @@ class Color:
 
     def __repr__(self) -> str:
         return f"Color(r={self.r}, g={self.g}, b={self.b})"
+
+
+def _intern(value: int) -> Color:
+    """The interned Color for a packed value, built on first use."""
+    color = _LIVE.get(value)
+    if color is None:
+        color = object.__new__(Color)
+        r, g, b = value >> 16, (value >> 8) & 0xFF, value & 0xFF
+        setattr_ = object.__setattr__
+        setattr_(color, "r", r)
+        setattr_(color, "g", g)
+        setattr_(color, "b", b)
+        setattr_(color, "value", value)
+        setattr_(color, "lum", 0.2126 * r + 0.7152 * g + 0.0722 * b)
+        _LIVE[value] = color
+    if len(_INTERN) >= _INTERN_MAX:
+        _INTERN.clear()
+    _INTERN[value] = color
+    return color
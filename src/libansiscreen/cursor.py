@@ -43,6 +43,18 @@ class Cursor:
         self.x = self._saved_x
         self.y = self._saved_y
 
+    # ------------------------------------------------------------------
+    # Scrolling
+    # ------------------------------------------------------------------
+
+    def scroll(self, n: int) -> None:
+        """
+        Follow content that moved up n rows (rows dropped off the top):
+        position and saved position, clamped to row 0.
+        """
+        self.y = max(0, self.y - n)
+        self._saved_y = max(0, self._saved_y - n)
+
     # ------------------------------------------------------------------
     # Reset
     # ------------------------------------------------------------------
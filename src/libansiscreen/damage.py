@@ -0,0 +1,48 @@
+# libansiscreen/damage.py
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Tuple
+
+
+@dataclass(frozen=True)
+class Damage:
+    """
+    What changed on a Screen between two take_damage() calls.
+
+    - rows:        y -> (x0, x1) half-open column span written on that row
+    - since:       screen generation at the previous take_damage()
+    - generation:  screen generation at this take_damage()
+    - height:      screen height now
+    - prev_height: screen height at the previous take_damage(); rows at
+                   or past it are new and count as dirty
+    - full:        every row changed (clear_screen / cls)
+
+    A Damage is falsy when nothing changed.
+    """
+
+    since: int
+    generation: int
+    height: int
+    prev_height: int
+    width: int
+    rows: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+    full: bool = False
+
+    def __bool__(self) -> bool:
+        return self.full or bool(self.rows) or self.height != self.prev_height
+
+    def is_dirty(self, y: int) -> bool:
+        return self.full or y >= self.prev_height or y in self.rows
+
+    def span(self, y: int) -> Tuple[int, int]:
+        """Dirty columns [x0, x1) of row y, (0, 0) when clean."""
+        if self.full or y >= self.prev_height:
+            return (0, self.width)
+        return self.rows.get(y, (0, 0))
+
+    def dirty_rows(self) -> Iterator[int]:
+        """Dirty row indices (below the current height), ascending."""
+        if self.full:
+            return iter(range(self.height))
+        old = sorted(y for y in self.rows if y < min(self.prev_height, self.height))
+        return iter(old + list(range(self.prev_height, self.height)))
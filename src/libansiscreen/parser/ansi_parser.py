@@ -1,30 +1,52 @@
 # libansiscreen/ansi/parser.py
 
-from typing import List
+import re
+from typing import Callable, List, Optional
 
 from ..screen import Screen
-from ..cell import (
-    ATTR_BOLD,
-    ATTR_FAINT,
-    ATTR_UNDERLINE,
-    ATTR_BLINK,
-    ATTR_INVERSE,
-    ATTR_CONCEAL,
-    ATTR_ITALIC,
-    ATTR_STRIKE,
-)
-from ..color.rgb import Color
-from ..color.palette import (
-    create_ansi_16_palette,
-    create_ansi_256_palette,
-)
+from .charsets import normalize_codec, run_decoder
+# ANSI16 / ANSI256 stay importable from here for existing callers
+from .sgr import ANSI16, ANSI256, DEFAULT_ENGINE, SGREngine, parse_params
 
-# ----------------------------------------------------------------------
-# Palettes (facts, not policy)
-# ----------------------------------------------------------------------
+# Characters / bytes that end a printable run in TEXT state
+_RUN_END = re.compile("[\x1b\r\n]")
+_RUN_END_BYTES = re.compile(b"[\x1b\r\n]")
+
+# Complete plain CSI sequence (numeric params only), parsed in one step
+_CSI_SEQ = re.compile("\x1b\\[([0-9;]*)([\x40-\x7e])")
+_CSI_SEQ_BYTES = re.compile(b"\x1b\\[([0-9;]*)([\x40-\x7e])")
+
+# Any other well-formed CSI: private marker (ESC[?25l), sub-parameters
+# or intermediate bytes. Recognized only to be skipped in one step.
+_CSI_OTHER = re.compile("\x1b\\[[\x30-\x3f]*[\x20-\x2f]*[\x40-\x7e]")
+_CSI_OTHER_BYTES = re.compile(b"\x1b\\[[\x30-\x3f]*[\x20-\x2f]*[\x40-\x7e]")
+
+# Control strings (OSC / DCS / APC / PM / SOS) end at ST (ESC \); OSC
+# may also end at BEL. Payloads are skipped by searching for the end.
+_STRING_INTRODUCERS = "]P_^X"
+_ST_SEARCH = re.compile("\x1b")
+_ST_SEARCH_BYTES = re.compile(b"\x1b")
+_OSC_END_SEARCH = re.compile("[\x07\x1b]")
+_OSC_END_SEARCH_BYTES = re.compile(b"[\x07\x1b]")
 
-ANSI16 = create_ansi_16_palette()
-ANSI256 = create_ansi_256_palette()
+# Largest REP (CSI n b) count honored, as in xterm
+_REP_MAX = 65535
+
+
+def _utf8_incomplete_tail(buf) -> int:
+    """
+    Number of trailing bytes of `buf` that start a UTF-8 sequence which
+    is not complete yet (0 if the run ends on a character boundary).
+    """
+    n = len(buf)
+    for k in range(1, min(3, n) + 1):
+        b = buf[n - k]
+        if b < 0x80:
+            return 0
+        if b >= 0xC0:
+            need = 2 if b < 0xE0 else 3 if b < 0xF0 else 4
+            return k if k < need else 0
+    return 0
 
 
 class ANSIParser:
@@ -32,28 +54,172 @@ class ANSIParser:
     Streaming ANSI parser that mutates a Screen.
 
     This is a document parser, not a terminal emulator.
+
+    `str` input is parsed as text. Bytes-like input (bytes, bytearray,
+    memoryview, mmap) is scanned directly at byte level and only the
+    plain-text runs are decoded, using `codec` ("utf-8", "cp437" or
+    "latin-1").
+
+    Parsing is resumable: feed() may be called with arbitrary chunks.
+    Escape / CSI state and a partial UTF-8 character at the end of a
+    chunk are carried over to the next call. flush() ends the stream.
+
+    Control strings (OSC titles and hyperlinks, DCS / sixel payloads,
+    APC, PM, SOS), private CSI sequences (ESC[?25l) and ESC sequences
+    with intermediates (ESC ( B) are consumed without touching the
+    screen; string payloads are skipped with a single search.
     """
 
     TEXT = 0
     ESC = 1
     CSI = 2
-
-    def __init__(self, screen: Screen):
+    ESC_INTERMEDIATE = 3  # ESC ( B and friends: wait for the final byte
+    STRING = 4            # inside OSC / DCS / APC / PM / SOS
+    STRING_ESC = 5        # ESC seen inside a string (ST or abort)
+
+    def __init__(
+        self,
+        screen: Screen,
+        codec: str = "utf-8",
+        sgr: Optional[SGREngine] = None,
+    ):
         self.screen = screen
+        self.codec = codec
+        # SGR transitions go through a (shared) cached engine
+        self.sgr = DEFAULT_ENGINE if sgr is None else sgr
         self.state = self.TEXT
         self.params: List[int] = []
         self.param_buf: str = ""
+        # CSI carries a private marker / intermediates: skip, don't dispatch
+        self._csi_ignored = False
+        # Current control string is an OSC (BEL also terminates it)
+        self._string_osc = False
+        # Leading bytes of a UTF-8 character split across feed() calls
+        self._pending: bytes = b""
+        # Last character written, repeated by REP (CSI n b)
+        self._last_char: Optional[str] = None
+
+    @property
+    def codec(self) -> str:
+        return self._codec
+
+    @codec.setter
+    def codec(self, codec: str) -> None:
+        self._codec = normalize_codec(codec)
+        self._decode = run_decoder(self._codec)
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
-    def feed(self, data, encoding='utf-8') -> None:
-        if isinstance(data, (bytes, bytearray)):
-            data = data.decode(encoding, errors="surrogateescape")
+    def feed(self, data, encoding: Optional[str] = None) -> None:
+        """
+        Parse one chunk of `data` into the screen.
+
+        `encoding` overrides the parser codec for this call only.
+        """
+        if isinstance(data, str):
+            self._flush_pending()
+            self._feed_text(data)
+            return
+        codec = self._codec if encoding is None else normalize_codec(encoding)
+        if isinstance(data, memoryview) and data.format != "B":
+            data = data.cast("B")
+        self._feed_bytes(data, run_decoder(codec), codec == "utf-8")
+
+    def flush(self) -> None:
+        """
+        End of stream: write out a dangling partial character and drop
+        any unterminated escape sequence.
+        """
+        self._flush_pending()
+        self.state = self.TEXT
+        self.params.clear()
+        self.param_buf = ""
+        self._csi_ignored = False
+
+    def _flush_pending(self) -> None:
+        if self._pending:
+            # Only the UTF-8 path leaves bytes pending
+            text = run_decoder("utf-8")(self._pending)
+            self.screen.put_run(text)
+            self._last_char = text[-1]
+            self._pending = b""
+
+    def _feed_text(self, data: str) -> None:
+        i = 0
+        n = len(data)
+        screen = self.screen
+        find_end = _RUN_END.search
+        match_csi = _CSI_SEQ.match
+        while i < n:
+            if self.state == self.TEXT:
+                # Hand whole printable runs to the screen in one call
+                m = find_end(data, i)
+                end = m.start() if m else n
+                if end > i:
+                    screen.put_run(data[i:end])
+                    self._last_char = data[end - 1]
+                    i = end
+                    continue
+                m = match_csi(data, i)
+                if m is not None:
+                    self._dispatch_csi_raw(m.group(1), m.group(2))
+                    i = m.end()
+                    continue
+                m = _CSI_OTHER.match(data, i)
+                if m is not None:
+                    i = m.end()
+                    continue
+            elif self.state == self.STRING:
+                i = self._skip_string(data, i, _OSC_END_SEARCH, _ST_SEARCH)
+                continue
+            self._process_char(data[i])
+            i += 1
 
-        for ch in data:
-            self._process_char(ch)
+    def _feed_bytes(self, data, decode: Callable[[bytes], str], utf8: bool) -> None:
+        i = 0
+        n = len(data)
+        screen = self.screen
+        find_end = _RUN_END_BYTES.search
+        match_csi = _CSI_SEQ_BYTES.match
+        while i < n:
+            if self.state == self.TEXT:
+                # Runs are decoded only when they land in the screen
+                m = find_end(data, i)
+                end = m.start() if m else n
+                if end > i:
+                    run = data[i:end]
+                    if self._pending:
+                        run = self._pending + bytes(run)
+                        self._pending = b""
+                    if end == n and utf8:
+                        k = _utf8_incomplete_tail(run)
+                        if k:
+                            self._pending = bytes(run[-k:])
+                            run = run[:-k]
+                    if run:
+                        text = decode(run)
+                        screen.put_run(text)
+                        self._last_char = text[-1]
+                    i = end
+                    continue
+                self._flush_pending()
+                m = match_csi(data, i)
+                if m is not None:
+                    self._dispatch_csi_raw(m.group(1), chr(m.group(2)[0]))
+                    i = m.end()
+                    continue
+                m = _CSI_OTHER_BYTES.match(data, i)
+                if m is not None:
+                    i = m.end()
+                    continue
+            elif self.state == self.STRING:
+                i = self._skip_string(data, i, _OSC_END_SEARCH_BYTES, _ST_SEARCH_BYTES)
+                continue
+            # Control / escape bytes are ASCII in every supported codec
+            self._process_char(chr(data[i]))
+            i += 1
 
     # ------------------------------------------------------------------
     # State machine
@@ -66,6 +232,10 @@ class ANSIParser:
             self._state_esc(ch)
         elif self.state == self.CSI:
             self._state_csi(ch)
+        elif self.state == self.ESC_INTERMEDIATE:
+            self._state_esc_intermediate(ch)
+        elif self.state == self.STRING_ESC:
+            self._state_string_esc(ch)
 
     # ------------------------------------------------------------------
     # TEXT
@@ -80,6 +250,7 @@ class ANSIParser:
             self.screen.carriage_return()
         else:
             self.screen.put_char(ch)
+            self._last_char = ch
 
     # ------------------------------------------------------------------
     # ESC
@@ -90,29 +261,78 @@ class ANSIParser:
             self.state = self.CSI
             self.params.clear()
             self.param_buf = ""
+            self._csi_ignored = False
         elif ch == "7":  # DECSC
             self.screen.cursor_save()
             self.state = self.TEXT
         elif ch == "8":  # DECRC
             self.screen.cursor_restore()
             self.state = self.TEXT
+        elif ch in _STRING_INTRODUCERS:
+            self.state = self.STRING
+            self._string_osc = ch == "]"
+        elif "\x20" <= ch <= "\x2f":
+            self.state = self.ESC_INTERMEDIATE
+        elif ch == "\x1b":
+            pass  # ESC ESC: the second one starts the sequence
         else:
             # Unsupported ESC sequence
             self.state = self.TEXT
 
+    def _state_esc_intermediate(self, ch: str) -> None:
+        # ESC <intermediates> <final>, e.g. charset designation ESC ( B
+        if ch == "\x1b":
+            self.state = self.ESC
+        elif not "\x20" <= ch <= "\x2f":
+            self.state = self.TEXT
+
+    # ------------------------------------------------------------------
+    # Control strings (OSC / DCS / APC / PM / SOS)
+    # ------------------------------------------------------------------
+
+    def _skip_string(self, data, i: int, osc_end, st_end) -> int:
+        """
+        Skip string payload from data[i] up to its terminator in one
+        search. Returns the index to resume at; an unterminated string
+        stays in STRING state for the next chunk.
+        """
+        m = (osc_end if self._string_osc else st_end).search(data, i)
+        if m is None:
+            return len(data)
+        if data[m.start()] in (0x07, "\x07"):
+            self.state = self.TEXT
+        else:
+            self.state = self.STRING_ESC
+        return m.end()
+
+    def _state_string_esc(self, ch: str) -> None:
+        if ch == "\\":  # ST
+            self.state = self.TEXT
+        else:
+            # ESC aborts the string and starts a new sequence
+            self.state = self.ESC
+            self._state_esc(ch)
+
     # ------------------------------------------------------------------
     # CSI
     # ------------------------------------------------------------------
 
     def _state_csi(self, ch: str) -> None:
-        if ch.isdigit():
+        if "0" <= ch <= "9":
             self.param_buf += ch
         elif ch == ";":
             self._flush_param()
-        else:
-            self._flush_param()
-            self._dispatch_csi(ch)
+        elif "\x40" <= ch <= "\x7e":
+            if not self._csi_ignored:
+                self._flush_param()
+                self._dispatch_csi(ch)
             self.state = self.TEXT
+        elif "\x20" <= ch <= "\x3f":
+            # Private marker, sub-parameter or intermediate byte
+            self._csi_ignored = True
+        elif ch == "\x1b":
+            # Sequence aborted by a new escape
+            self.state = self.ESC
 
     def _flush_param(self) -> None:
         if self.param_buf:
@@ -125,6 +345,24 @@ class ANSIParser:
     # CSI dispatch
     # ------------------------------------------------------------------
 
+    def _dispatch_csi_raw(self, raw, final: str) -> None:
+        """
+        Dispatch a complete CSI sequence matched in one piece.
+        `raw` is the parameter string (str or bytes).
+        """
+        if final == "m":
+            # Keyed on the raw parameter text: no int parsing on a hit
+            screen = self.screen
+            screen.set_graphics(*self.sgr.apply_raw(
+                screen.current_fg,
+                screen.current_bg,
+                screen.current_attrs,
+                raw,
+            ))
+            return
+        self.params = list(parse_params(raw))
+        self._dispatch_csi(final)
+
     def _dispatch_csi(self, final: str) -> None:
         p = self.params or [0]
 
@@ -149,11 +387,15 @@ class ANSIParser:
             if p[0] == 0:
                 self.screen.clear_to_end_of_screen()
             elif p[0] == 2:
-                self.screen.clear()
+                self.screen.clear_screen()
 
         elif final == "K":  # EL
             self.screen.clear_to_end_of_line()
 
+        elif final == "b":  # REP
+            if self._last_char is not None:
+                self.screen.put_run(self._last_char * min(p[0] or 1, _REP_MAX))
+
         elif final == "m":  # SGR
             self._handle_sgr(p)
 
@@ -162,125 +404,57 @@ class ANSIParser:
     # ------------------------------------------------------------------
 
     def _handle_sgr(self, params: List[int]) -> None:
-        if not params:
-            params = [0]
-
-        i = 0
-        while i < len(params):
-            code = params[i]
-
-            # ----------------------------
-            # Reset
-            # ----------------------------
-
-            if code == 0:
-                self.screen.reset_graphics()
-
-            # ----------------------------
-            # Attributes
-            # ----------------------------
-
-            elif code == 1:
-                self.screen.add_attrs(ATTR_BOLD)
-
-            elif code == 2:
-                self.screen.add_attrs(ATTR_FAINT)
-
-            elif code == 3:
-                self.screen.add_attrs(ATTR_ITALIC)
-
-            elif code == 4:
-                self.screen.add_attrs(ATTR_UNDERLINE)
-
-            elif code == 5:
-                self.screen.add_attrs(ATTR_BLINK)
-
-            elif code == 7:
-                self.screen.add_attrs(ATTR_INVERSE)
-
-            elif code == 8:
-                self.screen.add_attrs(ATTR_CONCEAL)
-
-            elif code == 9:
-                self.screen.add_attrs(ATTR_STRIKE)
-
-            elif code == 22:
-                self.screen.clear_attrs(ATTR_BOLD | ATTR_FAINT)
-
-            elif code == 23:
-                self.screen.clear_attrs(ATTR_ITALIC)
-
-            elif code == 24:
-                self.screen.clear_attrs(ATTR_UNDERLINE)
-
-            elif code == 25:
-                self.screen.clear_attrs(ATTR_BLINK)
-
-            elif code == 27:
-                self.screen.clear_attrs(ATTR_INVERSE)
+        screen = self.screen
+        screen.set_graphics(*self.sgr.apply(
+            screen.current_fg,
+            screen.current_bg,
+            screen.current_attrs,
+            tuple(params),
+        ))
 
-            elif code == 28:
-                self.screen.clear_attrs(ATTR_CONCEAL)
 
-            elif code == 29:
-                self.screen.clear_attrs(ATTR_STRIKE)
-
-            # ----------------------------
-            # ANSI16 colors
-            # ----------------------------
-
-            elif 30 <= code <= 37:
-                self.screen.set_foreground(ANSI16.index_to_rgb(code - 30))
-
-            elif 40 <= code <= 47:
-                self.screen.set_background(ANSI16.index_to_rgb(code - 40))
-
-            elif 90 <= code <= 97:
-                self.screen.set_foreground(
-                    ANSI16.index_to_rgb(code - 90 + 8)
-                )
-
-            elif 100 <= code <= 107:
-                self.screen.set_background(
-                    ANSI16.index_to_rgb(code - 100 + 8)
-                )
-
-            elif code == 39:
-                self.screen.set_foreground(ANSI16.index_to_rgb(7))
-
-            elif code == 49:
-                self.screen.set_background(ANSI16.index_to_rgb(0))
-
-            # ----------------------------
-            # ANSI256 colors
-            # ----------------------------
-
-            elif code == 38 and i + 2 < len(params) and params[i + 1] == 5:
-                idx = params[i + 2]
-                self.screen.set_foreground(ANSI256.index_to_rgb(idx))
-                i += 2
-
-            elif code == 48 and i + 2 < len(params) and params[i + 1] == 5:
-                idx = params[i + 2]
-                self.screen.set_background(ANSI256.index_to_rgb(idx))
-                i += 2
-
-            # ----------------------------
-            # Truecolor
-            # ----------------------------
-
-            elif code == 38 and i + 4 < len(params) and params[i + 1] == 2:
-                r, g, b = params[i + 2:i + 5]
-                self.screen.set_foreground(Color(r, g, b))
-                i += 4
-
-            elif code == 48 and i + 4 < len(params) and params[i + 1] == 2:
-                r, g, b = params[i + 2:i + 5]
-                self.screen.set_background(Color(r, g, b))
-                i += 4
+# ----------------------------------------------------------------------
+# Stream helper
+# ----------------------------------------------------------------------
 
-            # ----------------------------
-            # Unknown / ignored
-            # ----------------------------
+def parse_stream(
+    fileobj,
+    screen: Optional[Screen] = None,
+    *,
+    width: int = 80,
+    codec: Optional[str] = None,
+    chunk_size: int = 64 * 1024,
+) -> Screen:
+    """
+    Parse a file object into a Screen in fixed-size chunks.
 
-            i += 1
+    Binary files are read into one reused buffer, so parser memory stays
+    constant regardless of input size. Text files are read as str chunks.
+    The screen's persistent parser is used and flushed at the end.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be > 0")
+    if screen is None:
+        screen = Screen(width)
+    parser = screen.parser
+    if codec is not None:
+        parser.codec = codec
+
+    readinto = getattr(fileobj, "readinto", None)
+    if readinto is not None:
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
+        while True:
+            n = readinto(buf)
+            if not n:
+                break
+            parser.feed(view[:n])
+    else:
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+
+    parser.flush()
+    return screen
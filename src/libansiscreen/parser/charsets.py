@@ -0,0 +1,155 @@
+"""
+charsets.py
+
+Byte → text decoding for the byte-level parser.
+
+The parser never decodes its input up front. Plain-text runs are decoded
+one run at a time, right before they are written into the screen.
+Single-byte charsets map through a precomputed 256-entry table.
+
+The emitter uses the reverse direction: run_encoder() turns output text
+into bytes of a chosen codec, with a fallback for unmappable glyphs.
+"""
+
+import codecs
+from typing import Callable, Dict, Mapping, Optional
+
+# ----------------------------------------------------------------------
+# CP437 (IBM PC / DOS) decode table
+# ----------------------------------------------------------------------
+
+def _build_cp437_table() -> str:
+    """
+    256-entry decode table for CP437 art.
+
+    0x00–0x7E stay ASCII so control bytes keep their meaning, 0x7F is the
+    house glyph and 0x80–0xFF are the IBM PC box-drawing / accent glyphs.
+    """
+    high = bytes(range(0x80, 0x100)).decode("cp437")
+    return "".join(chr(i) for i in range(0x7F)) + "⌂" + high
+
+
+CP437_DECODE_TABLE: str = _build_cp437_table()
+
+# ----------------------------------------------------------------------
+# Codec selection
+# ----------------------------------------------------------------------
+
+CODECS = ("utf-8", "cp437", "latin-1")
+
+_ALIASES: Dict[str, str] = {
+    "utf-8": "utf-8",
+    "utf8": "utf-8",
+    "utf_8": "utf-8",
+    "cp437": "cp437",
+    "cp-437": "cp437",
+    "ibm437": "cp437",
+    "437": "cp437",
+    "latin-1": "latin-1",
+    "latin1": "latin-1",
+    "latin_1": "latin-1",
+    "iso-8859-1": "latin-1",
+    "iso8859-1": "latin-1",
+}
+
+
+def normalize_codec(name: str) -> str:
+    """
+    Return the canonical codec name, or raise ValueError.
+    """
+    codec = _ALIASES.get(name.lower().strip())
+    if codec is None:
+        raise ValueError(
+            f"Unsupported codec: {name!r} (expected one of {', '.join(CODECS)})"
+        )
+    return codec
+
+
+def _decode_utf8(buf) -> str:
+    return str(buf, "utf-8", "surrogateescape")
+
+
+def _decode_cp437(buf) -> str:
+    return codecs.charmap_decode(buf, "strict", CP437_DECODE_TABLE)[0]
+
+
+def _decode_latin1(buf) -> str:
+    return str(buf, "latin-1")
+
+
+_DECODERS: Dict[str, Callable[[bytes], str]] = {
+    "utf-8": _decode_utf8,
+    "cp437": _decode_cp437,
+    "latin-1": _decode_latin1,
+}
+
+
+def run_decoder(codec: str) -> Callable[[bytes], str]:
+    """
+    Return a function decoding one text run (any bytes-like object).
+    """
+    return _DECODERS[normalize_codec(codec)]
+
+
+# ----------------------------------------------------------------------
+# Encoding (emitter output)
+# ----------------------------------------------------------------------
+
+# Code point -> byte for CP437 output: the inverse of the decode table.
+# Control bytes stay ASCII so escape sequences pass through unchanged.
+CP437_ENCODE_MAP: Dict[int, int] = {ord(ch): i for i, ch in enumerate(CP437_DECODE_TABLE)}
+
+
+def run_encoder(
+    codec: str,
+    fallback: Optional[Mapping[str, str]] = None,
+    default: str = "?",
+) -> Callable[[str], bytes]:
+    """
+    Return a function encoding one chunk of output text (glyphs and
+    escape sequences) to `codec`.
+
+    Chunks are encoded in one pass (CP437 through CP437_ENCODE_MAP).
+    A chunk with a character the codec cannot represent is redone per
+    character: that character becomes fallback[char] if given and
+    encodable, else `default`. Per-character results are memoized.
+    """
+    codec = normalize_codec(codec)
+    fallback = dict(fallback or {})
+
+    if codec == "cp437":
+        table = CP437_ENCODE_MAP
+
+        def strict(text: str) -> bytes:
+            return codecs.charmap_encode(text, "strict", table)[0]
+    else:
+        errors = "surrogateescape" if codec == "utf-8" else "strict"
+
+        def strict(text: str) -> bytes:
+            return text.encode(codec, errors)
+
+    memo: Dict[str, bytes] = {}
+
+    def encode_char(ch: str) -> bytes:
+        data = memo.get(ch)
+        if data is None:
+            try:
+                data = strict(ch)
+            except UnicodeEncodeError:
+                data = strict(default)
+                replacement = fallback.get(ch)
+                if replacement is not None:
+                    try:
+                        data = strict(replacement)
+                    except UnicodeEncodeError:
+                        pass
+            memo[ch] = data
+        return data
+
+    def encode(text: str) -> bytes:
+        try:
+            return strict(text)
+        except UnicodeEncodeError:
+            return b"".join(map(encode_char, text))
+
+    return encode
@@ -0,0 +1,394 @@
+"""
+compiled.py
+
+Compiled ANSI: a compact op-stream intermediate representation.
+
+Parsing an ANSI file (scanning bytes, matching escapes, decoding text,
+resolving SGR) is done once. The parser drives an OpRecorder instead of
+a Screen and the result is a flat list of ops:
+
+    (PUT_RUN, text)        write decoded text at the cursor
+    (SGR, state_id)        switch to graphics state `state_id`
+    (NEWLINE,) (CR,) ...   cursor / line control
+    (GOTO, x, y)
+    (ERASE_EOL,) (ERASE_EOS,) (ERASE_ALL,)
+
+Graphics states are interned into a table of (fg, bg, attrs) with colors
+packed as 24-bit ints. Replaying the ops into any Screen produces the
+same cells as parsing the source, without re-tokenizing it.
+
+Programs serialize with marshal and can be cached on disk next to the
+source file (<file>.ansc), keyed by the source mtime/size and a content
+hash.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..screen import Screen
+from ..color.rgb import Color
+from .ansi_parser import ANSIParser
+from .sauce import split_sauce
+
+# ----------------------------------------------------------------------
+# Opcodes
+# ----------------------------------------------------------------------
+
+PUT_RUN = 0
+SGR = 1
+NEWLINE = 2
+CR = 3
+GOTO = 4
+UP = 5
+DOWN = 6
+FORWARD = 7
+BACK = 8
+SAVE = 9
+RESTORE = 10
+ERASE_EOL = 11
+ERASE_EOS = 12
+ERASE_ALL = 13
+
+# (fg, bg, attrs) with colors packed as 0xRRGGBB, None = inherit
+PackedState = Tuple[Optional[int], Optional[int], int]
+
+
+def _pack(color: Optional[Color]) -> Optional[int]:
+    if color is None:
+        return None
+    return color.value
+
+
+def _unpack(value: Optional[int]) -> Optional[Color]:
+    if value is None:
+        return None
+    return Color.from_packed(value)
+
+
+# ----------------------------------------------------------------------
+# Recording
+# ----------------------------------------------------------------------
+
+class OpRecorder:
+    """
+    Parser target that records screen operations instead of applying
+    them. Implements the subset of the Screen API used by ANSIParser.
+
+    SGR ops are emitted lazily, only before an op that paints cells, so
+    redundant state changes between two runs collapse into one. Adjacent
+    runs in the same state are merged.
+    """
+
+    def __init__(self, width: int = 80):
+        from ..screen import DEFAULT_FG, DEFAULT_BG
+
+        self.width = width
+        self.current_fg = DEFAULT_FG
+        self.current_bg = DEFAULT_BG
+        self.current_attrs = 0
+        self.ops: List[tuple] = []
+        self.states: List[PackedState] = []
+        self._state_ids: Dict[PackedState, int] = {}
+        self._emitted: Optional[PackedState] = None
+
+    # --------------------------------------------------------------
+    # Graphics state
+    # --------------------------------------------------------------
+
+    def set_graphics(self, fg, bg, attrs: int) -> None:
+        self.current_fg = fg
+        self.current_bg = bg
+        self.current_attrs = attrs
+
+    def _sync_state(self) -> None:
+        state = (_pack(self.current_fg), _pack(self.current_bg), self.current_attrs)
+        if state == self._emitted:
+            return
+        sid = self._state_ids.get(state)
+        if sid is None:
+            sid = self._state_ids[state] = len(self.states)
+            self.states.append(state)
+        self.ops.append((SGR, sid))
+        self._emitted = state
+
+    # --------------------------------------------------------------
+    # Painting ops
+    # --------------------------------------------------------------
+
+    def put_run(self, text: str) -> None:
+        if not text:
+            return
+        self._sync_state()
+        ops = self.ops
+        if ops[-1][0] == PUT_RUN:
+            ops[-1] = (PUT_RUN, ops[-1][1] + text)
+        else:
+            ops.append((PUT_RUN, text))
+
+    def put_char(self, char: str) -> None:
+        self.put_run(char)
+
+    def clear_to_end_of_line(self) -> None:
+        self._sync_state()
+        self.ops.append((ERASE_EOL,))
+
+    def clear_to_end_of_screen(self) -> None:
+        self._sync_state()
+        self.ops.append((ERASE_EOS,))
+
+    def clear_screen(self) -> None:
+        self.ops.append((ERASE_ALL,))
+
+    # --------------------------------------------------------------
+    # Cursor / line control
+    # --------------------------------------------------------------
+
+    def newline(self) -> None:
+        self.ops.append((NEWLINE,))
+
+    def carriage_return(self) -> None:
+        self.ops.append((CR,))
+
+    def cursor_goto(self, x: int, y: int) -> None:
+        self.ops.append((GOTO, x, y))
+
+    def cursor_up(self, n: int = 1) -> None:
+        self.ops.append((UP, n))
+
+    def cursor_down(self, n: int = 1) -> None:
+        self.ops.append((DOWN, n))
+
+    def cursor_forward(self, n: int = 1) -> None:
+        self.ops.append((FORWARD, n))
+
+    def cursor_back(self, n: int = 1) -> None:
+        self.ops.append((BACK, n))
+
+    def cursor_save(self) -> None:
+        self.ops.append((SAVE,))
+
+    def cursor_restore(self) -> None:
+        self.ops.append((RESTORE,))
+
+
+# ----------------------------------------------------------------------
+# Compiled program
+# ----------------------------------------------------------------------
+
+_FORMAT_VERSION = 1
+
+
+class CompiledANSI:
+    """
+    A parsed ANSI document as a replayable op list.
+
+    `width` / `height` are the screen size the document declares (SAUCE)
+    or was compiled for; height 0 means "grow as needed".
+    """
+
+    def __init__(
+        self,
+        ops: List[tuple],
+        states: List[PackedState],
+        *,
+        width: int = 80,
+        height: int = 0,
+    ):
+        self.ops = ops
+        self.states = states
+        self.width = width
+        self.height = height
+
+    # --------------------------------------------------------------
+    # Replay
+    # --------------------------------------------------------------
+
+    def replay(self, screen: Screen) -> Screen:
+        """
+        Apply the ops to `screen` (at its current cursor / state).
+        """
+        graphics = [(_unpack(fg), _unpack(bg), attrs) for fg, bg, attrs in self.states]
+
+        put_run = screen.put_run
+        set_graphics = screen.set_graphics
+        newline = screen.newline
+        generic = {
+            CR: screen.carriage_return,
+            GOTO: screen.cursor_goto,
+            UP: screen.cursor_up,
+            DOWN: screen.cursor_down,
+            FORWARD: screen.cursor_forward,
+            BACK: screen.cursor_back,
+            SAVE: screen.cursor_save,
+            RESTORE: screen.cursor_restore,
+            ERASE_EOL: screen.clear_to_end_of_line,
+            ERASE_EOS: screen.clear_to_end_of_screen,
+            ERASE_ALL: screen.clear_screen,
+        }
+
+        for op in self.ops:
+            code = op[0]
+            if code == PUT_RUN:
+                put_run(op[1])
+            elif code == SGR:
+                set_graphics(*graphics[op[1]])
+            elif code == NEWLINE:
+                newline()
+            else:
+                generic[code](*op[1:])
+        return screen
+
+    def to_screen(self, width: Optional[int] = None) -> Screen:
+        """
+        Replay into a new Screen of the declared (or given) width.
+        """
+        screen = Screen(width or self.width)
+        if self.height:
+            screen.ensure_height(self.height)
+        return self.replay(screen)
+
+    # --------------------------------------------------------------
+    # Serialization
+    # --------------------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        return marshal.dumps(
+            (_FORMAT_VERSION, self.width, self.height, self.states, self.ops)
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompiledANSI":
+        version, width, height, states, ops = marshal.loads(data)
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled ANSI version: {version}")
+        return cls(list(ops), list(states), width=width, height=height)
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def __repr__(self) -> str:
+        return (
+            f"<CompiledANSI ops={len(self.ops)} states={len(self.states)} "
+            f"width={self.width} height={self.height}>"
+        )
+
+
+# ----------------------------------------------------------------------
+# Compiling
+# ----------------------------------------------------------------------
+
+def compile_ansi(
+    data,
+    *,
+    width: Optional[int] = None,
+    codec: Optional[str] = None,
+) -> CompiledANSI:
+    """
+    Lower an ANSI document (str or bytes-like) into a CompiledANSI.
+
+    Bytes input has its SAUCE metadata stripped; width and codec default
+    to what the record declares, as in load_ansi().
+    """
+    height = 0
+    if isinstance(data, str):
+        recorder = OpRecorder(width or 80)
+        parser = ANSIParser(recorder, codec=codec or "utf-8")
+        parser.feed(data)
+    else:
+        end, record = split_sauce(data)
+        if record is not None:
+            height = record.height or 0
+        if width is None:
+            width = (record.width if record else None) or 80
+        if codec is None:
+            codec = "cp437" if record is not None and record.is_dos else "utf-8"
+        recorder = OpRecorder(width)
+        parser = ANSIParser(recorder, codec=codec)
+        with memoryview(data) as view:
+            parser.feed(view[:end])
+    parser.flush()
+    return CompiledANSI(recorder.ops, recorder.states, width=recorder.width, height=height)
+
+
+# ----------------------------------------------------------------------
+# On-disk cache
+# ----------------------------------------------------------------------
+
+CACHE_SUFFIX = ".ansc"
+
+_MAGIC = b"ANSC"
+# magic, mtime_ns, size, blake2b-128 digest of the source
+_HEADER = struct.Struct("<4sqq16s")
+
+
+def cache_path(source) -> Path:
+    source = Path(source)
+    return source.with_name(source.name + CACHE_SUFFIX)
+
+
+def _digest(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def load_compiled(
+    source,
+    *,
+    width: Optional[int] = None,
+    codec: Optional[str] = None,
+    use_cache: bool = True,
+) -> CompiledANSI:
+    """
+    Compile an ANSI file, reusing <file>.ansc when it is still valid.
+
+    The cache is valid when the source mtime and size match, or, if only
+    the mtime changed, when the content hash still matches. Otherwise
+    the file is recompiled and the cache rewritten. A cache that cannot
+    be written (read-only directory) is silently skipped.
+
+    Non-default width / codec bypass the cache.
+    """
+    source = Path(source)
+    data = source.read_bytes()
+    st = source.stat()
+    cacheable = use_cache and width is None and codec is None
+    cpath = cache_path(source)
+
+    digest = None
+    if cacheable:
+        try:
+            raw = cpath.read_bytes()
+        except OSError:
+            raw = b""
+        if len(raw) >= _HEADER.size:
+            magic, mtime_ns, size, cached_digest = _HEADER.unpack_from(raw)
+            if magic == _MAGIC and size == st.st_size:
+                valid = mtime_ns == st.st_mtime_ns
+                if not valid:
+                    digest = _digest(data)
+                    valid = digest == cached_digest
+                if valid:
+                    try:
+                        return CompiledANSI.from_bytes(raw[_HEADER.size:])
+                    except (ValueError, EOFError, TypeError):
+                        pass
+
+    program = compile_ansi(data, width=width, codec=codec)
+
+    if cacheable:
+        header = _HEADER.pack(_MAGIC, st.st_mtime_ns, st.st_size, digest or _digest(data))
+        tmp = cpath.with_name(cpath.name + f".{os.getpid()}.tmp")
+        try:
+            tmp.write_bytes(header + program.to_bytes())
+            os.replace(tmp, cpath)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+    return program
@@ -0,0 +1,308 @@
+"""
+index.py
+
+Checkpoint index for random-access viewports into large ANSI documents.
+
+Scrollers and log captures are thousands of lines long but are only
+ever shown a window at a time. ANSIIndex parses the document once
+without storing any cells, recording a checkpoint every `interval`
+bytes:
+
+    - byte offset of the segment
+    - cursor and saved cursor
+    - graphics state and the last character written (for REP)
+    - document height so far
+    - the range of rows the segment writes
+
+A viewport is materialized by replaying only the segments that write
+into it, each from its own checkpoint, through a ScreenWindow onto a
+window-sized Screen.
+Replay cost depends on the window and the checkpoint interval, not on
+the size of the document. Recent windows are kept in an LRU.
+"""
+
+from __future__ import annotations
+
+import mmap
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from ..color.rgb import Color
+from ..screen import Screen
+from ..screen_ops.window import ScreenWindow
+from .ansi_parser import ANSIParser
+from .sauce import SauceRecord, split_sauce
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """
+    Parser / screen state at the start of one segment of the document,
+    plus the rows that segment writes (first_row > last_row: none).
+    """
+    offset: int
+    end: int
+    x: int
+    y: int
+    saved_x: int
+    saved_y: int
+    fg: Color
+    bg: Color
+    attrs: int
+    lines: int
+    first_row: int
+    last_row: int
+    clears: bool  # segment contains ED 2 (erases every row)
+    last_char: Optional[str] = None  # repeated by a REP at segment start
+
+    def touches(self, top: int, bottom: int) -> bool:
+        return self.first_row < bottom and self.last_row >= top
+
+
+# ----------------------------------------------------------------------
+# Indexing target
+# ----------------------------------------------------------------------
+
+class _RowTracker(Screen):
+    """
+    Screen that keeps cursor / graphics semantics but stores no rows.
+
+    Cursor motion is inherited from Screen unchanged; only the document
+    height and the range of rows written are tracked.
+    """
+
+    def __init__(self, width: int):
+        super().__init__(width)
+        self.lines = 0
+        self.first_row = 1 << 62
+        self.last_row = -1
+        self.clears = False
+
+    @property
+    def height(self) -> int:
+        return self.lines
+
+    def _ensure_row(self, y: int) -> None:
+        if y >= self.lines:
+            self.lines = y + 1
+
+    def _touch(self, first: int, last: int) -> None:
+        if first < self.first_row:
+            self.first_row = first
+        if last > self.last_row:
+            self.last_row = last
+
+    def put_char(self, char: str) -> None:
+        self._ensure_row(self.cursor.y)
+        self._touch(self.cursor.y, self.cursor.y)
+        self._advance_cursor()
+
+    def put_run(self, text: str) -> None:
+        if not text:
+            return
+        cursor = self.cursor
+        end = cursor.x + len(text)
+        self._touch(cursor.y, cursor.y + (end - 1) // self.width)
+        cursor.y += end // self.width
+        cursor.x = end % self.width
+        self._ensure_row(cursor.y)
+
+    def clear_to_end_of_line(self) -> None:
+        self._ensure_row(self.cursor.y)
+        self._touch(self.cursor.y, self.cursor.y)
+
+    def clear_to_end_of_screen(self) -> None:
+        self._ensure_row(self.cursor.y)
+        self._touch(self.cursor.y, self.lines - 1)
+
+    def clear_screen(self) -> None:
+        if self.lines:
+            self._touch(0, self.lines - 1)
+        self.clears = True
+
+
+# ----------------------------------------------------------------------
+# Index
+# ----------------------------------------------------------------------
+
+class ANSIIndex:
+    """
+    Random-access view of an ANSI document (path or bytes-like).
+
+    Width and codec default to the SAUCE record, as in load_ansi().
+    Use as a context manager (or call close()) when opened from a path,
+    since the file stays memory-mapped for replay.
+    """
+
+    def __init__(
+        self,
+        source,
+        *,
+        width: Optional[int] = None,
+        codec: Optional[str] = None,
+        interval: int = 4096,
+        cache_size: int = 8,
+    ):
+        if interval <= 0:
+            raise ValueError("Checkpoint interval must be > 0")
+        self._file = None
+        self._mmap = None
+        if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            data = source
+        else:
+            self._file = open(source, "rb")
+            try:
+                data = self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                data = b""
+
+        end, self.sauce = split_sauce(data)
+        record: Optional[SauceRecord] = self.sauce
+        if width is None:
+            width = (record.width if record else None) or 80
+        if codec is None:
+            codec = "cp437" if record is not None and record.is_dos else "utf-8"
+
+        self.width = width
+        self.codec = codec
+        self.interval = interval
+        self.cache_size = cache_size
+        self._data = memoryview(data)
+        self._view = self._data[:end]
+        self._cache: "OrderedDict[Tuple[int, int], Screen]" = OrderedDict()
+        self.checkpoints: List[Checkpoint] = []
+        self.height = 0
+        self._build()
+
+    # --------------------------------------------------------------
+    # Indexing
+    # --------------------------------------------------------------
+
+    def _build(self) -> None:
+        view = self._view
+        total = len(view)
+        tracker = _RowTracker(self.width)
+        parser = ANSIParser(tracker, codec=self.codec)
+
+        start = 0
+        state = self._snapshot(tracker)
+        last_char = None
+        for pos in range(0, total, self.interval):
+            if pos > start and parser.state == parser.TEXT and not parser._pending:
+                self._close_segment(tracker, start, pos, state, last_char)
+                start = pos
+                state = self._snapshot(tracker)
+                last_char = parser._last_char
+            parser.feed(view[pos:pos + self.interval])
+        parser.flush()
+        if total > start or not self.checkpoints:
+            self._close_segment(tracker, start, total, state, last_char)
+        self.height = tracker.lines
+
+    @staticmethod
+    def _snapshot(t: _RowTracker) -> tuple:
+        c = t.cursor
+        return (c.x, c.y, c._saved_x, c._saved_y,
+                t.current_fg, t.current_bg, t.current_attrs, t.lines)
+
+    def _close_segment(
+        self,
+        tracker: _RowTracker,
+        start: int,
+        end: int,
+        state: tuple,
+        last_char: Optional[str],
+    ) -> None:
+        self.checkpoints.append(
+            Checkpoint(start, end, *state,
+                       tracker.first_row, tracker.last_row, tracker.clears, last_char)
+        )
+        tracker.first_row = 1 << 62
+        tracker.last_row = -1
+        tracker.clears = False
+
+    # --------------------------------------------------------------
+    # Viewports
+    # --------------------------------------------------------------
+
+    def segments_for(self, top: int, height: int) -> List[Checkpoint]:
+        """
+        Checkpoints whose segments must be replayed to build rows
+        [top, top + height).
+        """
+        bottom = top + height
+        needed = [cp for cp in self.checkpoints if cp.touches(top, bottom)]
+        # Everything before the last full erase is wiped anyway
+        for i in range(len(needed) - 1, 0, -1):
+            if needed[i].clears:
+                return needed[i:]
+        return needed
+
+    def viewport(self, top: int, height: int = 25) -> Screen:
+        """
+        Materialize rows [top, top + height) as a Screen of that many
+        rows (fewer at the end of the document).
+
+        Windows are cached; treat the returned Screen as read-only.
+        """
+        top = max(0, top)
+        height = max(0, min(height, self.height - top))
+        key = (top, height)
+        window = self._cache.get(key)
+        if window is not None:
+            self._cache.move_to_end(key)
+            return window
+
+        window = Screen(self.width)
+        window.ensure_height(height)
+        for cp in self.segments_for(top, height):
+            self._replay(cp, window, top)
+
+        self._cache[key] = window
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return window
+
+    def _replay(self, cp: Checkpoint, window: Screen, top: int) -> None:
+        # Document rows [top, top + height) map onto window rows 0..
+        writer = ScreenWindow(window, 0, -top, self.width, top + window.height)
+        c = writer.cursor
+        c.x, c.y, c._saved_x, c._saved_y = cp.x, cp.y, cp.saved_x, cp.saved_y
+        writer.set_graphics(cp.fg, cp.bg, cp.attrs)
+        writer.lines = cp.lines
+        parser = ANSIParser(writer, codec=self.codec)
+        parser._last_char = cp.last_char
+        parser.feed(self._view[cp.offset:cp.end])
+        parser.flush()
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    # --------------------------------------------------------------
+    # Lifetime
+    # --------------------------------------------------------------
+
+    def close(self) -> None:
+        self._cache.clear()
+        self._view.release()
+        self._data.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "ANSIIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"<ANSIIndex width={self.width} height={self.height} "
+            f"checkpoints={len(self.checkpoints)}>"
+        )
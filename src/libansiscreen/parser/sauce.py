@@ -0,0 +1,235 @@
+"""
+sauce.py
+
+SAUCE (Standard Architecture for Universal Comment Extensions) metadata.
+
+Most ANSI art carries a 128-byte SAUCE record at the end of the file,
+optionally preceded by a COMNT comment block and a DOS EOF (0x1A). The
+record gives the intended width, height, font and iCE-color flag.
+
+load_ansi() reads a file once (memory-mapped when given a path), strips
+the metadata, preallocates the screen from the declared size and parses
+the payload in place.
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+import struct
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from ..screen import Screen
+from .charsets import run_decoder
+
+SAUCE_SIZE = 128
+COMMENT_LINE_SIZE = 64
+
+_SAUCE_ID = b"SAUCE"
+_COMMENT_ID = b"COMNT"
+_EOF = re.compile(b"\x1a")
+
+# id, version, title, author, group, date, filesize, datatype, filetype,
+# tinfo1-4, comments, tflags, tinfos
+_SAUCE_STRUCT = struct.Struct("<5s2s35s20s20s8sIBBHHHHBB22s")
+
+# DataType values
+DATATYPE_NONE = 0
+DATATYPE_CHARACTER = 1
+DATATYPE_BITMAP = 2
+DATATYPE_VECTOR = 3
+DATATYPE_AUDIO = 4
+DATATYPE_BINARYTEXT = 5
+DATATYPE_XBIN = 6
+
+# Character FileTypes whose TInfo1/TInfo2 are width/height
+_CHARACTER_SIZED = {0, 1, 2, 4, 5, 8}  # ASCII ANSi ANSiMation PCBoard Avatar TundraDraw
+
+# TFlags
+FLAG_ICE_COLORS = 0x01
+
+
+_decode_cp437 = run_decoder("cp437")
+
+
+def _text(raw: bytes) -> str:
+    """Decode a space / NUL padded CP437 field."""
+    return _decode_cp437(raw).rstrip(" \x00")
+
+
+@dataclass(frozen=True)
+class SauceRecord:
+    title: str
+    author: str
+    group: str
+    date: str
+    file_size: int
+    data_type: int
+    file_type: int
+    tinfo1: int
+    tinfo2: int
+    tinfo3: int
+    tinfo4: int
+    flags: int
+    font: str
+    comments: Tuple[str, ...] = ()
+
+    # --------------------------------------------------------------
+    # Derived properties
+    # --------------------------------------------------------------
+
+    @property
+    def width(self) -> Optional[int]:
+        """Declared width in character cells, if any."""
+        if self.data_type == DATATYPE_CHARACTER and self.file_type in _CHARACTER_SIZED:
+            return self.tinfo1 or None
+        if self.data_type == DATATYPE_BINARYTEXT:
+            return (self.file_type * 2) or None
+        if self.data_type == DATATYPE_XBIN:
+            return self.tinfo1 or None
+        return None
+
+    @property
+    def height(self) -> Optional[int]:
+        """Declared height in lines, if any."""
+        if self.data_type == DATATYPE_CHARACTER and self.file_type in _CHARACTER_SIZED:
+            return self.tinfo2 or None
+        if self.data_type == DATATYPE_XBIN:
+            return self.tinfo2 or None
+        return None
+
+    @property
+    def ice_colors(self) -> bool:
+        """True when the blink bit selects bright backgrounds (iCE)."""
+        return bool(self.flags & FLAG_ICE_COLORS)
+
+    @property
+    def is_dos(self) -> bool:
+        """Character / binary art meant for a DOS (CP437, 16-color) display."""
+        return self.data_type in (DATATYPE_CHARACTER, DATATYPE_BINARYTEXT, DATATYPE_XBIN)
+
+    def emitter_options(self) -> Dict[str, bool]:
+        """
+        ANSIEmitter keyword arguments matching the declared display.
+        """
+        if not self.is_dos:
+            return {}
+        return {"dos_mode": True, "ice_mode": self.ice_colors}
+
+
+# ----------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------
+
+def split_sauce(data) -> Tuple[int, Optional[SauceRecord]]:
+    """
+    Locate the SAUCE record in `data` (any bytes-like object or mmap).
+
+    Returns (payload_length, record). The payload is data[:payload_length]:
+    everything before the first DOS EOF (0x1A), the comment block and the
+    record. No bytes are copied except the metadata itself.
+    """
+    n = len(data)
+    record = None
+    end = n
+    if n >= SAUCE_SIZE and bytes(data[n - SAUCE_SIZE:n - SAUCE_SIZE + 5]) == _SAUCE_ID:
+        fields = _SAUCE_STRUCT.unpack(bytes(data[n - SAUCE_SIZE:n]))
+        (_, _, title, author, group, date, file_size, data_type, file_type,
+         t1, t2, t3, t4, n_comments, flags, font) = fields
+        end = n - SAUCE_SIZE
+
+        comments: Tuple[str, ...] = ()
+        block = 5 + n_comments * COMMENT_LINE_SIZE
+        if n_comments and end >= block:
+            start = end - block
+            if bytes(data[start:start + 5]) == _COMMENT_ID:
+                raw = bytes(data[start + 5:end])
+                comments = tuple(
+                    _text(raw[i:i + COMMENT_LINE_SIZE])
+                    for i in range(0, len(raw), COMMENT_LINE_SIZE)
+                )
+                end = start
+
+        record = SauceRecord(
+            title=_text(title),
+            author=_text(author),
+            group=_text(group),
+            date=_text(date),
+            file_size=file_size,
+            data_type=data_type,
+            file_type=file_type,
+            tinfo1=t1,
+            tinfo2=t2,
+            tinfo3=t3,
+            tinfo4=t4,
+            flags=flags,
+            font=font.split(b"\x00", 1)[0].decode("ascii", "replace").strip(),
+            comments=comments,
+        )
+
+    # Everything after the DOS EOF marker is metadata / padding
+    m = _EOF.search(data, 0, end)
+    if m is not None:
+        end = m.start()
+    return end, record
+
+
+def read_sauce(data) -> Optional[SauceRecord]:
+    """
+    Return the SAUCE record of `data`, or None.
+    """
+    return split_sauce(data)[1]
+
+
+# ----------------------------------------------------------------------
+# Loading
+# ----------------------------------------------------------------------
+
+def load_ansi(
+    source,
+    *,
+    width: Optional[int] = None,
+    codec: Optional[str] = None,
+) -> Tuple[Screen, Optional[SauceRecord]]:
+    """
+    Parse an ANSI file (path or bytes-like) into a new Screen.
+
+    - The SAUCE record / comments / EOF tail are stripped first.
+    - Width defaults to the SAUCE width, else 80.
+    - The declared height is preallocated in one bulk step.
+    - The codec defaults to cp437 for SAUCE art, else utf-8.
+
+    Pass record.emitter_options() to ANSIEmitter to re-emit the art with
+    the matching DOS / iCE settings.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        return _load(source, width, codec)
+    with open(source, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return _load(b"", width, codec)
+        with mm:
+            return _load(mm, width, codec)
+
+
+def _load(data, width: Optional[int], codec: Optional[str]):
+    end, record = split_sauce(data)
+
+    if width is None:
+        width = (record.width if record else None) or 80
+    if codec is None:
+        codec = "cp437" if record is not None and record.is_dos else "utf-8"
+
+    screen = Screen(width)
+    if record is not None and record.height:
+        screen.ensure_height(record.height)
+
+    parser = screen.parser
+    parser.codec = codec
+    with memoryview(data) as view:
+        parser.feed(view[:end])
+    parser.flush()
+    return screen, record
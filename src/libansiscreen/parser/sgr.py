@@ -0,0 +1,221 @@
+"""
+sgr.py
+
+Compiled SGR (Select Graphic Rendition) engine.
+
+SGR parameters are dispatched through a table keyed by code instead of
+an if/elif chain, with every palette color resolved once at import
+time. Whole transitions are cached: the key is the current graphics
+state plus the parameter tuple, the value is the resulting state. Real
+files reuse a few dozen distinct SGR lists, so a repeated
+ESC[1;33;44m becomes a single dictionary hit.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+from ..cell import (
+    ATTR_BOLD,
+    ATTR_FAINT,
+    ATTR_ITALIC,
+    ATTR_UNDERLINE,
+    ATTR_BLINK,
+    ATTR_INVERSE,
+    ATTR_CONCEAL,
+    ATTR_STRIKE,
+)
+from ..color.rgb import Color
+from ..color.palette import create_ansi_16_palette, create_ansi_256_palette
+
+ANSI16 = create_ansi_16_palette()
+ANSI256 = create_ansi_256_palette()
+
+DEFAULT_FG: Color = ANSI16.index_to_rgb(7)
+DEFAULT_BG: Color = ANSI16.index_to_rgb(0)
+
+# Graphics state: (fg, bg, attrs)
+GraphicsState = Tuple[Optional[Color], Optional[Color], int]
+
+# ----------------------------------------------------------------------
+# Dispatch table
+# ----------------------------------------------------------------------
+
+_RESET = 0
+_FG = 1
+_BG = 2
+_ATTR_ON = 3
+_ATTR_OFF = 4
+
+
+def _build_table() -> Dict[int, Tuple[int, object]]:
+    table: Dict[int, Tuple[int, object]] = {0: (_RESET, None)}
+
+    for code, attr in (
+        (1, ATTR_BOLD), (2, ATTR_FAINT), (3, ATTR_ITALIC),
+        (4, ATTR_UNDERLINE), (5, ATTR_BLINK), (7, ATTR_INVERSE),
+        (8, ATTR_CONCEAL), (9, ATTR_STRIKE),
+    ):
+        table[code] = (_ATTR_ON, attr)
+
+    for code, attr in (
+        (22, ATTR_BOLD | ATTR_FAINT), (23, ATTR_ITALIC),
+        (24, ATTR_UNDERLINE), (25, ATTR_BLINK), (27, ATTR_INVERSE),
+        (28, ATTR_CONCEAL), (29, ATTR_STRIKE),
+    ):
+        table[code] = (_ATTR_OFF, attr)
+
+    for i in range(8):
+        table[30 + i] = (_FG, ANSI16.index_to_rgb(i))
+        table[40 + i] = (_BG, ANSI16.index_to_rgb(i))
+        table[90 + i] = (_FG, ANSI16.index_to_rgb(i + 8))
+        table[100 + i] = (_BG, ANSI16.index_to_rgb(i + 8))
+
+    table[39] = (_FG, DEFAULT_FG)
+    table[49] = (_BG, DEFAULT_BG)
+    return table
+
+
+SGR_TABLE = _build_table()
+
+_ANSI256_COLORS = tuple(ANSI256.index_to_rgb(i) for i in range(256))
+
+
+def _extended_color(params: Sequence[int], i: int) -> Tuple[Optional[Color], int]:
+    """
+    Decode 38/48 extended color arguments starting at params[i].
+
+    Returns (color or None, number of extra params consumed). Malformed
+    or out-of-range arguments are consumed and ignored.
+    """
+    n = len(params)
+    if i + 1 >= n:
+        return None, 0
+    mode = params[i + 1]
+    if mode == 5:
+        if i + 2 >= n:
+            return None, 1
+        idx = params[i + 2]
+        return (_ANSI256_COLORS[idx] if idx < 256 else None), 2
+    if mode == 2:
+        if i + 4 >= n:
+            return None, n - i - 1
+        r, g, b = params[i + 2:i + 5]
+        if r > 255 or g > 255 or b > 255:
+            return None, 4
+        return Color(r, g, b), 4
+    return None, 1
+
+
+def parse_params(raw) -> Tuple[int, ...]:
+    """
+    Parse a raw CSI parameter string ("1;33;44", str or bytes).
+    Empty parameters count as 0.
+    """
+    sep = b";" if isinstance(raw, (bytes, bytearray)) else ";"
+    return tuple(int(p) if p else 0 for p in raw.split(sep))
+
+
+def apply_sgr(state: GraphicsState, params: Sequence[int]) -> GraphicsState:
+    """
+    Apply SGR parameters to a graphics state (uncached).
+    """
+    fg, bg, attrs = state
+    if not params:
+        params = (0,)
+    table = SGR_TABLE
+    i = 0
+    n = len(params)
+    while i < n:
+        code = params[i]
+        entry = table.get(code)
+        if entry is not None:
+            kind, value = entry
+            if kind == _FG:
+                fg = value
+            elif kind == _BG:
+                bg = value
+            elif kind == _ATTR_ON:
+                attrs |= value
+            elif kind == _ATTR_OFF:
+                attrs &= ~value
+            else:
+                fg, bg, attrs = DEFAULT_FG, DEFAULT_BG, 0
+        elif code == 38 or code == 48:
+            color, used = _extended_color(params, i)
+            if color is not None:
+                if code == 38:
+                    fg = color
+                else:
+                    bg = color
+            i += used
+        # Unknown codes are ignored
+        i += 1
+    return fg, bg, attrs
+
+
+# ----------------------------------------------------------------------
+# Cached engine
+# ----------------------------------------------------------------------
+
+class SGREngine:
+    """
+    Bounded cache of SGR transitions:
+    (fg, bg, attrs, params) -> (fg, bg, attrs).
+
+    `params` is either a tuple of ints (apply) or the raw parameter
+    text as matched by the parser (apply_raw). Colors are keyed by
+    identity (the table hands out the same Color objects every time),
+    and each entry keeps its colors alive to make the ids safe.
+
+    When full, the oldest entry is evicted.
+    """
+
+    CACHE_SIZE = 4096
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        if cache_size <= 0:
+            raise ValueError("cache_size must be > 0")
+        self.cache_size = cache_size
+        self._cache: Dict[tuple, Tuple[object, object, GraphicsState]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def apply(self, fg, bg, attrs: int, params: Tuple[int, ...]) -> GraphicsState:
+        key = (id(fg), id(bg), attrs, params)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] is fg and entry[1] is bg:
+            self.hits += 1
+            return entry[2]
+        return self._store(key, fg, bg, apply_sgr((fg, bg, attrs), params))
+
+    def apply_raw(self, fg, bg, attrs: int, raw) -> GraphicsState:
+        """
+        Like apply(), keyed on the unparsed parameter text so a cache
+        hit skips parameter parsing entirely.
+        """
+        key = (id(fg), id(bg), attrs, raw)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] is fg and entry[1] is bg:
+            self.hits += 1
+            return entry[2]
+        return self._store(key, fg, bg, apply_sgr((fg, bg, attrs), parse_params(raw)))
+
+    def _store(self, key: tuple, fg, bg, result: GraphicsState) -> GraphicsState:
+        self.misses += 1
+        cache = self._cache
+        if key not in cache and len(cache) >= self.cache_size:
+            cache.pop(next(iter(cache)), None)
+        cache[key] = (fg, bg, result)
+        return result
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+# Shared by parsers that are not given their own engine, so the cache
+# stays warm across screens and files.
+DEFAULT_ENGINE = SGREngine()
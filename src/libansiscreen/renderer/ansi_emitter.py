@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from operator import is_not
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from ..cell import (
     Cell,
@@ -17,6 +18,9 @@ from ..cell import (
 from ..color.rgb import Color
 from ..color.palette import create_ansi_16_palette, create_ansi_256_palette
 from ..color.quantize import quantize_exact, quantize_nearest_rgb
+from ..parser.charsets import run_encoder
+from .row_compressor import DOS_COMPRESSION, MODERN_COMPRESSION, RowCompression, RowCompressor
+from .sgr_optimizer import DOS_COMPAT, MODERN_COMPAT, SGRCompat, SGROptimizer
 from ..screen import Screen
 
 ANSI16 = create_ansi_16_palette()
@@ -53,31 +57,199 @@ class TerminalState:
     attrs: int  # ANSI attrs bitmask as *intended* (after DOS/ICE normalization)
 
 
+# One compiled output cell: (character as written, style id)
+RenderedCell = Tuple[str, int]
+
+# Stand-in for cells outside the screen
+_NO_CELL = Cell()
+
+
+class _StyleTable:
+    """
+    Interned terminal states for one emitter configuration.
+
+    Every distinct TerminalState gets a small integer id, and everything
+    that depends only on the configuration is memoized on ids: Color ->
+    AnsiColorState, (state, cell style) -> state, (state, state) -> SGR
+    transition, whether a state draws as a solid block and whether a
+    space or that block drawn in it looks like a cleared cell. Per cell,
+    emitting then costs two dict lookups instead of building state
+    objects and SGR strings.
+    """
+
+    # Bound on the style / transition memos before they are dropped
+    # and rebuilt (interned states stay valid)
+    MAX_MEMO = 1 << 16
+
+    def __init__(self, emitter: "ANSIEmitter"):
+        self.emitter = emitter
+        self.palette = emitter.palette
+        self.dos_mode = emitter.dos_mode
+        self.ice_mode = emitter.ice_mode
+        self.compat = emitter.sgr_compat()
+        self.optimizer = SGROptimizer(emitter, self.compat) if self.compat is not None else None
+        self.states: List[TerminalState] = []
+        self.ids: Dict[TerminalState, int] = {}
+        self.solid: List[bool] = []
+        self.blank: List[bool] = []
+        self.clear: List[bool] = []
+        self.colors: Dict[Tuple[Color, bool], AnsiColorState] = {}
+        self.styles: Dict[tuple, int] = {}
+        self.transitions: Dict[int, str] = {}
+
+    def matches(self, emitter: "ANSIEmitter") -> bool:
+        return (
+            self.palette is emitter.palette
+            and self.dos_mode == emitter.dos_mode
+            and self.ice_mode == emitter.ice_mode
+            and self.compat == emitter.sgr_compat()
+        )
+
+    def intern(self, state: TerminalState) -> int:
+        sid = self.ids.get(state)
+        if sid is None:
+            solid = self.emitter._dos_colors_match(state.fg, state.bg)
+            blank = self.emitter._blank_state(state)
+            clear = solid and blank and self.emitter._clear_block(state)
+            sid = self.ids[state] = len(self.states)
+            self.states.append(state)
+            self.solid.append(solid)
+            self.blank.append(blank)
+            self.clear.append(clear)
+        return sid
+
+    def style(self, prev: int, cell: Cell) -> int:
+        """Id of the state `cell` is drawn in, coming from state `prev`."""
+        fg, bg = cell.fg, cell.bg
+        if fg is None or bg is None:
+            key = (prev, -1 if fg is None else fg.value, -1 if bg is None else bg.value, cell.attrs)
+        else:
+            key = (fg.value, bg.value, cell.attrs)
+        sid = self.styles.get(key)
+        if sid is None:
+            if len(self.styles) >= self.MAX_MEMO:
+                self.styles.clear()
+            state = self.emitter._compile_cell(self.states[prev], cell, self.colors)
+            sid = self.styles[key] = self.intern(state)
+        return sid
+
+    def transition(self, prev: int, sid: int) -> str:
+        """SGR output that switches the terminal from state `prev` to `sid`."""
+        key = (prev << 32) | sid
+        seq = self.transitions.get(key)
+        if seq is None:
+            if len(self.transitions) >= self.MAX_MEMO:
+                self.transitions.clear()
+            a, b = self.states[prev], self.states[sid]
+            seq = self.emitter._emit_transition(a, b)[0]
+            if self.optimizer is not None:
+                seq = self.optimizer.best(a, b, seq)
+            self.transitions[key] = seq
+        return seq
+
+
+def _cup(x: int, y: int) -> str:
+    return f"\x1b[{y + 1};{x + 1}H" if x else f"\x1b[{y + 1}H"
+
+
+def _rel(n: int, final: str) -> str:
+    return f"\x1b[{final}" if n == 1 else f"\x1b[{n}{final}"
+
+
+def _horizontal(cx: int, x: int) -> str:
+    """Cheapest move along the current row from column cx to x."""
+    if x == cx:
+        return ""
+    if x > cx:
+        return _rel(x - cx, "C")
+    cr = "\r" + (_rel(x, "C") if x else "")
+    back = _rel(cx - x, "D")
+    return cr if len(cr) <= len(back) else back
+
+
+def _move(cx: Optional[int], cy: Optional[int], x: int, y: int) -> str:
+    """
+    Cheapest cursor move from (cx, cy) to (x, y); cx is None when the
+    position is unknown. Line feeds are only used between screen rows,
+    so they never scroll.
+    """
+    best = _cup(x, y)
+    if cx is None:
+        return best
+    if y == cy:
+        options = [_horizontal(cx, x)]
+    elif y > cy:
+        options = [
+            "\r" + "\n" * (y - cy) + (_rel(x, "C") if x else ""),
+            _rel(y - cy, "B") + _horizontal(cx, x),
+        ]
+    else:
+        options = [_rel(cy - y, "A") + _horizontal(cx, x)]
+    for seq in options:
+        if len(seq) < len(best):
+            best = seq
+    return best
+
+
 class ANSIEmitter:
     """
     Emitter that diffs terminal *intent* in ANSI space.
     - Compile each cell into desired ANSI encoding (attrs + fg + bg)
     - Diff against previous terminal state
     - Emit only what changes (1 SGR max per cell; DOS may force reset + SGR)
+
+    Compiled states and SGR transitions are interned per emitter and
+    configuration (_StyleTable), so they are built once per distinct
+    style and reused across cells, rows and calls.
     """
 
+    # Bytes buffered by emit_to() before they are written to the stream
+    FLUSH_THRESHOLD = 64 * 1024
+
     def __init__(
         self,
         *,
         palette=None,                 # if set, quantize to this palette (index space)
         dos_mode: bool = False,       # CP437-ish / DOS SGR semantics
         ice_mode: bool = False,       # in DOS mode, use blink bit for bright background
+        encoding: Optional[str] = None,  # byte output codec (default: cp437 in DOS mode, else utf-8)
+        fallback: Optional[Dict[str, str]] = None,  # glyph -> replacement when the codec lacks it
+        optimize_sgr: bool = True,     # pick the shortest SGR per transition (see sgr_optimizer)
+        compat: Optional[SGRCompat] = None,  # SGR codes the terminal handles (default per mode)
+        compress: bool = False,        # trim / skip / repeat runs in emit() rows (see row_compressor)
+        compression: Optional[RowCompression] = None,  # passes the terminal handles (default per mode)
     ):
         self.palette = palette
         self.dos_mode = dos_mode
         self.ice_mode = ice_mode
+        self.encoding = encoding
+        self.fallback = fallback
+        self.optimize_sgr = optimize_sgr
+        self.compat = compat
+        self.compress = compress
+        self.compression = compression
+        self._table: Optional[_StyleTable] = None
+        self._encoder: Optional[Tuple[str, object, Callable[[str], bytes]]] = None
 
     # -------------------------
     # Public API
     # -------------------------
 
     def emit(self, screen: Screen, box: Optional[Box] = None) -> str:
-        out: List[str] = []
+        return "".join(self.emit_iter(screen, box))
+
+    def emit_iter(self, screen: Screen, box: Optional[Box] = None) -> Iterator[str]:
+        """
+        Yield emit()'s output one row at a time (the first chunk also
+        carries the leading reset), so the first bytes can be sent
+        after one row of work. The screen must not change while the
+        iterator is consumed.
+
+        With `compress`, rows go through RowCompressor: trailing blanks
+        are dropped, blank runs skipped with CUF and glyph runs repeated
+        with REP, as row_compression() allows. Such output is meant to
+        be drawn over a cleared area.
+        """
         if box is None:
             start_x, start_y = 0, 0
             width, height = screen.width, screen.height
@@ -85,40 +257,292 @@ class ANSIEmitter:
             start_x, start_y = box.x, box.y
             width, height = box.width, box.height
         # hard reset + home
-        out.append("\x1b[0m")
+        if not height:
+            yield "\x1b[0m"
+            return
+        out: List[str] = ["\x1b[0m"]
+        table = self._styles()
+        style = table.style
+        transition = table.transition
+        solid = table.solid
+        get_cell = screen.get_cell
         # Terminal starts in ANSI reset defaults: fg=7 bg=0 attrs=0
-        prev = TerminalState(
+        sid = table.intern(TerminalState(
             fg=AnsiColorState("ansi16", (7,)),
             bg=AnsiColorState("ansi16", (0,)),
             attrs=0,
-        )
+        ))
+        row_start = table.intern(TerminalState(
+            fg=AnsiColorState("ansi16", (7,0)),
+            bg=AnsiColorState("ansi16", (0,0)),
+            attrs=0,
+        ))
+        compression = self.row_compression()
+        if compression is not None:
+            compressor = RowCompressor(
+                transition, table.blank, table.clear, table.intern(self._reset_state()),
+                compression, self._encode(),
+            )
+            for row in range(height):
+                y = start_y + row
+                cells: List[RenderedCell] = []
+                desired = sid
+                for col in range(width):
+                    cell = get_cell(start_x + col, y) or _NO_CELL
+                    desired = style(desired, cell)
+                    cells.append(("█" if solid[desired] else cell.char or " ", desired))
+                out.append(compressor.row(cells, sid))
+                yield "".join(out)
+                out = []
+                sid = row_start
+            return
         for row in range(height):
             y = start_y + row
             for col in range(width):
-                x = start_x + col
-                cell = screen.get_cell(x, y) or Cell()
-                desired = self._compile_cell(prev, cell)
-                seq, prev = self._emit_transition(prev, desired)
+                cell = get_cell(start_x + col, y) or _NO_CELL
+                desired = style(sid, cell)
+                seq = transition(sid, desired)
                 if seq:
                     out.append(seq)
-                ch = cell.char
-                if self._dos_colors_match(prev.fg, prev.bg):
-                    ch = "█"
-                out.append(ch or ' ')
+                out.append("█" if solid[desired] else cell.char or " ")
+                sid = desired
+            out.append("\x1b[0m\n")
+            yield "".join(out)
+            out = []
+            sid = row_start
+
+    def emit_bytes(self, screen: Screen, box: Optional[Box] = None) -> bytes:
+        """
+        emit()'s output encoded in the output codec (`encoding`), one
+        row at a time, e.g. CP437 bytes for a DOS BBS session. Glyphs
+        the codec cannot represent are replaced by `fallback` or "?".
+        """
+        encode = self._encode()
+        return b"".join(map(encode, self.emit_iter(screen, box)))
+
+    def emit_to(
+        self,
+        stream: BinaryIO,
+        screen: Screen,
+        box: Optional[Box] = None,
+        *,
+        flush_threshold: Optional[int] = None,
+    ) -> int:
+        """
+        Write emit_bytes()'s output to the binary `stream` (file, socket
+        file, BytesIO, ...) without building the whole frame.
+
+        Rows are encoded into a buffer that is written (and the stream
+        flushed, if it can be) whenever it reaches `flush_threshold`
+        bytes (default FLUSH_THRESHOLD; 0 writes every row). Returns
+        the number of bytes written.
+        """
+        if flush_threshold is None:
+            flush_threshold = self.FLUSH_THRESHOLD
+        encode = self._encode()
+        flush = getattr(stream, "flush", None)
+        written = 0
+        buf = bytearray()
+        for chunk in self.emit_iter(screen, box):
+            buf += encode(chunk)
+            if len(buf) >= flush_threshold:
+                stream.write(buf)
+                written += len(buf)
+                buf = bytearray()
+                if flush is not None:
+                    flush()
+        if buf:
+            stream.write(buf)
+            written += len(buf)
+        if flush is not None:
+            flush()
+        return written
+
+    def emit_update(
+        self,
+        prev: Screen,
+        cur: Screen,
+        rows: Optional[Iterable[int]] = None,
+    ) -> str:
+        """
+        Return the output that turns a terminal showing `prev` into one
+        showing `cur`, writing only the cells whose output changed.
+
+        The screen's top-left cell is the terminal's home position. For
+        each run of changed cells the cursor takes the cheapest of an
+        absolute CUP, relative CUU/CUD/CUF/CUB, CR / CR-LF, or simply
+        reprinting the unchanged cells in between; SGR state is carried
+        from run to run. The result starts from a reset (the previous
+        attributes are unknown) and ends in the reset state; it is empty
+        when nothing changed.
+
+        Rows with equal content hashes (Screen.row_hash) are skipped;
+        other rows are compared by their output (character and ANSI
+        state as emit() renders them), so inherited (None) colors are
+        resolved along the row first. `rows` restricts the rows checked,
+        e.g. to cur.take_damage().dirty_rows().
+        """
+        if prev.width != cur.width:
+            raise ValueError(f"Cannot update width {prev.width} with width {cur.width}")
+        width = cur.width
+        if rows is None:
+            rows = range(max(len(prev.rows), len(cur.rows)))
+
+        table = self._styles()
+        reset = table.intern(self._reset_state())
+        out: List[str] = []
+        state = reset
+        cx: Optional[int] = None
+        cy: Optional[int] = None
+
+        for y in sorted(rows):
+            old_row = prev.rows[y] if y < len(prev.rows) else prev._blank_row
+            new_row = cur.rows[y] if y < len(cur.rows) else cur._blank_row
+            if old_row is new_row:
+                continue
+            if prev.backend == cur.backend:
+                # Content hashes tell None (inherit) from black
+                if prev.row_hash(y) == cur.row_hash(y):
+                    continue
+            elif not any(map(is_not, old_row, new_row)):
+                continue
+
+            old = self._render_row(old_row, table)
+            new = self._render_row(new_row, table)
+            x = 0
+            while x < width:
+                if old[x] == new[x]:
+                    x += 1
+                    continue
+                stop = x + 1
+                while stop < width and old[stop] != new[stop]:
+                    stop += 1
+
+                if not out:
+                    out.append("\x1b[0m")
+                move = _move(cx, cy, x, y)
+                if cy == y and cx is not None and x - cx <= len(move):
+                    # Reprinting the gap may be cheaper than moving
+                    gap, gap_state = self._write_cells(table, new, cx, x, state)
+                    after_gap = table.transition(gap_state, new[x][1])
+                    after_move = table.transition(state, new[x][1])
+                    if len(gap) + len(after_gap) <= len(move) + len(after_move):
+                        out.append(gap)
+                        state = gap_state
+                        move = ""
+                if move:
+                    out.append(move)
+
+                seq, state = self._write_cells(table, new, x, stop, state)
+                out.append(seq)
+                # Writing the last column may leave the cursor pending a
+                # wrap; its position is unknown until the next CUP
+                cx, cy = (None, None) if stop >= width else (stop, y)
+                x = stop
+
+        if not out:
+            return ""
+        if state != reset:
             out.append("\x1b[0m")
-            out.append("\n")
-            prev = TerminalState(
-                fg=AnsiColorState("ansi16", (7,0)),
-                bg=AnsiColorState("ansi16", (0,0)),
+        return "".join(out)
+
+    # -------------------------
+    # Incremental output helpers
+    # -------------------------
+
+    def _styles(self) -> _StyleTable:
+        """The style table for the current configuration."""
+        table = self._table
+        if table is None or not table.matches(self):
+            table = self._table = _StyleTable(self)
+        return table
+
+    def sgr_compat(self) -> Optional[SGRCompat]:
+        """
+        SGR constraints the transitions are optimized under: `compat`,
+        else DOS_COMPAT in DOS mode and MODERN_COMPAT otherwise; None
+        when optimize_sgr is off.
+        """
+        if not self.optimize_sgr:
+            return None
+        if self.compat is not None:
+            return self.compat
+        return DOS_COMPAT if self.dos_mode else MODERN_COMPAT
+
+    def row_compression(self) -> Optional[RowCompression]:
+        """
+        Passes emit() compresses rows with: `compression`, else
+        DOS_COMPRESSION in DOS mode and MODERN_COMPRESSION otherwise;
+        None when compress is off.
+        """
+        if not self.compress:
+            return None
+        if self.compression is not None:
+            return self.compression
+        return DOS_COMPRESSION if self.dos_mode else MODERN_COMPRESSION
+
+    def _encode(self) -> Callable[[str], bytes]:
+        """Text -> bytes encoder for the current output configuration."""
+        codec = self.encoding or ("cp437" if self.dos_mode else "utf-8")
+        cached = self._encoder
+        if cached is None or cached[0] != codec or cached[1] is not self.fallback:
+            cached = self._encoder = (codec, self.fallback, run_encoder(codec, self.fallback))
+        return cached[2]
+
+    def _reset_state(self) -> TerminalState:
+        """Terminal state right after SGR 0."""
+        if self.dos_mode:
+            return TerminalState(
+                fg=AnsiColorState("dos", (7, 0)),
+                bg=AnsiColorState("dos", (0, 0)),
                 attrs=0,
             )
-        return "".join(out)
+        return TerminalState(
+            fg=AnsiColorState("ansi16", (7,)),
+            bg=AnsiColorState("ansi16", (0,)),
+            attrs=0,
+        )
+
+    def _render_row(self, row, table: _StyleTable) -> List[RenderedCell]:
+        """Resolve a row into what emit() writes for each cell."""
+        style = table.style
+        solid = table.solid
+        sid = table.intern(self._reset_state())
+        rendered: List[RenderedCell] = []
+        for cell in row:
+            cell = cell or _NO_CELL
+            sid = style(sid, cell)
+            rendered.append(("█" if solid[sid] else cell.char or " ", sid))
+        return rendered
+
+    def _write_cells(
+        self,
+        table: _StyleTable,
+        cells: List[RenderedCell],
+        start: int,
+        stop: int,
+        state: int,
+    ) -> Tuple[str, int]:
+        transition = table.transition
+        out: List[str] = []
+        for ch, desired in cells[start:stop]:
+            seq = transition(state, desired)
+            if seq:
+                out.append(seq)
+            out.append(ch)
+            state = desired
+        return "".join(out), state
 
         # -------------------------
         # Compile: Cell -> Desired TerminalState
         # -------------------------
 
-    def _compile_cell(self, prev: TerminalState, cell: Cell) -> TerminalState:
+    def _compile_cell(
+        self,
+        prev: TerminalState,
+        cell: Cell,
+        cache: Optional[Dict[Tuple[Color, bool], AnsiColorState]] = None,
+    ) -> TerminalState:
         # None means "inherit / no change"
         fg_color = cell.fg
         bg_color = cell.bg
@@ -130,10 +554,43 @@ class ANSIEmitter:
             attrs &= ~ATTR_FAINT
             if self.ice_mode:
                 attrs &= ~ATTR_BLINK
-        fg_state = prev.fg if fg_color is None else self._encode_color(fg_color, fg=True)
-        bg_state = prev.bg if bg_color is None else self._encode_color(bg_color, fg=False)
+        if cache is None:
+            fg_state = prev.fg if fg_color is None else self._encode_color(fg_color, fg=True)
+            bg_state = prev.bg if bg_color is None else self._encode_color(bg_color, fg=False)
+            return TerminalState(fg=fg_state, bg=bg_state, attrs=attrs)
+        if fg_color is None:
+            fg_state = prev.fg
+        else:
+            fg_state = cache.get((fg_color, True))
+            if fg_state is None:
+                fg_state = cache[(fg_color, True)] = self._encode_color(fg_color, fg=True)
+        if bg_color is None:
+            bg_state = prev.bg
+        else:
+            bg_state = cache.get((bg_color, False))
+            if bg_state is None:
+                bg_state = cache[(bg_color, False)] = self._encode_color(bg_color, fg=False)
         return TerminalState(fg=fg_state, bg=bg_state, attrs=attrs)
 
+    def _blank_state(self, state: TerminalState) -> bool:
+        """Whether a space drawn in `state` looks like a cleared cell."""
+        if state.attrs & (ATTR_INVERSE | ATTR_UNDERLINE | ATTR_STRIKE):
+            return False
+        bg = state.bg
+        if bg.kind == "dos":
+            base, bright = bg.value
+            return base == 0 and not (bright and self.ice_mode)
+        # ANSI16 (0,) or the row start marker (0, 0)
+        return bg.kind == "ansi16" and bg.value[0] == 0
+
+    def _clear_block(self, state: TerminalState) -> bool:
+        """
+        Whether a solid block drawn in `state` looks like a cleared cell:
+        its drawn foreground (bright or BOLD included) is plain black.
+        """
+        fg = state.fg
+        return fg.kind == "dos" and fg.value == (0, 0) and not state.attrs & ATTR_BOLD
+
     def _dos_colors_match(self, fg: AnsiColorState, bg: AnsiColorState) -> bool:
         if fg.kind in [ 'dos' ] or bg.kind in [ 'dos' ]:
             fg_base, fg_bright = fg.value
@@ -181,6 +638,10 @@ class ANSIEmitter:
             _, new_bright = desired.fg.value
             if prev_bright == 1 and new_bright == 0:
                 needs_reset = True
+        # Same for the ICE background intensity (blink bit)
+        if self.ice_mode and prev.bg.kind == "dos" and desired.bg.kind == "dos":
+            if prev.bg.value[1] == 1 and desired.bg.value[1] == 0:
+                needs_reset = True
         if needs_reset:
             # After reset, terminal is at defaults:
             reset_state = TerminalState(
@@ -201,11 +662,12 @@ class ANSIEmitter:
         # Attributes: if changed, emit full intended set (simple + deterministic)
         reset=False
         if desired.attrs != prev.attrs:
-            # If attrs becomes 0, a single 0 is correct/minimal
-            if desired.attrs == 0:
+            # SGR can only turn attributes off by resetting; if attrs
+            # becomes 0, a single 0 is correct/minimal
+            if prev.attrs & ~desired.attrs:
                 codes.append("0")
                 reset = True
-            else:
+            if desired.attrs:
                 if desired.attrs & ATTR_BOLD: codes.append("1")
                 if (not self.dos_mode) and (desired.attrs & ATTR_FAINT): codes.append("2")
                 if desired.attrs & ATTR_ITALIC: codes.append("3")
@@ -0,0 +1,170 @@
+"""
+row_compressor.py
+
+Run-length output for one emitted row.
+
+ANSIEmitter.emit() writes every cell of every row literally. With row
+compression the emitter hands each rendered row to RowCompressor,
+which applies these passes:
+
+    trim      trailing blank cells are not written at all
+    forward   runs of blank cells are skipped with CUF (CSI n C)
+    repeat    runs of one glyph in one style are written once and
+              repeated with REP (CSI n b)
+
+A cell is blank when it looks like a cleared cell: a space, or a solid
+DOS block drawn in plain black (not bright, not bold), on the default
+black background, without inverse, underline or strike. Skipping blank cells assumes the
+output is drawn over a cleared area, as ANSI art is (a fresh terminal,
+a file viewer, or after ESC[2J).
+
+Every skip or repeat is decided by byte cost: the escape sequence
+plus the SGR transitions it causes against the literal cells, with
+glyphs counted in the output codec.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+
+@dataclass(frozen=True)
+class RowCompression:
+    """
+    Compression passes the target terminal is trusted with.
+
+    - trim:    drop trailing blank cells of each row
+    - forward: skip runs of blank cells with CUF
+    - repeat:  repeat runs of one glyph with REP (ECMA-48; not in
+               ANSI.SYS and most DOS-era clients)
+    """
+
+    trim: bool = True
+    forward: bool = True
+    repeat: bool = False
+
+
+# Modern terminals (xterm, VTE, Windows Terminal, tmux, ...)
+MODERN_COMPRESSION = RowCompression(repeat=True)
+# DOS terminals (ANSI.SYS and BBS clients): no REP
+DOS_COMPRESSION = RowCompression()
+
+
+def _rel(n: int, final: str) -> str:
+    return f"\x1b[{final}" if n == 1 else f"\x1b[{n}{final}"
+
+
+class RowCompressor:
+    """
+    Writes rendered rows ((glyph, style id) per cell) of one emitter
+    with the passes of `compression` (see module docstring). `blank`
+    flags the style ids a space is invisible in, `clear` those whose
+    solid block is; `reset` is the id of the state each row returns to.
+    """
+
+    def __init__(
+        self,
+        transition: Callable[[int, int], str],
+        blank: List[bool],
+        clear: List[bool],
+        reset: int,
+        compression: RowCompression,
+        encode: Callable[[str], bytes],
+    ):
+        self.transition = transition
+        self.blank = blank
+        self.clear = clear
+        self.reset = reset
+        self.compression = compression
+        self.encode = encode
+        # Output bytes per glyph, in the output codec
+        self._widths: Dict[str, int] = {}
+
+    def row(self, cells: List[Tuple[str, int]], state: int) -> str:
+        """
+        Output for one row starting in terminal state `state`, ending
+        with the row's reset and newline.
+        """
+        blank = self.blank
+        clear = self.clear
+        transition = self.transition
+        compression = self.compression
+        skips = [blank[sid] and (ch == " " or clear[sid]) for ch, sid in cells]
+
+        stop = len(cells)
+        if compression.trim:
+            while stop and skips[stop - 1]:
+                stop -= 1
+        out: List[str] = []
+        i = 0
+        while i < stop:
+            j = i + 1
+            if compression.forward and skips[i]:
+                while j < stop and skips[j]:
+                    j += 1
+                after = cells[j][1] if j < stop else self.reset
+                text, text_state, cost = self._write(cells, i, j, state)
+                move = _rel(j - i, "C")
+                if len(move) + len(transition(state, after)) < \
+                        cost + len(transition(text_state, after)):
+                    out.append(move)
+                else:
+                    out.append(text)
+                    state = text_state
+            else:
+                while j < stop and not (compression.forward and skips[j]):
+                    j += 1
+                text, state, _ = self._write(cells, i, j, state)
+                out.append(text)
+            i = j
+        # The row ends in the reset state; skip SGR 0 when it already is
+        out.append("\x1b[0m\n" if transition(state, self.reset) else "\n")
+        return "".join(out)
+
+    def _write(
+        self,
+        cells: List[Tuple[str, int]],
+        start: int,
+        stop: int,
+        state: int,
+    ) -> Tuple[str, int, int]:
+        """
+        Literal cells[start:stop], with REP for runs where it is cheaper.
+        Returns (text, state after it, text's size in output bytes).
+        """
+        transition = self.transition
+        repeat = self.compression.repeat
+        out: List[str] = []
+        cost = 0
+        i = start
+        while i < stop:
+            cell = cells[i]
+            ch, sid = cell
+            seq = transition(state, sid)
+            if seq:
+                out.append(seq)
+                cost += len(seq)
+            state = sid
+            j = i + 1
+            while j < stop and cells[j] == cell:
+                j += 1
+            count = j - i
+            width = self._width(ch)
+            if repeat and count > 1:
+                rep = _rel(count - 1, "b")
+                if len(rep) < (count - 1) * width:
+                    out.append(ch + rep)
+                    cost += width + len(rep)
+                    i = j
+                    continue
+            out.append(ch * count)
+            cost += width * count
+            i = j
+        return "".join(out), state, cost
+
+    def _width(self, ch: str) -> int:
+        width = self._widths.get(ch)
+        if width is None:
+            width = self._widths[ch] = len(self.encode(ch))
+        return width
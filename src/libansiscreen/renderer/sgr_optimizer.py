@@ -0,0 +1,281 @@
+"""
+sgr_optimizer.py
+
+Cheapest SGR sequence for one terminal state transition.
+
+ANSIEmitter's baseline transition is simple and safe: it re-sends every
+attribute whenever one changes, resets (SGR 0) when one turns off, and
+in DOS mode resets on every bright -> dim color change. The optimizer
+builds the alternatives:
+
+    incremental   only what changes, with targeted off codes (22-29)
+    reset         one combined "0;..." sequence, then only what differs
+                  from the reset state
+
+Each alternative is checked against a model of what the terminal shows
+and the shortest valid sequence wins; the baseline is kept when nothing
+beats it. SGRCompat limits the codes the optimizer may use, per mode.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from ..cell import (
+    ATTR_BOLD,
+    ATTR_FAINT,
+    ATTR_ITALIC,
+    ATTR_UNDERLINE,
+    ATTR_BLINK,
+    ATTR_INVERSE,
+    ATTR_CONCEAL,
+    ATTR_STRIKE,
+)
+
+
+@dataclass(frozen=True)
+class SGRCompat:
+    """
+    SGR forms the target terminal is trusted with.
+
+    - off_codes:      22-29 turn single attributes off (otherwise only
+                      a reset does); in DOS mode 22 / 25 also clear the
+                      bright foreground / ICE background
+    - default_colors: 39 / 49 select the default colors (light gray on
+                      black, the emitter's reset state)
+    """
+
+    off_codes: bool = True
+    default_colors: bool = True
+
+
+# Modern terminals (xterm, VTE, Windows Terminal, ...)
+MODERN_COMPAT = SGRCompat()
+# DOS terminals (ANSI.SYS and BBS clients): 22 / 25 are not reliable
+DOS_COMPAT = SGRCompat(off_codes=False, default_colors=False)
+
+# (attribute, on code, off code); 22 clears both bold and faint
+_ATTRS = (
+    (ATTR_BOLD, 1, 22),
+    (ATTR_FAINT, 2, 22),
+    (ATTR_ITALIC, 3, 23),
+    (ATTR_UNDERLINE, 4, 24),
+    (ATTR_BLINK, 5, 25),
+    (ATTR_INVERSE, 7, 27),
+    (ATTR_CONCEAL, 8, 28),
+    (ATTR_STRIKE, 9, 29),
+)
+_ON = {on: attr for attr, on, _ in _ATTRS}
+_OFF = {23: ATTR_ITALIC, 24: ATTR_UNDERLINE, 25: ATTR_BLINK, 27: ATTR_INVERSE,
+        28: ATTR_CONCEAL, 29: ATTR_STRIKE, 22: ATTR_BOLD | ATTR_FAINT}
+
+
+def _attr_codes(attrs: int) -> List[str]:
+    return [str(on) for attr, on, _ in _ATTRS if attrs & attr]
+
+
+def _sequence(codes: List[str]) -> str:
+    return "\x1b[" + ";".join(codes) + "m" if codes else ""
+
+
+class SGROptimizer:
+    """
+    Picks the shortest SGR sequence between two TerminalStates of one
+    emitter (see module docstring). Results are memoized by the
+    emitter's style table, so each transition is solved once.
+
+    States are compared as the terminal shows them. In DOS mode that is
+    (fg base, intensity, bg base, blink, other attrs): bold and a bright
+    foreground are the same intensity bit, and in ICE mode a bright
+    background is the blink bit.
+    """
+
+    def __init__(self, emitter, compat: SGRCompat):
+        from .ansi_emitter import AnsiColorState
+
+        self.emitter = emitter
+        self.compat = compat
+        self.dos_mode = emitter.dos_mode
+        self.ice_mode = emitter.ice_mode
+        self._default_fg = AnsiColorState("ansi16", (7,))
+        self._default_bg = AnsiColorState("ansi16", (0,))
+        self._reset = self._shown(emitter._reset_state())
+
+    def best(self, prev, desired, baseline: str) -> str:
+        """Shortest valid sequence from `prev` to `desired`, else `baseline`."""
+        start = self._shown(prev)
+        goal = self._shown(desired)
+        best = baseline
+        for codes in self._candidates(start, goal):
+            seq = _sequence(codes)
+            if len(seq) < len(best) and self._apply(start, codes) == goal:
+                best = seq
+        return best
+
+    # ------------------------------------------------------------------
+    # Visible state
+    # ------------------------------------------------------------------
+
+    def _shown(self, state) -> tuple:
+        if not self.dos_mode:
+            return (self._plain(state.fg), self._plain(state.bg), state.attrs)
+        fg_base, fg_bright = self._dos_color(state.fg)
+        bg_base, bg_bright = self._dos_color(state.bg)
+        attrs = state.attrs
+        blink = bg_bright if self.ice_mode else int(bool(attrs & ATTR_BLINK))
+        intensity = int(bool(fg_bright or attrs & ATTR_BOLD))
+        return (fg_base, intensity, bg_base, blink,
+                attrs & ~(ATTR_BOLD | ATTR_FAINT | ATTR_BLINK))
+
+    @staticmethod
+    def _plain(st):
+        # emit() marks the reset state at a row start as ANSI16 (index, 0)
+        if st.kind == "ansi16" and len(st.value) == 2:
+            return type(st)("ansi16", st.value[:1])
+        return st
+
+    @staticmethod
+    def _dos_color(st) -> Tuple[int, int]:
+        value = st.value
+        if len(value) == 2:
+            return value
+        # ANSI16 index (the emitter's initial state)
+        return value[0] & 7, int(value[0] >= 8)
+
+    # ------------------------------------------------------------------
+    # Candidates
+    # ------------------------------------------------------------------
+
+    def _candidates(self, start: tuple, goal: tuple) -> List[List[str]]:
+        if self.dos_mode:
+            candidates = [self._dos_codes(self._reset, goal, ["0"])]
+            incremental = self._dos_codes(start, goal, [])
+        else:
+            candidates = [self._codes(self._reset, goal, ["0"])]
+            incremental = self._codes(start, goal, [])
+        if incremental is not None:
+            candidates.append(incremental)
+        return candidates
+
+    def _codes(self, start: tuple, goal: tuple, codes: List[str]) -> Optional[List[str]]:
+        fg, bg, attrs = start
+        off = attrs & ~goal[2]
+        on = goal[2] & ~attrs
+        if off:
+            if not self.compat.off_codes:
+                return None
+            for attr, _, off_code in _ATTRS:
+                if off & attr and str(off_code) not in codes:
+                    codes.append(str(off_code))
+            if off & (ATTR_BOLD | ATTR_FAINT):
+                # 22 cleared both; restore the one that stays
+                on |= goal[2] & (ATTR_BOLD | ATTR_FAINT)
+        codes.extend(_attr_codes(on))
+        if goal[0] != fg:
+            codes.extend(self._color(goal[0], fg=True))
+        if goal[1] != bg:
+            codes.extend(self._color(goal[1], fg=False))
+        return codes
+
+    def _color(self, st, *, fg: bool) -> List[str]:
+        codes = self.emitter._color_state_to_sgr(st, fg=fg)
+        if self.compat.default_colors and st == (self._default_fg if fg else self._default_bg):
+            default = ["39" if fg else "49"]
+            if len(";".join(default)) < len(";".join(codes)):
+                return default
+        return codes
+
+    def _dos_codes(self, start: tuple, goal: tuple, codes: List[str]) -> Optional[List[str]]:
+        fg_base, intensity, bg_base, blink, attrs = start
+        off = attrs & ~goal[4]
+        if (off or intensity > goal[1] or blink > goal[3]) and not self.compat.off_codes:
+            return None
+        if intensity > goal[1]:
+            codes.append("22")
+        if blink > goal[3]:
+            codes.append("25")
+        for attr, _, off_code in _ATTRS:
+            if off & attr:
+                codes.append(str(off_code))
+        if goal[1] > intensity:
+            codes.append("1")
+        if goal[3] > blink:
+            codes.append("5")
+        codes.extend(_attr_codes(goal[4] & ~attrs))
+        if goal[0] != fg_base:
+            codes.append(str(30 + goal[0]))
+        if goal[2] != bg_base:
+            codes.append(str(40 + goal[2]))
+        return codes
+
+    # ------------------------------------------------------------------
+    # Terminal model
+    # ------------------------------------------------------------------
+
+    def _apply(self, state: tuple, codes: List[str]) -> Optional[tuple]:
+        """What the terminal shows after `codes`; None if unsupported."""
+        params = [int(p) for code in codes for p in code.split(";")]
+        if self.dos_mode:
+            return self._apply_dos(state, params)
+        from .ansi_emitter import AnsiColorState
+
+        fg, bg, attrs = state
+        i = 0
+        while i < len(params):
+            p = params[i]
+            if p == 0:
+                fg, bg, attrs = self._reset
+            elif p in _ON:
+                attrs |= _ON[p]
+            elif p in _OFF:
+                attrs &= ~_OFF[p]
+            elif 30 <= p <= 37:
+                fg = AnsiColorState("ansi16", (p - 30,))
+            elif 40 <= p <= 47:
+                bg = AnsiColorState("ansi16", (p - 40,))
+            elif 90 <= p <= 97:
+                fg = AnsiColorState("ansi16", (p - 82,))
+            elif 100 <= p <= 107:
+                bg = AnsiColorState("ansi16", (p - 92,))
+            elif p == 39:
+                fg = self._default_fg
+            elif p == 49:
+                bg = self._default_bg
+            elif p in (38, 48) and params[i + 1] == 5:
+                color = AnsiColorState("ansi256", (params[i + 2],))
+                fg, bg = (color, bg) if p == 38 else (fg, color)
+                i += 2
+            elif p in (38, 48) and params[i + 1] == 2:
+                color = AnsiColorState("truecolor", tuple(params[i + 2:i + 5]))
+                fg, bg = (color, bg) if p == 38 else (fg, color)
+                i += 4
+            else:
+                return None
+            i += 1
+        return (fg, bg, attrs)
+
+    def _apply_dos(self, state: tuple, params: List[int]) -> Optional[tuple]:
+        fg_base, intensity, bg_base, blink, attrs = state
+        for p in params:
+            if p == 0:
+                fg_base, intensity, bg_base, blink, attrs = self._reset
+            elif p == 1:
+                intensity = 1
+            elif p == 22:
+                intensity = 0
+            elif p == 5:
+                blink = 1
+            elif p == 25:
+                blink = 0
+            elif 30 <= p <= 37:
+                fg_base = p - 30
+            elif 40 <= p <= 47:
+                bg_base = p - 40
+            elif p in _ON:
+                attrs |= _ON[p]
+            elif p in _OFF:
+                attrs &= ~_OFF[p]
+            else:
+                return None
+        return (fg_base, intensity, bg_base, blink, attrs)
@@ -1,11 +1,16 @@
 # libansiscreen/screen.py
 
-from typing import List, Optional
+from collections import deque
+from dataclasses import replace
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
-from .cell import Cell
+from .cell import BLANK_CELL, Cell, SharedCell
 from .cursor import Cursor
 from .color.rgb import Color
 from .color.palette import create_ansi_16_palette
+from .storage import BACKENDS, ArrayRow, ArrayStore, CellHashes, row_hash
+from .damage import Damage
+from .snapshot import Snapshot
 
 
 # ----------------------------------------------------------------------
@@ -25,21 +30,113 @@ class Screen:
     - Height grows dynamically.
     - Cursor represents write position only.
     - Current graphics state (colors + attributes) is explicit.
+
+    Cells written by the run path (put_run / put_text) are shared between
+    slots with the same character and graphics state, as read-only
+    SharedCells. Treat cells returned by get_cell as read-only: copy()
+    one and write the change back with set_cell.
+
+    backend="array" stores rows as compact parallel arrays instead of
+    lists of Cell objects (see storage.py); get_cell then returns
+    CellView proxies. The API is the same for both backends.
+
+    Rows are lazy: until a row is first written it is a reference to one
+    shared, immutable blank row (a tuple of BLANK_CELL on the list
+    backend), and it is copied into a private row on the first write.
+    Reads never create rows; reading past the end returns BLANK_CELL.
+
+    snapshot() shares every row with the returned Snapshot; a shared row
+    is copied the same way the first time the screen writes to it, and
+    restore() puts the snapshot's rows back. Undo steps and captured
+    frames cost one reference per row plus the rows edited since.
+
+    Every write path (set_cell, put_char / put_run, the clear operations,
+    and through set_cell the screen_ops such as pixelplot and paste)
+    records the dirty column span of each row it touches and bumps
+    `generation`. take_damage() hands the accumulated Damage to a
+    consumer (emitter, cache, network sender) and starts over. Code
+    that writes into `rows` directly must call mark_dirty() itself.
+
+    max_height=N turns the screen into a bounded scrollback buffer for
+    endless streams (logs, terminal sessions): rows live in a deque, and
+    when the cursor moves past row N-1 (newline, wrap, cursor motion)
+    the oldest rows are dropped in O(1) each. Coordinates stay relative
+    to the oldest kept row, so the cursor (and its saved position) move
+    up with the content; `top_line` counts the rows dropped so far,
+    i.e. absolute line L is row L - top_line. Dropping rows reports
+    full damage. Writes addressed by coordinate (set_cell) never drop
+    rows; the screen is trimmed on the next cursor move.
     """
 
+    # Bound on the number of distinct graphics states kept in the
+    # run-cell cache before it is dropped and rebuilt.
+    RUN_CACHE_STATES = 256
+
+    # Scrollback limit (None: unbounded); see __init__
+    max_height: Optional[int] = None
+
     # ------------------------------------------------------------------
     # Construction
     # ------------------------------------------------------------------
-    def __init__(self, width: int):
+    def __init__(
+        self,
+        width: int,
+        *,
+        backend: str = "list",
+        max_height: Optional[int] = None,
+    ):
         if width <= 0:
             raise ValueError("Screen width must be > 0")
+        if max_height is not None and max_height <= 0:
+            raise ValueError("Screen max_height must be > 0")
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown storage backend: {backend!r} (expected one of {', '.join(BACKENDS)})"
+            )
         self.width: int = width
-        self.rows: List[List[Cell]] = []
+        self.backend: str = backend
+        self.rows: Union[List[List[Cell]], Deque[List[Cell]]] = (
+            [] if max_height is None else deque()
+        )
+        self.max_height = max_height
+        # Rows dropped off the top so far (absolute line of row 0)
+        self.top_line: int = 0
+        if backend == "array":
+            store = ArrayStore(width)
+            self._new_row = store.new_row
+            self._copy_row = ArrayRow.copy
+            self._fill_row = ArrayRow.fill
+            self._blank_row = store.blank_row
+        else:
+            self._new_row = self._new_list_row
+            self._copy_row = list
+            self._fill_row = self._fill_list_row
+            self._blank_row = (BLANK_CELL,) * width
+        # id(row) -> row for the rows only this screen references, which
+        # it may write in place; every other row is copied first
+        self._owned: Dict[int, object] = {}
         self.cursor: Cursor = Cursor()
         # Current graphics state (SGR-like)
         self.current_fg: Color = DEFAULT_FG
         self.current_bg: Color = DEFAULT_BG
         self.current_attrs: int = 0
+        # (id(fg), id(bg), attrs) -> (fg, bg, {char: Cell}) for the run
+        # fast path. Keyed on identity so a lookup never hashes a Color.
+        self._run_cells: Dict[Tuple[int, int, int], Tuple[Color, Color, Dict[str, Cell]]] = {}
+        # Persistent ANSI parser, created on first use (see `parser`)
+        self._parser = None
+        # Damage tracking (see take_damage)
+        self.generation: int = 0
+        self._damage: Dict[int, List[int]] = {}
+        self._damage_full: bool = False
+        self._damage_since: int = 0
+        self._damage_height: int = 0
+        # Row content hashes, y -> hash, dropped when the row is marked
+        self._row_hashes: Dict[int, int] = {}
+        self._row_cell_hashes: Dict[int, List[int]] = {}
+        self._cell_hash_memo = CellHashes()
+        self._blank_hash: Optional[int] = None
+
     # ------------------------------------------------------------------
     # Properties
     # ------------------------------------------------------------------
@@ -52,10 +149,210 @@ class Screen:
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
+    def _new_list_row(self) -> List[Cell]:
+        return list(self._blank_row)
+
+    @staticmethod
+    def _fill_list_row(row: List[Cell], x0: int, x1: int, cell: Cell) -> None:
+        row[x0:x1] = [cell] * (x1 - x0)
+
     def _ensure_row(self, y: int) -> None:
-        """Ensure row y exists."""
-        while y >= len(self.rows):
-            self.rows.append([Cell() for _ in range(self.width)])
+        """Ensure row y exists (as a shared blank row if new)."""
+        missing = y + 1 - len(self.rows)
+        if missing > 0:
+            self.rows.extend([self._blank_row] * missing)
+
+    def _trim(self) -> None:
+        """Drop the oldest rows beyond max_height (scrollback mode)."""
+        excess = len(self.rows) - self.max_height
+        if excess > 0:
+            self._drop_top(excess)
+            self.cursor.scroll(excess)
+            self._damage_all()
+
+    def _drop_top(self, n: int) -> None:
+        """Remove the first n rows."""
+        rows = self.rows
+        owned = self._owned
+        if isinstance(rows, deque):
+            for _ in range(n):
+                owned.pop(id(rows.popleft()), None)
+        else:
+            for row in rows[:n]:
+                owned.pop(id(row), None)
+            del rows[:n]
+        self.top_line += n
+
+    def _mark(self, y: int, x0: int, x1: int) -> None:
+        """Record columns [x0, x1) of row y as changed."""
+        self.generation += 1
+        self._row_hashes.pop(y, None)
+        self._row_cell_hashes.pop(y, None)
+        span = self._damage.get(y)
+        if span is None:
+            self._damage[y] = [x0, x1]
+        else:
+            if x0 < span[0]:
+                span[0] = x0
+            if x1 > span[1]:
+                span[1] = x1
+
+    def _writable_row(self, y: int):
+        """Row y, materialized (copy-on-write) for writing."""
+        self._ensure_row(y)
+        row = self.rows[y]
+        if id(row) not in self._owned:
+            if row is self._blank_row:
+                row = self._new_row()
+            else:
+                row = self._copy_row(row)
+            self.rows[y] = row
+            self._owned[id(row)] = row
+        return row
+
+    def _drop_row(self, y: int) -> None:
+        """Forget ownership of row y before it is replaced."""
+        self._owned.pop(id(self.rows[y]), None)
+
+    def ensure_height(self, height: int) -> None:
+        """
+        Grow the screen to at least `height` rows in one bulk step
+        (e.g. to preallocate a document of known size). New rows share
+        the blank row until written. A scrollback screen grows to at
+        most max_height rows.
+        """
+        if self.max_height is not None:
+            height = min(height, self.max_height)
+        self._ensure_row(height - 1)
+
+    # ------------------------------------------------------------------
+    # Damage tracking
+    # ------------------------------------------------------------------
+    def mark_dirty(self, y: int, x0: int = 0, x1: Optional[int] = None) -> None:
+        """Mark columns [x0, x1) of row y (default: whole row) as changed."""
+        self._mark(y, x0, self.width if x1 is None else x1)
+
+    def take_damage(self) -> Damage:
+        """
+        Return everything that changed since the previous call and reset
+        the tracking. Rows the screen grew by count as dirty.
+        """
+        damage = Damage(
+            since=self._damage_since,
+            generation=self.generation,
+            height=len(self.rows),
+            prev_height=self._damage_height,
+            width=self.width,
+            rows={y: (span[0], span[1]) for y, span in self._damage.items()},
+            full=self._damage_full,
+        )
+        self._damage = {}
+        self._damage_full = False
+        self._damage_since = self.generation
+        self._damage_height = len(self.rows)
+        return damage
+
+    def _damage_all(self) -> None:
+        self.generation += 1
+        self._damage_full = True
+        self._damage.clear()
+        self._row_hashes.clear()
+        self._row_cell_hashes.clear()
+
+    # ------------------------------------------------------------------
+    # Content hashes
+    # ------------------------------------------------------------------
+    def row_hash(self, y: int) -> int:
+        """
+        Content hash of row y (rows past the end hash as blank).
+
+        Computed on first use and kept until the row is written, so
+        comparing a row of two screens is constant time once hashed.
+        Equal hashes mean the rows produce the same output; hashes are
+        only comparable between screens of the same backend and within
+        one process.
+        """
+        h = self._row_hashes.get(y)
+        if h is not None:
+            return h
+        row = self.rows[y] if 0 <= y < len(self.rows) else self._blank_row
+        if row is self._blank_row:
+            if self._blank_hash is None:
+                self._blank_hash = row_hash(row, self._cell_hash_memo)
+            h = self._blank_hash
+        else:
+            h = row_hash(row, self._cell_hash_memo)
+        if 0 <= y < len(self.rows):
+            self._row_hashes[y] = h
+        return h
+
+    def _cell_hashes(self, y: int) -> List[int]:
+        """
+        Per-cell content hashes of row y (list backend only), cached
+        like row_hash(); finds changed columns without Cell compares.
+        """
+        hashes = self._row_cell_hashes.get(y)
+        if hashes is None:
+            row = self.rows[y] if 0 <= y < len(self.rows) else self._blank_row
+            hashes = self._cell_hash_memo.row(row)
+            if 0 <= y < len(self.rows):
+                self._row_cell_hashes[y] = hashes
+        return hashes
+
+    def digest(self) -> int:
+        """
+        Hash of the whole screen (width and every row), e.g. to drop
+        duplicate frames when recording an animation.
+        """
+        return hash((self.width, tuple(map(self.row_hash, range(len(self.rows))))))
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+    def snapshot(self) -> Snapshot:
+        """
+        Capture the screen (rows, cursor, graphics state) for undo or
+        frame capture. O(height) references; no cells are copied.
+        """
+        # From now on every current row is shared with the snapshot
+        self._owned.clear()
+        return Snapshot(
+            width=self.width,
+            backend=self.backend,
+            rows=tuple(self.rows),
+            cursor=replace(self.cursor),
+            fg=self.current_fg,
+            bg=self.current_bg,
+            attrs=self.current_attrs,
+            generation=self.generation,
+            top_line=self.top_line,
+        )
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """
+        Roll the screen back to `snapshot`. Rows that are still the
+        snapshot's own objects are kept; only the others are swapped
+        (and reported as damage).
+        """
+        if snapshot.width != self.width or snapshot.backend != self.backend:
+            raise ValueError(
+                f"Cannot restore a {snapshot.width}-column {snapshot.backend} snapshot "
+                f"into a {self.width}-column {self.backend} screen"
+            )
+        rows = self.rows
+        if len(rows) != len(snapshot.rows):
+            rows.clear()
+            rows.extend(snapshot.rows)
+            self._damage_all()
+        else:
+            for y, row in enumerate(snapshot.rows):
+                if rows[y] is not row:
+                    rows[y] = row
+                    self._mark(y, 0, self.width)
+        self._owned.clear()
+        self.top_line = snapshot.top_line
+        self.cursor = replace(snapshot.cursor)
+        self.set_graphics(snapshot.fg, snapshot.bg, snapshot.attrs)
 
     def _clamp_x(self, x: int) -> int:
         return max(0, min(self.width - 1, x))
@@ -64,18 +361,18 @@ class Screen:
     # Cell access
     # ------------------------------------------------------------------
     def get_cell(self, x: int, y: int) -> Optional[Cell]:
-        self._ensure_row(y)
-        if y < 0 or y >= len(self.rows):
-            return None
-        if x < 0 or x >= self.width:
+        if y < 0 or x < 0 or x >= self.width:
             return None
+        if y >= len(self.rows):
+            # Past the end: blank, without growing the screen
+            return self._blank_row[x]
         return self.rows[y][x]
 
     def set_cell(self, x: int, y: int, cell: Cell) -> None:
-        if x < 0 or x >= self.width:
+        if x < 0 or x >= self.width or y < 0:
             return
-        self._ensure_row(y)
-        self.rows[y][x] = cell
+        self._writable_row(y)[x] = cell
+        self._mark(y, x, x + 1)
 
     def put_cell(self, x: int, y: int, *, char=None, fg=None, bg=None, attrs=0,) -> None:
         self.set_cell(
@@ -95,6 +392,8 @@ class Screen:
         self.cursor.x = self._clamp_x(x)
         self.cursor.y = max(0, y)
         self._ensure_row(self.cursor.y)
+        if self.max_height is not None:
+            self._trim()
 
     def cursor_up(self, n: int = 1) -> None:
         self.cursor.y = max(0, self.cursor.y - n)
@@ -102,6 +401,8 @@ class Screen:
     def cursor_down(self, n: int = 1) -> None:
         self.cursor.y += n
         self._ensure_row(self.cursor.y)
+        if self.max_height is not None:
+            self._trim()
 
     def cursor_forward(self, n: int = 1) -> None:
         self.cursor.x = self._clamp_x(self.cursor.x + n)
@@ -113,6 +414,8 @@ class Screen:
         self.cursor.x = 0
         self.cursor.y += n
         self._ensure_row(self.cursor.y)
+        if self.max_height is not None:
+            self._trim()
 
     def cursor_prev_line(self, n: int = 1) -> None:
         self.cursor.x = 0
@@ -128,6 +431,8 @@ class Screen:
         self.cursor.restore()
         self.cursor.x = self._clamp_x(self.cursor.x)
         self._ensure_row(self.cursor.y)
+        if self.max_height is not None:
+            self._trim()
 
     # ------------------------------------------------------------------
     # Line / carriage control
@@ -138,11 +443,15 @@ class Screen:
     def line_feed(self) -> None:
         self.cursor.y += 1
         self._ensure_row(self.cursor.y)
+        if self.max_height is not None:
+            self._trim()
 
     def newline(self) -> None:
         self.cursor.x = 0
         self.cursor.y += 1
         self._ensure_row(self.cursor.y)
+        if self.max_height is not None:
+            self._trim()
 
     # ------------------------------------------------------------------
     # Graphics state (SGR-like)
@@ -162,6 +471,12 @@ class Screen:
     def clear_attrs(self, attrs: int) -> None:
         self.current_attrs &= ~attrs
 
+    def set_graphics(self, fg: Color, bg: Color, attrs: int) -> None:
+        """Replace the whole graphics state at once."""
+        self.current_fg = fg
+        self.current_bg = bg
+        self.current_attrs = attrs
+
     def reset_graphics(self) -> None:
         """
         Reset foreground, background, and attributes to ANSI defaults.
@@ -180,25 +495,81 @@ class Screen:
         if len(char) != 1:
             raise ValueError("put_char expects a single character" + char)
 
-        self._ensure_row(self.cursor.y)
-
-        self.rows[self.cursor.y][self.cursor.x] = Cell(
+        x, y = self.cursor.x, self.cursor.y
+        self._writable_row(y)[x] = Cell(
             char=char,
             fg=self.current_fg,
             bg=self.current_bg,
             attrs=self.current_attrs,
         )
+        self._mark(y, x, x + 1)
 
         self._advance_cursor()
 
+    def put_run(self, text: str) -> None:
+        """
+        Write a run of printable characters at the cursor in one call.
+
+        Equivalent to put_char() for every character of `text` (same
+        graphics state, same wrapping at the screen width), but rows are
+        filled by slice assignment and cells are shared per character
+        for the current graphics state instead of allocated per write.
+        The caller guarantees `text` holds no ESC / CR / LF.
+        """
+        n = len(text)
+        if not n:
+            return
+
+        fg, bg, attrs = self.current_fg, self.current_bg, self.current_attrs
+        cells = self._run_cell_map(fg, bg, attrs)
+        lookup = cells.__getitem__
+
+        width = self.width
+        writable_row = self._writable_row
+        cursor = self.cursor
+        x, y = cursor.x, cursor.y
+        i = 0
+        while i < n:
+            take = min(width - x, n - i)
+            chunk = text[i:i + take]
+            for ch in set(chunk).difference(cells):
+                cells[ch] = SharedCell(ch, fg, bg, attrs)
+            writable_row(y)[x:x + take] = map(lookup, chunk)
+            self._mark(y, x, x + take)
+            i += take
+            x += take
+            if x >= width:
+                x = 0
+                y += 1
+                self._ensure_row(y)
+        cursor.x, cursor.y = x, y
+        if self.max_height is not None:
+            self._trim()
+
+    def _run_cell_map(self, fg: Color, bg: Color, attrs: int) -> Dict[str, Cell]:
+        """
+        Shared {char: SharedCell} map for one graphics state. Callers
+        add missing characters themselves.
+        """
+        key = (id(fg), id(bg), attrs)
+        entry = self._run_cells.get(key)
+        if entry is None or entry[0] is not fg or entry[1] is not bg:
+            if len(self._run_cells) >= self.RUN_CACHE_STATES:
+                self._run_cells.clear()
+            entry = self._run_cells[key] = (fg, bg, {})
+        return entry[2]
+
     def put_text(self, text: str) -> None:
-        for ch in text:
-            if ch == "\n":
-                self.newline()
-            elif ch == "\r":
-                self.carriage_return()
-            else:
-                self.put_char(ch)
+        start = 0
+        for i, ch in enumerate(text):
+            if ch == "\n" or ch == "\r":
+                self.put_run(text[start:i])
+                if ch == "\n":
+                    self.newline()
+                else:
+                    self.carriage_return()
+                start = i + 1
+        self.put_run(text[start:])
 
     def _advance_cursor(self) -> None:
         self.cursor.x += 1
@@ -206,11 +577,108 @@ class Screen:
             self.cursor.x = 0
             self.cursor.y += 1
             self._ensure_row(self.cursor.y)
+            if self.max_height is not None:
+                self._trim()
+
+    # ------------------------------------------------------------------
+    # Bulk writes (by coordinate; the cursor is not moved)
+    # ------------------------------------------------------------------
+    def write_text(self, x: int, y: int, text: str, style: Optional[Cell] = None) -> Tuple[int, int]:
+        """
+        Write printable `text` from (x, y) onwards, wrapping at the
+        screen width, with one slice assignment per row. Colors and
+        attributes come from `style` (a Cell; its char is ignored) or,
+        by default, the current graphics state. Cells are shared per
+        character as on the run path.
+
+        Returns the position (x, y) after the last character.
+        """
+        if style is None:
+            fg, bg, attrs = self.current_fg, self.current_bg, self.current_attrs
+        else:
+            fg, bg, attrs = style.fg, style.bg, style.attrs
+        cells = self._run_cell_map(fg, bg, attrs)
+        for ch in set(text).difference(cells):
+            cells[ch] = SharedCell(ch, fg, bg, attrs)
+        return self._write_span(x, y, list(map(cells.__getitem__, text)))
+
+    def write_cells(self, x: int, y: int, cells: Iterable[Cell]) -> Tuple[int, int]:
+        """
+        Write `cells` from (x, y) onwards, wrapping at the screen width,
+        with one slice assignment per row.
+
+        Returns the position (x, y) after the last cell.
+        """
+        return self._write_span(x, y, cells if isinstance(cells, list) else list(cells))
+
+    def _write_span(self, x: int, y: int, cells: Sequence[Cell]) -> Tuple[int, int]:
+        width = self.width
+        n = len(cells)
+        pos = y * width + x
+        # Cells that would land above row 0 are dropped
+        i = min(n, -pos) if pos < 0 else 0
+        pos += i
+        while i < n:
+            y, x = divmod(pos, width)
+            take = min(width - x, n - i)
+            self._ensure_row(y)
+            self._write(x, y, cells[i:i + take])
+            i += take
+            pos += take
+        y, x = divmod(pos, width)
+        return x, y
+
+    def _write(self, x: int, y: int, cells: Sequence[Cell]) -> None:
+        """Write `cells` into row y from column x (must fit the row)."""
+        self._writable_row(y)[x:x + len(cells)] = cells
+        self._mark(y, x, x + len(cells))
+
+    def fill_rect(self, box: Tuple[int, int, int, int], cell: Cell) -> None:
+        """
+        Set every cell of box (x, y, width, height) to `cell`, clipped to
+        the screen width and row 0; the screen grows to the box bottom.
+
+        One slice fill per row (array fills on the array backend).
+        Full-width boxes fill a single row and share it across the box,
+        to be copied per row on the next write.
+        """
+        bx, by, bw, bh = box
+        x0, x1 = max(0, bx), min(self.width, bx + bw)
+        y0, y1 = max(0, by), by + bh
+        if x0 >= x1 or y0 >= y1:
+            return
+        if x0 == 0 and x1 == self.width:
+            shared = self._new_row()
+            self._fill_row(shared, 0, x1, cell)
+            self._ensure_row(y1 - 1)
+            rows = self.rows
+            for y in range(y0, y1):
+                self._drop_row(y)
+                rows[y] = shared
+                self._mark(y, 0, x1)
+            return
+        writable_row = self._writable_row
+        fill_row = self._fill_row
+        for y in range(y0, y1):
+            fill_row(writable_row(y), x0, x1, cell)
+            self._mark(y, x0, x1)
+
+    @property
+    def parser(self):
+        """
+        The screen's persistent ANSIParser.
+
+        Parser state (partial escape sequences, split UTF-8 characters)
+        survives between print() calls, so a stream can be printed in
+        arbitrary chunks.
+        """
+        if self._parser is None:
+            from libansiscreen.parser.ansi_parser import ANSIParser
+            self._parser = ANSIParser(self)
+        return self._parser
 
     def print(self, s):
-        from libansiscreen.parser.ansi_parser import ANSIParser
-        parser=ANSIParser(self)
-        parser.feed(s)
+        self.parser.feed(s)
 
     # ------------------------------------------------------------------
     # Clearing operations
@@ -220,16 +688,64 @@ class Screen:
         Clear screen, reset cursor and graphics state.
         """
         self.rows.clear()
+        self._owned.clear()
+        self.top_line = 0
         self.cursor.reset()
         self.reset_graphics()
+        self._damage_all()
+
+    def clear_screen(self) -> None:
+        """
+        Erase every row to blank cells (ED 2).
+        Cursor, height and graphics state are kept.
+        """
+        rows = self.rows
+        height = len(rows)
+        rows.clear()
+        rows.extend([self._blank_row] * height)
+        self._owned.clear()
+        self._damage_all()
+
+    def scroll_up(self, n: int = 1) -> None:
+        """
+        Scroll the content up n rows (SU): the top rows are dropped and
+        blank rows appended. Height and cursor are kept. O(n) in
+        scrollback mode (max_height), O(height) otherwise.
+        """
+        n = min(n, len(self.rows))
+        if n <= 0:
+            return
+        self._drop_top(n)
+        self.rows.extend([self._blank_row] * n)
+        self._damage_all()
+
+    def scroll_down(self, n: int = 1) -> None:
+        """
+        Scroll the content down n rows (SD): the bottom rows are dropped
+        and blank rows inserted at the top. Height and cursor are kept.
+        O(n) in scrollback mode (max_height), O(height) otherwise.
+        """
+        rows = self.rows
+        n = min(n, len(rows))
+        if n <= 0:
+            return
+        for _ in range(n):
+            self._owned.pop(id(rows.pop()), None)
+        blank = [self._blank_row] * n
+        if isinstance(rows, deque):
+            rows.extendleft(blank)
+        else:
+            rows[:0] = blank
+        self._damage_all()
 
     def clear_row(self, y: int) -> None:
         self._ensure_row(y)
-        self.rows[y] = [Cell() for _ in range(self.width)]
+        self._drop_row(y)
+        self.rows[y] = self._blank_row
+        self._mark(y, 0, self.width)
 
     def clear_to_end_of_line(self) -> None:
-        self._ensure_row(self.cursor.y)
-        row = self.rows[self.cursor.y]
+        row = self._writable_row(self.cursor.y)
         for x in range(self.cursor.x, self.width):
             row[x] = Cell(
                 char=" ",
@@ -237,11 +753,14 @@ class Screen:
                 bg=self.current_bg,
                 attrs=self.current_attrs,
             )
+        self._mark(self.cursor.y, self.cursor.x, self.width)
 
     def clear_to_end_of_screen(self) -> None:
         self.clear_to_end_of_line()
         for y in range(self.cursor.y + 1, len(self.rows)):
-            self.rows[y] = [Cell() for _ in range(self.width)]
+            self._drop_row(y)
+            self.rows[y] = self._blank_row
+            self._mark(y, 0, self.width)
 
     # ------------------------------------------------------------------
     # Clip stuff
@@ -264,6 +783,10 @@ class Screen:
         from libansiscreen.screen_ops.clip import cut
         return cut(self, box)
 
+    def window(self, x: int = 0, y: int = 0, width=None, height=None, **transparency):
+        from libansiscreen.screen_ops.window import ScreenWindow
+        return ScreenWindow(self, x, y, width, height, **transparency)
+
     # ------------------------------------------------------------------
     # coloring
     # ------------------------------------------------------------------
@@ -60,9 +60,8 @@ def copy(screen, box: Optional[Box] = None) -> Screen:
     If box is None, returns a full deep copy of the screen.
     Box is defined as (x, y, width, height).
     """
-    print(screen)
     if box is None:
-        box=Tuple[0,0,screen.width,screen.height]
+        box = (0, 0, screen.width, screen.height)
     x0, y0, w, h = box
     if w <= 0 or h <= 0:
         raise ValueError("Box width and height must be positive")
@@ -137,7 +136,7 @@ def paste(
                 continue
 
             src_cell = src.get_cell(sx, sy)
-            dst_cell = dst.get_cell(dx, dy)
+            dst_cell = dst.get_cell(dx, dy).copy()
 
             # Character
             if (
@@ -166,3 +165,5 @@ def paste(
                 and src_cell.attrs is not None
             ):
                 dst_cell.attrs = src_cell.attrs
+
+            dst.set_cell(dx, dy, dst_cell)
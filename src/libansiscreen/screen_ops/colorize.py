@@ -30,10 +30,12 @@ def apply_hgrad(
                 continue
             idx = int(x * (n - 1) / (width - 1))
             color = gradient[idx]
+            cell = cell.copy()
             if foreground:
                 cell.fg = color if tint is None else color.blend(cell.fg,tint)
             if background:
                 cell.bg = color if tint is None else color.blend(cell.bg,tint)
+            screen.set_cell(x, y, cell)
 
 # ------------------------------------------------------------
 # Vertical gradient (top → bottom)
@@ -62,10 +64,12 @@ def apply_vgrad(
                 continue
             if only_if_set and cell.char is None:
                 continue
+            cell = cell.copy()
             if foreground:
                 cell.fg = color if tint is None else color.blend(cell.fg,tint)
             if background:
                 cell.bg = color if tint is None else color.blend(cell.bg,tint)
+            screen.set_cell(x, y, cell)
 
 # ------------------------------------------------------------
 # Diagonal gradient (top-left → bottom-right)
@@ -102,10 +106,12 @@ def apply_dgrad(
                 d = x + y
             idx = int(d * (n - 1) / denom)
             color = gradient[idx]
+            cell = cell.copy()
             if foreground:
                 cell.fg = color if tint is None else color.blend(cell.fg,tint)
             if background:
                 cell.bg = color if tint is None else color.blend(cell.bg,tint)
+            screen.set_cell(x, y, cell)
 
 
 # ------------------------------------------------------------
@@ -133,10 +139,12 @@ def apply_words(
                 idx=0
                 continue
             color = gradient[min(idx, n - 1)]
+            cell = cell.copy()
             if foreground:
                 cell.fg = color if tint is None else color.blend(cell.fg,tint)
             if background:
                 cell.bg = color if tint is None else color.blend(cell.bg,tint)
+            screen.set_cell(x, y, cell)
             idx += 1
 
 # ------------------------------------------------------------
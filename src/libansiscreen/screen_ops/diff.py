@@ -0,0 +1,132 @@
+from __future__ import annotations
+from itertools import compress, count
+from operator import is_not, ne
+from typing import Dict, Iterable, List, Optional, Tuple
+from libansiscreen.screen import Screen
+from libansiscreen.storage import ArrayRow
+
+# Field bits, as returned by Cell.diff()
+DIFF_CHAR  = 0b0001
+DIFF_FG    = 0b0010
+DIFF_BG    = 0b0100
+DIFF_ATTRS = 0b1000
+
+# (x0, x1, mask): columns [x0, x1) changed, mask = OR of their field bits
+Span = Tuple[int, int, int]
+
+
+def _spans(changes: Dict[int, int]) -> List[Span]:
+    """Group changed columns {x: mask} into runs of adjacent columns."""
+    spans: List[Span] = []
+    x0 = x1 = -1
+    mask = 0
+    for x in sorted(changes):
+        if x != x1:
+            if x1 > 0:
+                spans.append((x0, x1, mask))
+            x0, mask = x, 0
+        mask |= changes[x]
+        x1 = x + 1
+    if x1 > 0:
+        spans.append((x0, x1, mask))
+    return spans
+
+
+def _diff_arrays(a: ArrayRow, b: ArrayRow) -> Dict[int, int]:
+    """Compare the planes of two ArrayRows, one C-level pass per plane."""
+    changes: Dict[int, int] = {}
+    for plane_a, plane_b, bit in (
+        (a.chars, b.chars, DIFF_CHAR),
+        (a.fg, b.fg, DIFF_FG),
+        (a.bg, b.bg, DIFF_BG),
+        (a.attrs, b.attrs, DIFF_ATTRS),
+    ):
+        if plane_a == plane_b:
+            continue
+        for x in compress(range(len(plane_a)), map(ne, plane_a, plane_b)):
+            changes[x] = changes.get(x, 0) | bit
+    # Multi code point characters share one marker in the chars plane
+    if a.extra or b.extra:
+        for x in set(a.extra or ()) | set(b.extra or ()):
+            if a.char_at(x) != b.char_at(x):
+                changes[x] = changes.get(x, 0) | DIFF_CHAR
+    return changes
+
+
+def _diff_cells(
+    a,
+    b,
+    hashes: Optional[Tuple[List[int], List[int]]] = None,
+) -> Dict[int, int]:
+    """
+    Compare two rows cell by cell, skipping shared (identical) cells or,
+    given per-cell hashes, cells with equal hashes.
+    """
+    changes: Dict[int, int] = {}
+    if hashes is None:
+        candidates = compress(count(), map(is_not, a, b))
+    else:
+        candidates = compress(count(), map(ne, *hashes))
+    for x in candidates:
+        mask = a[x].diff(b[x])
+        if mask:
+            changes[x] = mask
+    return changes
+
+
+def diff_rows(a, b) -> List[Span]:
+    """
+    Return the change spans between two rows of the same width.
+    """
+    if a is b:
+        return []
+    if isinstance(a, ArrayRow) and isinstance(b, ArrayRow):
+        return _spans(_diff_arrays(a, b))
+    if a == b:
+        return []
+    return _spans(_diff_cells(a, b))
+
+
+def diff(
+    old: Screen,
+    new: Screen,
+    rows: Optional[Iterable[int]] = None,
+) -> Dict[int, List[Span]]:
+    """
+    Compare two screens of the same width.
+
+    Returns {y: [(x0, x1, mask), ...]} for every row that changed, in
+    row order; mask uses the Cell.diff() bits (DIFF_CHAR, DIFF_FG,
+    DIFF_BG, DIFF_ATTRS). A row missing on one side compares as blank.
+
+    Rows that are the same object (lazy blank rows, untouched rows of a
+    copy) are skipped without looking at their cells, and rows with
+    equal content hashes (Screen.row_hash) without comparing cells.
+    `rows` restricts the comparison, e.g. to
+    new.take_damage().dirty_rows().
+    """
+    if old.width != new.width:
+        raise ValueError(f"Cannot diff screens of width {old.width} and {new.width}")
+
+    old_rows, new_rows = old.rows, new.rows
+    if rows is None:
+        rows = range(max(len(old_rows), len(new_rows)))
+
+    # Row hashes are cached per screen, so rows already hashed (e.g. the
+    # previous frame) compare in constant time
+    hashed = old.backend == new.backend
+    result: Dict[int, List[Span]] = {}
+    for y in rows:
+        a = old_rows[y] if y < len(old_rows) else old._blank_row
+        b = new_rows[y] if y < len(new_rows) else new._blank_row
+        if a is b or (hashed and old.row_hash(y) == new.row_hash(y)):
+            continue
+        if hashed and not isinstance(a, ArrayRow):
+            spans = _spans(_diff_cells(a, b, (
+                old._cell_hashes(y), new._cell_hashes(y)
+            )))
+        else:
+            spans = diff_rows(a, b)
+        if spans:
+            result[y] = spans
+    return result
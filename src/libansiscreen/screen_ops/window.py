@@ -0,0 +1,174 @@
+from __future__ import annotations
+from typing import List, Optional, Set
+from libansiscreen.screen import Screen
+from libansiscreen.cell import BLANK_CELL, Cell, SharedCell
+
+
+class ScreenWindow(Screen):
+    """
+    Clipped, offset view of a target Screen, usable as a parser target.
+
+    The window has its own cursor and graphics state and behaves like a
+    Screen of `width` columns whose origin is (x, y) on the target.
+    Everything written through it lands directly in the target, clipped
+    to the box (x, y, width, height) and to the target width, so ANSI
+    can be imported at any position in a single pass:
+
+        screen.window(10, 5, 40, 12).print(overlay)
+
+    height=None leaves the box open downwards (the target grows as with
+    paste). With no transparency rules, cells are written as-is. With
+    any rule set, each written cell is merged into the target cell with
+    the same rules as clip.paste().
+    """
+
+    def __init__(
+        self,
+        target: Screen,
+        x: int = 0,
+        y: int = 0,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        *,
+        transparent_char: Optional[Set[str]] = None,
+        transparent_fg: bool = False,
+        transparent_bg: bool = False,
+        transparent_attrs: bool = False,
+    ):
+        super().__init__(target.width - x if width is None else width)
+        self.target = target
+        self.x = x
+        self.y = y
+        self.box_height = height
+        # Local document height (rows the window cursor has reached)
+        self.lines = 0
+        self.transparent_char = transparent_char or set()
+        self.transparent_fg = transparent_fg
+        self.transparent_bg = transparent_bg
+        self.transparent_attrs = transparent_attrs
+        self._merge = bool(
+            self.transparent_char or transparent_fg
+            or transparent_bg or transparent_attrs
+        )
+
+    @property
+    def height(self) -> int:
+        return self.lines
+
+    def _ensure_row(self, y: int) -> None:
+        if y >= self.lines:
+            self.lines = y + 1
+
+    # ------------------------------------------------------------------
+    # Target mapping
+    # ------------------------------------------------------------------
+    def _write(self, lx: int, ly: int, cells: List[Cell]) -> None:
+        """Write `cells` at local (lx, ly), clipped to box and target."""
+        if ly < 0 or (self.box_height is not None and ly >= self.box_height):
+            return
+        ty = self.y + ly
+        if ty < 0:
+            return
+        target = self.target
+        tx = self.x + lx
+        start = max(0, -tx, -lx)
+        stop = min(len(cells), target.width - tx, self.width - lx)
+        if start >= stop:
+            return
+        row = target._writable_row(ty)
+        target._mark(ty, tx + start, tx + stop)
+        if not self._merge:
+            row[tx + start:tx + stop] = cells[start:stop]
+            return
+        for i in range(start, stop):
+            row[tx + i] = self._merge_cell(row[tx + i], cells[i])
+
+    def _merge_cell(self, dst: Cell, src: Cell) -> Cell:
+        out = dst.copy()
+        if src.char is not None and src.char not in self.transparent_char:
+            out.char = src.char
+        if not self.transparent_fg and src.fg is not None:
+            out.fg = src.fg
+        if not self.transparent_bg and src.bg is not None:
+            out.bg = src.bg
+        if not self.transparent_attrs and src.attrs is not None:
+            out.attrs = src.attrs
+        return out
+
+    # ------------------------------------------------------------------
+    # Cell access (local coordinates)
+    # ------------------------------------------------------------------
+    def get_cell(self, x: int, y: int) -> Optional[Cell]:
+        if x < 0 or x >= self.width or y < 0:
+            return None
+        if self.box_height is not None and y >= self.box_height:
+            return None
+        return self.target.get_cell(self.x + x, self.y + y)
+
+    def set_cell(self, x: int, y: int, cell: Cell) -> None:
+        self._ensure_row(y)
+        self._write(x, y, [cell])
+
+    # ------------------------------------------------------------------
+    # Writing operations
+    # ------------------------------------------------------------------
+    def put_char(self, char: str) -> None:
+        if len(char) != 1:
+            raise ValueError("put_char expects a single character" + char)
+        self.put_run(char)
+
+    def put_run(self, text: str) -> None:
+        n = len(text)
+        if not n:
+            return
+        fg, bg, attrs = self.current_fg, self.current_bg, self.current_attrs
+        cells = self.target._run_cell_map(fg, bg, attrs)
+        for ch in set(text).difference(cells):
+            cells[ch] = SharedCell(ch, fg, bg, attrs)
+        lookup = cells.__getitem__
+
+        width = self.width
+        cursor = self.cursor
+        x, y = cursor.x, cursor.y
+        i = 0
+        while i < n:
+            self._ensure_row(y)
+            take = min(width - x, n - i)
+            self._write(x, y, list(map(lookup, text[i:i + take])))
+            i += take
+            x += take
+            if x >= width:
+                x = 0
+                y += 1
+                self._ensure_row(y)
+        cursor.x, cursor.y = x, y
+
+    def clear_to_end_of_line(self) -> None:
+        self._ensure_row(self.cursor.y)
+        cell = Cell(" ", self.current_fg, self.current_bg, self.current_attrs)
+        self._write(self.cursor.x, self.cursor.y, [cell] * (self.width - self.cursor.x))
+
+    def clear_to_end_of_screen(self) -> None:
+        self.clear_to_end_of_line()
+        self._clear_rows(self.cursor.y + 1, self.lines)
+
+    def clear_screen(self) -> None:
+        self._clear_rows(0, self.lines)
+
+    def fill_rect(self, box, cell: Cell) -> None:
+        bx, by, bw, bh = box
+        x0, x1 = max(0, bx), min(self.width, bx + bw)
+        if x0 >= x1:
+            return
+        cells = [cell] * (x1 - x0)
+        for y in range(max(0, by), by + bh):
+            self._ensure_row(y)
+            self._write(x0, y, cells)
+
+    def _clear_rows(self, start: int, stop: int) -> None:
+        if self.box_height is not None:
+            stop = min(stop, self.box_height)
+        start = max(start, -self.y)
+        blank = [BLANK_CELL] * self.width
+        for y in range(start, stop):
+            self._write(0, y, blank)
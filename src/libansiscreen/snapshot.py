@@ -0,0 +1,51 @@
+# libansiscreen/snapshot.py
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from .color.rgb import Color
+from .cursor import Cursor
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Immutable state of a Screen at one point, from Screen.snapshot().
+
+    Rows are shared with the screen (and with other snapshots) rather
+    than copied: after a snapshot the screen copies a row only when it
+    next writes to it. A snapshot therefore costs one reference per row,
+    and each later edit pays for the rows it touches.
+
+    - width, backend: must match the screen it is restored into
+    - rows:           the row objects; never mutated
+    - cursor:         detached copy of the cursor (incl. saved position)
+    - fg, bg, attrs:  current graphics state
+    - generation:     screen generation when taken
+    - top_line:       rows the screen had dropped (scrollback mode)
+    """
+
+    width: int
+    backend: str
+    rows: Tuple[object, ...]
+    cursor: Cursor
+    fg: Optional[Color]
+    bg: Optional[Color]
+    attrs: int
+    generation: int
+    top_line: int = 0
+
+    @property
+    def height(self) -> int:
+        return len(self.rows)
+
+    def to_screen(self):
+        """
+        A new Screen showing this snapshot (sharing its rows), e.g. as
+        the `prev` frame of ANSIEmitter.emit_update().
+        """
+        from .screen import Screen
+
+        screen = Screen(self.width, backend=self.backend)
+        screen.restore(self)
+        return screen
@@ -0,0 +1,318 @@
+# libansiscreen/storage.py
+
+"""
+Row storage backends for Screen.
+
+"list"  (default) every row is a list of Cell objects. Run-written
+        cells are shared, so text-heavy documents stay small, but every
+        distinct cell is a full object with Color references.
+
+"array" every row is an ArrayRow: parallel compact planes of
+        - code points (array 'I', 0 = no character)
+        - packed 24-bit fg / bg (array 'I', bit 24 = None / inherit)
+        - attrs (array 'B')
+        Reading a cell returns a CellView proxy into the row. Colors
+        are stored as packed ints end to end: the Colors written are
+        not kept, and reads get them back from the color intern table,
+        so the saving holds for colour-rich (truecolor) content too.
+
+Both row types support the list operations Screen uses (index and slice
+get / set, len, iteration), so the Screen API is the same on either.
+
+row_hash() gives either row type a content hash for constant-time row
+comparison (see Screen.row_hash).
+"""
+
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .cell import Cell
+from .color.rgb import Color
+
+BACKENDS = ("list", "array")
+
+# Packed color meaning "None" (inherit)
+INHERIT = 1 << 24
+# Code point plane marker: the character lives in ArrayRow.extra
+_EXTRA = 0xFFFFFFFF
+
+
+def pack_color(color: Optional[Color]) -> int:
+    if color is None:
+        return INHERIT
+    return color.value
+
+
+# Bound on a row_hash() memo before it is dropped and rebuilt
+MAX_HASHED_CELLS = 4096
+
+def cell_hash(cell: Cell) -> int:
+    """
+    Content hash of a cell. Unlike Cell equality, None (inherit) and
+    black hash differently: equal hashes mean the same output.
+    """
+    return hash((cell.char, pack_color(cell.fg), pack_color(cell.bg), cell.attrs or 0))
+
+
+class CellHashes:
+    """
+    id(cell) -> cell_hash() memo for the shared cells of a screen. The
+    cells are kept alive while memoized, so their ids stay unique.
+    """
+
+    __slots__ = ("hashes", "cells")
+
+    def __init__(self):
+        self.hashes: Dict[int, int] = {}
+        self.cells: List[Cell] = []
+
+    def row(self, row) -> List[int]:
+        """cell_hash() of every cell of a Cell row."""
+        hashes = self.hashes
+        try:
+            return list(map(hashes.__getitem__, map(id, row)))
+        except KeyError:
+            pass
+        out = list(map(hashes.get, map(id, row)))
+        if len(hashes) >= MAX_HASHED_CELLS:
+            hashes.clear()
+            self.cells.clear()
+        for x, h in enumerate(out):
+            if h is None:
+                cell = row[x]
+                h = hashes.get(id(cell))
+                if h is None:
+                    h = hashes[id(cell)] = cell_hash(cell)
+                    self.cells.append(cell)
+                out[x] = h
+        return out
+
+
+def row_hash(row, memo: Optional[CellHashes] = None) -> int:
+    """
+    Content hash of a row (list of Cells or ArrayRow).
+
+    Hashes are per process (characters hash with the string seed) and
+    only comparable between rows of the same type.
+    """
+    if isinstance(row, ArrayRow):
+        return row.content_hash()
+    if memo is None:
+        return hash(tuple(map(cell_hash, row)))
+    return hash(tuple(memo.row(row)))
+
+
+class ArrayStore:
+    """
+    Per-screen state shared by all rows of an array-backed Screen:
+    blank row templates and the Cell -> packed planes write cache.
+    """
+
+    # Bound on the write cache before it is dropped and rebuilt
+    MAX_CELLS = 256
+
+    def __init__(self, width: int):
+        from .screen import DEFAULT_BG
+
+        self.width = width
+        # id(cell) -> (cell, char, fg, bg, attrs, packed): the fields the
+        # cell was packed from and pack()'s result. The cell is kept alive
+        # so its id cannot be reused while the entry exists
+        self._cells: Dict[int, tuple] = {}
+        self.blank_chars = array("I", bytes(4 * width))
+        self.blank_fg = array("I", [INHERIT]) * width
+        self.blank_bg = array("I", [pack_color(DEFAULT_BG)]) * width
+        self.blank_attrs = array("B", bytes(width))
+        # Shared read-only row for rows that were never written
+        self.blank_row = _BlankArrayRow(self)
+
+    @staticmethod
+    def color(packed: int) -> Optional[Color]:
+        if packed == INHERIT:
+            return None
+        return Color.from_packed(packed)
+
+    def pack(self, cell: Cell) -> Tuple[Cell, int, int, int, int]:
+        """(cell, code point, fg, bg, attrs) plane values for `cell`."""
+        if isinstance(cell, CellView):
+            # Views are live: read the slot, never cache
+            row, x = cell._row, cell._x
+            return cell, row.chars[x], row.fg[x], row.bg[x], row.attrs[x]
+        ch, fg, bg, attrs = cell.char, cell.fg, cell.bg, cell.attrs
+        entry = self._cells.get(id(cell))
+        # Cells are mutable: an entry holds while the cell still has the
+        # field values it was packed from
+        if (entry is None or entry[0] is not cell or entry[1] is not ch
+                or entry[2] is not fg or entry[3] is not bg or entry[4] != attrs):
+            if ch is None:
+                code = 0
+            elif len(ch) == 1:
+                code = ord(ch) + 1
+            else:
+                code = _EXTRA
+            if len(self._cells) >= self.MAX_CELLS:
+                self._cells.clear()
+            packed = (cell, code, pack_color(fg), pack_color(bg), attrs or 0)
+            entry = self._cells[id(cell)] = (cell, ch, fg, bg, attrs, packed)
+        return entry[5]
+
+    def new_row(self) -> "ArrayRow":
+        return ArrayRow(self)
+
+
+class CellView(Cell):
+    """
+    Read-only view of one cell of an ArrayRow.
+
+    Compares equal to a Cell with the same contents and supports the
+    Cell read API (copy(), diff(), ...). Views are live: they reflect
+    later writes to the same slot. Use copy() for a detached Cell.
+    """
+
+    __slots__ = ("_row", "_x")
+
+    def __init__(self, row: "ArrayRow", x: int):
+        object.__setattr__(self, "_row", row)
+        object.__setattr__(self, "_x", x)
+
+    @property
+    def char(self) -> Optional[str]:
+        return self._row.char_at(self._x)
+
+    @property
+    def fg(self) -> Optional[Color]:
+        return self._row.store.color(self._row.fg[self._x])
+
+    @property
+    def bg(self) -> Optional[Color]:
+        return self._row.store.color(self._row.bg[self._x])
+
+    @property
+    def attrs(self) -> int:
+        return self._row.attrs[self._x]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CellView is read-only; write with Screen.set_cell")
+
+    def __repr__(self) -> str:
+        return (
+            f"CellView(char={self.char!r}, fg={self.fg!r}, "
+            f"bg={self.bg!r}, attrs={self.attrs!r})"
+        )
+
+
+class ArrayRow:
+    """
+    One screen row as parallel compact planes (see module docstring).
+    """
+
+    __slots__ = ("store", "chars", "fg", "bg", "attrs", "extra")
+
+    def __init__(self, store: ArrayStore):
+        self.store = store
+        self.chars = store.blank_chars[:]
+        self.fg = store.blank_fg[:]
+        self.bg = store.blank_bg[:]
+        self.attrs = store.blank_attrs[:]
+        # x -> multi code point character
+        self.extra: Optional[Dict[int, str]] = None
+
+    def char_at(self, x: int) -> Optional[str]:
+        code = self.chars[x]
+        if code == 0:
+            return None
+        if code == _EXTRA:
+            return self.extra[x]
+        return chr(code - 1)
+
+    # ------------------------------------------------------------------
+    # List protocol
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    def __iter__(self) -> Iterator[CellView]:
+        return (CellView(self, x) for x in range(len(self.chars)))
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [CellView(self, x) for x in range(*index.indices(len(self.chars)))]
+        if index < 0:
+            index += len(self.chars)
+        if not 0 <= index < len(self.chars):
+            raise IndexError("row index out of range")
+        return CellView(self, index)
+
+    def __setitem__(self, index: Union[int, slice], value) -> None:
+        if isinstance(index, slice):
+            xs = range(*index.indices(len(self.chars)))
+            cells: List[Cell] = list(value)
+            if len(cells) != len(xs):
+                raise ValueError("ArrayRow slices cannot change the row width")
+            for x, cell in zip(xs, cells):
+                self._set(x, cell)
+            return
+        if index < 0:
+            index += len(self.chars)
+        if not 0 <= index < len(self.chars):
+            raise IndexError("row index out of range")
+        self._set(index, value)
+
+    def _set(self, x: int, cell: Cell) -> None:
+        _, code, fg, bg, attrs = self.store.pack(cell)
+        self.chars[x] = code
+        self.fg[x] = fg
+        self.bg[x] = bg
+        self.attrs[x] = attrs
+        if code == _EXTRA:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[x] = cell.char
+
+    def fill(self, x0: int, x1: int, cell: Cell) -> None:
+        """Set columns [x0, x1) to `cell` with one slice fill per plane."""
+        _, code, fg, bg, attrs = self.store.pack(cell)
+        n = x1 - x0
+        self.chars[x0:x1] = array("I", [code]) * n
+        self.fg[x0:x1] = array("I", [fg]) * n
+        self.bg[x0:x1] = array("I", [bg]) * n
+        self.attrs[x0:x1] = array("B", [attrs]) * n
+        if code == _EXTRA:
+            if self.extra is None:
+                self.extra = {}
+            for x in range(x0, x1):
+                self.extra[x] = cell.char
+
+    def copy(self) -> "ArrayRow":
+        """A private, writable copy of the row."""
+        row = ArrayRow.__new__(ArrayRow)
+        row.store = self.store
+        row.chars = self.chars[:]
+        row.fg = self.fg[:]
+        row.bg = self.bg[:]
+        row.attrs = self.attrs[:]
+        row.extra = dict(self.extra) if self.extra else None
+        return row
+
+    def content_hash(self) -> int:
+        """Hash of the planes (see row_hash)."""
+        extra = tuple(sorted(self.extra.items())) if self.extra else None
+        return hash((
+            self.chars.tobytes(), self.fg.tobytes(), self.bg.tobytes(),
+            self.attrs.tobytes(), extra,
+        ))
+
+    def nbytes(self) -> int:
+        """Approximate payload size of the planes in bytes."""
+        return sum(
+            a.itemsize * len(a) for a in (self.chars, self.fg, self.bg, self.attrs)
+        )
+
+
+class _BlankArrayRow(ArrayRow):
+    """The shared, read-only blank row of an ArrayStore."""
+
+    __slots__ = ()
+
+    def __setitem__(self, index, value) -> None:
+        raise TypeError("the shared blank row is read-only")
@@ -0,0 +1,116 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from libansiscreen.screen import Screen
+from libansiscreen.batch import (
+    OUTPUT_MODES,
+    convert_batch,
+    make_emitter,
+    output_path,
+)
+from libansiscreen.__main__ import main as cli_main
+
+SAMPLE = Path(__file__).with_name("thetis.ans")
+
+
+def expected_output(mode: str) -> bytes:
+    screen = Screen(80)
+    screen.print(SAMPLE.read_bytes())
+    return make_emitter(mode).emit_bytes(screen)
+
+
+def test_batch_all_modes_in_process():
+    with tempfile.TemporaryDirectory() as tmp:
+        report = convert_batch([SAMPLE], tmp, OUTPUT_MODES, workers=1)
+        assert not report.failed
+        assert len(report.results) == len(OUTPUT_MODES)
+        for mode in OUTPUT_MODES:
+            data = output_path(SAMPLE, Path(tmp), mode).read_bytes()
+            assert data == expected_output(mode)
+
+
+def test_batch_process_pool_matches_in_process():
+    with tempfile.TemporaryDirectory() as tmp:
+        src_dir = Path(tmp) / "src"
+        src_dir.mkdir()
+        for i in range(3):
+            (src_dir / f"art{i}.ans").write_bytes(SAMPLE.read_bytes())
+        seen = []
+        report = convert_batch(
+            [src_dir], Path(tmp) / "out", ["dos+ice"],
+            workers=2, on_result=seen.append,
+        )
+        assert report.converted == 3
+        assert len(seen) == 3
+        expected = expected_output("dos+ice")
+        for r in report.results:
+            assert r.dest.read_bytes() == expected
+            assert r.bytes_out == len(expected)
+
+
+def test_batch_reports_failures():
+    with tempfile.TemporaryDirectory() as tmp:
+        report = convert_batch([Path(tmp) / "missing.ans"], tmp, workers=1)
+        assert len(report.failed) == 1
+        assert "missing.ans" in report.failed[0].error
+
+
+def test_batch_dos_output_is_cp437():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "blocks.ans"
+        source.write_bytes("\x1b[31m█▒─".encode())
+        report = convert_batch([source], tmp, ["dos", "modern"], workers=1)
+        assert not report.failed
+        dos = output_path(source, Path(tmp), "dos").read_bytes()
+        assert dos.startswith(b"\x1b[0m\x1b[31m\xdb\xb1\xc4")
+        assert "█".encode() not in dos
+        modern = output_path(source, Path(tmp), "modern").read_bytes()
+        assert "█▒─".encode() in modern
+        assert [r.bytes_out for r in report.results] == [len(dos), len(modern)]
+
+
+def test_batch_keeps_subdirectories():
+    with tempfile.TemporaryDirectory() as tmp:
+        src_dir = Path(tmp) / "src"
+        for sub in ("a", "b"):
+            (src_dir / sub).mkdir(parents=True)
+            (src_dir / sub / "logo.ans").write_bytes(f"\x1b[1m{sub}".encode())
+        out = Path(tmp) / "out"
+        # Listing a directory twice converts each file once
+        report = convert_batch([src_dir, src_dir], out, ["ansi16"], workers=1)
+        assert report.converted == 2
+        for sub in ("a", "b"):
+            assert sub.encode() in (out / sub / "logo.ansi16.ans").read_bytes()
+        # Loose files land in out_dir itself and must not collide
+        with pytest.raises(ValueError, match="logo.ans"):
+            convert_batch([src_dir / "a" / "logo.ans", src_dir / "b" / "logo.ans"], out, workers=1)
+        assert cli_main(["convert", "-q", "-o", str(out),
+                         str(src_dir / "a" / "logo.ans"), str(src_dir / "b" / "logo.ans")]) == 2
+
+
+def test_batch_reports_cpu_time():
+    with tempfile.TemporaryDirectory() as tmp:
+        report = convert_batch([SAMPLE], tmp, ["modern", "dos"], workers=1)
+        assert all(0 < r.cpu_seconds for r in report.results)
+        assert report.cpu_seconds == sum(r.cpu_seconds for r in report.results)
+        assert "s cpu" in report.summary()
+
+
+def test_cli_convert():
+    with tempfile.TemporaryDirectory() as tmp:
+        rc = cli_main(["convert", "-q", "-j", "1", "-m", "ansi16", "-o", tmp, str(SAMPLE)])
+        assert rc == 0
+        assert output_path(SAMPLE, Path(tmp), "ansi16").exists()
+
+
+if __name__ == "__main__":
+    test_batch_all_modes_in_process()
+    test_batch_process_pool_matches_in_process()
+    test_batch_reports_failures()
+    test_batch_dos_output_is_cp437()
+    test_batch_keeps_subdirectories()
+    test_batch_reports_cpu_time()
+    test_cli_convert()
+    print("batch tests completed")
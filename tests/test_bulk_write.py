@@ -0,0 +1,104 @@
+import pytest
+
+from libansiscreen.cell import ATTR_BOLD, BLANK_CELL, Cell
+from libansiscreen.color.rgb import Color
+from libansiscreen.screen import Screen
+
+
+RED = Color(170, 0, 0)
+BLUE = Color(0, 0, 170)
+
+
+def cells(screen: Screen):
+    return [[(c.char, c.fg, c.bg, c.attrs) for c in row] for row in screen.rows]
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_write_text_wraps_and_matches_put_cell(backend):
+    screen = Screen(10, backend=backend)
+    style = Cell(None, RED, BLUE, ATTR_BOLD)
+    end = screen.write_text(6, 1, "hello world", style)
+    assert end == (7, 2)
+    assert screen.height == 3
+    assert (screen.cursor.x, screen.cursor.y) == (0, 0)
+
+    expected = Screen(10, backend=backend)
+    for i, ch in enumerate("hello world"):
+        x, y = divmod(6 + i, 10)[::-1]
+        expected.put_cell(x, y + 1, char=ch, fg=RED, bg=BLUE, attrs=ATTR_BOLD)
+    assert cells(screen) == cells(expected)
+
+
+def test_write_text_uses_current_graphics_state():
+    screen = Screen(10)
+    screen.print("\x1b[1;32m")
+    screen.write_text(0, 0, "ab")
+    printed = Screen(10)
+    printed.print("\x1b[1;32mab")
+    assert cells(screen) == cells(printed)
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_write_cells(backend):
+    screen = Screen(4, backend=backend)
+    row = [Cell(ch, RED, BLUE, 0) for ch in "abcdef"]
+    assert screen.write_cells(2, 0, iter(row)) == (0, 2)
+    assert [screen.get_cell(x, y).char for y, x in [(0, 2), (0, 3), (1, 0), (1, 3)]] == list("abcf")
+    # Cells above row 0 are dropped, the rest still land in place
+    assert screen.write_cells(2, -1, row) == (0, 1)
+    assert [screen.get_cell(x, 0).char for x in range(4)] == list("cdef")
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_fill_rect(backend):
+    screen = Screen(8, backend=backend)
+    screen.print("xxxxxxx\r\nxxxxxxx")
+    screen.take_damage()
+    fill = Cell("#", RED, BLUE, 0)
+    screen.fill_rect((-2, 1, 5, 3), fill)
+    assert screen.height == 4
+    for y in range(screen.height):
+        line = "".join(screen.get_cell(x, y).char or " " for x in range(8))
+        assert line == ["xxxxxxx ", "###xxxx ", "###     ", "###     "][y]
+    assert screen.take_damage().rows == {1: (0, 3), 2: (0, 3), 3: (0, 3)}
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_full_width_fill_shares_one_row(backend):
+    screen = Screen(8, backend=backend)
+    screen.print("keep")
+    screen.fill_rect((0, 1, 8, 20), Cell("█", BLUE, RED, 0))
+    assert len({id(row) for row in list(screen.rows)[1:]}) == 1
+    screen.set_cell(3, 5, Cell("!"))
+    assert screen.get_cell(3, 5).char == "!"
+    assert screen.get_cell(3, 6).char == "█"
+    assert screen.get_cell(0, 0).char == "k"
+
+
+def test_fill_extra_characters_on_array_rows():
+    screen = Screen(6, backend="array")
+    screen.fill_rect((1, 0, 3, 1), Cell("é", RED, BLUE, 0))
+    assert [screen.get_cell(x, 0).char for x in range(6)] == [None] + ["é"] * 3 + [None] * 2
+
+
+def test_window_writes_are_clipped():
+    screen = Screen(10)
+    win = screen.window(2, 1, 4, 2)
+    win.fill_rect((0, 0, 10, 10), Cell(".", RED, BLUE, 0))
+    win.write_text(2, 1, "abcd")
+    assert screen.height == 3
+    lines = ["".join(screen.get_cell(x, y).char or " " for x in range(10)) for y in range(3)]
+    assert lines == [" " * 10, "  ....    ", "  ..ab    "]
+    assert screen.get_cell(0, 0) == BLANK_CELL
+
+
+if __name__ == "__main__":
+    for backend in ("list", "array"):
+        test_write_text_wraps_and_matches_put_cell(backend)
+        test_write_cells(backend)
+        test_fill_rect(backend)
+        test_full_width_fill_shares_one_row(backend)
+    test_write_text_uses_current_graphics_state()
+    test_fill_extra_characters_on_array_rows()
+    test_window_writes_are_clipped()
+    print("bulk write tests completed")
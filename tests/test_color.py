@@ -0,0 +1,70 @@
+import copy
+import gc
+import pickle
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from libansiscreen.color import rgb
+from libansiscreen.color.rgb import Color
+from libansiscreen.color.palette import create_ansi_16_palette
+from libansiscreen.screen import DEFAULT_FG
+from libansiscreen.parser.sgr import DEFAULT_FG as SGR_DEFAULT_FG
+
+
+def test_colors_are_interned():
+    a = Color(10, 20, 30)
+    assert Color(10, 20, 30) is a
+    assert Color.from_packed(0x0A141E) is a
+    assert a.value == 0x0A141E
+    assert DEFAULT_FG is SGR_DEFAULT_FG is create_ansi_16_palette().index_to_rgb(7)
+
+
+def test_unused_colors_are_released():
+    kept = Color(10, 20, 31)
+    for value in range(1 << 16):
+        Color.from_packed(0x800000 + value)
+    gc.collect()
+    assert len(rgb._INTERN) <= rgb._INTERN_MAX
+    assert len(rgb._LIVE) < 2 * rgb._INTERN_MAX
+    # Colors in use stay interned
+    assert Color.from_packed(kept.value) is kept
+
+
+def test_value_semantics_kept():
+    a = Color(255, 0, 0)
+    assert a == Color(255, 0, 0)
+    assert a != Color(0, 255, 0)
+    assert {a: 1}[Color(255, 0, 0)] == 1
+    # None compares as black
+    assert Color(0, 0, 0) == None  # noqa: E711
+    assert a != None  # noqa: E711
+    assert a > None and not a < None
+    assert Color(255, 255, 255) > a > Color(0, 0, 0)
+    assert a.luminance() == pytest.approx(0.2126 * 255)
+
+
+def test_validation_and_immutability():
+    with pytest.raises(ValueError):
+        Color(256, 0, 0)
+    with pytest.raises(ValueError):
+        Color(0, -1, 0)
+    c = Color(1, 2, 3)
+    with pytest.raises(FrozenInstanceError):
+        c.r = 9
+
+
+def test_pickle_and_copy_keep_identity():
+    c = Color(4, 5, 6)
+    assert pickle.loads(pickle.dumps(c)) is c
+    assert copy.copy(c) is c
+    assert copy.deepcopy([c])[0] is c
+
+
+if __name__ == "__main__":
+    test_colors_are_interned()
+    test_unused_colors_are_released()
+    test_value_semantics_kept()
+    test_validation_and_immutability()
+    test_pickle_and_copy_keep_identity()
+    print("color tests completed")
@@ -0,0 +1,108 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from libansiscreen.screen import Screen
+from libansiscreen.parser.compiled import (
+    PUT_RUN,
+    SGR,
+    CompiledANSI,
+    cache_path,
+    compile_ansi,
+    load_compiled,
+)
+from libansiscreen.parser.sauce import load_ansi
+
+
+THETIS = Path(__file__).with_name("thetis.ans")
+
+SAMPLE = (
+    "plain \x1b[1;31mred\x1b[0m \x1b[38;2;10;20;30mrgb\x1b[48;5;200m bg\r\n"
+    "\x1b[5;10Hgoto\x1b[2Aup\x1b[3Cfwd\x1b[s\x1b[10;1Hx\x1b[u\x1b[K"
+    "\x1b[1m\x1b[0m\x1b[1mbold\n"
+    "line\x1b[J\x1b[2Jafter clear"
+)
+
+
+def cells(screen: Screen):
+    return [
+        [(c.char, c.fg, c.bg, c.attrs) for c in row]
+        for row in screen.rows
+    ]
+
+
+def parsed(data, width=80) -> Screen:
+    screen = Screen(width)
+    screen.print(data)
+    screen.parser.flush()
+    return screen
+
+
+def test_replay_matches_parse():
+    program = compile_ansi(SAMPLE)
+    direct = parsed(SAMPLE)
+    replayed = program.to_screen()
+    assert cells(replayed) == cells(direct)
+    assert (replayed.cursor.x, replayed.cursor.y) == (direct.cursor.x, direct.cursor.y)
+
+
+def test_runs_merged_and_states_interned():
+    program = compile_ansi("a\x1b[1mb\x1b[0m\x1b[31m\x1b[0mc\x1b[1md")
+    assert program.ops == [
+        (SGR, 0), (PUT_RUN, "a"),
+        (SGR, 1), (PUT_RUN, "b"),
+        (SGR, 0), (PUT_RUN, "c"),
+        (SGR, 1), (PUT_RUN, "d"),
+    ]
+    assert len(program.states) == 2
+
+
+def test_serialization_roundtrip():
+    program = compile_ansi(SAMPLE)
+    clone = CompiledANSI.from_bytes(program.to_bytes())
+    assert clone.ops == program.ops
+    assert clone.states == program.states
+    assert cells(clone.to_screen()) == cells(program.to_screen())
+
+
+def test_thetis_replay(path=THETIS):
+    screen, _ = load_ansi(path)
+    program = compile_ansi(Path(path).read_bytes())
+    assert cells(program.to_screen()) == cells(screen)
+
+
+def test_disk_cache_invalidation():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "menu.ans"
+        src.write_bytes(b"\x1b[32mhello\r\n")
+
+        first = load_compiled(src)
+        cpath = cache_path(src)
+        assert cpath.exists()
+
+        # Same mtime/size: served from the cache file
+        stamp = cpath.stat().st_mtime_ns
+        assert load_compiled(src).ops == first.ops
+        assert cpath.stat().st_mtime_ns == stamp
+
+        # Touched but unchanged: hash still matches
+        st = src.stat()
+        os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert load_compiled(src).ops == first.ops
+
+        # Same size, new content: recompiled
+        src.write_bytes(b"\x1b[31mjello\r\n")
+        os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10**9))
+        program = load_compiled(src)
+        assert (PUT_RUN, "jello") in program.ops
+        assert program.to_screen().get_cell(0, 0).char == "j"
+
+
+if __name__ == "__main__":
+    test_replay_matches_parse()
+    test_runs_merged_and_states_interned()
+    test_serialization_roundtrip()
+    test_thetis_replay(sys.argv[1] if len(sys.argv) > 1 else THETIS)
+    test_disk_cache_invalidation()
+    print("compiled tests completed")
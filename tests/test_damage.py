@@ -0,0 +1,113 @@
+from libansiscreen.cell import Cell
+from libansiscreen.color.rgb import Color
+from libansiscreen.screen import Screen
+from libansiscreen.screen_ops.clip import paste
+from libansiscreen.screen_ops.pixelplot import pixelplot
+
+
+def settled(width=20, height=5) -> Screen:
+    screen = Screen(width)
+    screen.ensure_height(height)
+    screen.take_damage()
+    return screen
+
+
+def test_new_rows_are_damage():
+    screen = Screen(10)
+    damage = screen.take_damage()
+    assert not damage and damage.generation == 0
+
+    screen.ensure_height(3)
+    damage = screen.take_damage()
+    assert damage
+    assert list(damage.dirty_rows()) == [0, 1, 2]
+    assert damage.span(2) == (0, 10)
+    assert not screen.take_damage()
+
+
+def test_writes_record_column_spans():
+    screen = settled()
+    screen.set_cell(4, 1, Cell("x"))
+    screen.set_cell(7, 1, Cell("y"))
+    screen.cursor_goto(2, 3)
+    screen.put_char("z")
+    damage = screen.take_damage()
+    assert list(damage.dirty_rows()) == [1, 3]
+    assert damage.span(1) == (4, 8)
+    assert damage.span(3) == (2, 3)
+    assert damage.span(0) == (0, 0)
+    assert damage.generation > damage.since == 0
+
+    since = damage.generation
+    screen.cursor_goto(15, 0)
+    screen.put_run("wrapping")
+    damage = screen.take_damage()
+    assert damage.since == since
+    assert damage.rows == {0: (15, 20), 1: (0, 3)}
+
+
+def test_clears_are_damage():
+    screen = settled()
+    screen.cursor_goto(5, 2)
+    screen.clear_to_end_of_line()
+    assert screen.take_damage().rows == {2: (5, 20)}
+
+    screen.clear_to_end_of_screen()
+    damage = screen.take_damage()
+    assert list(damage.dirty_rows()) == [2, 3, 4]
+    assert damage.span(4) == (0, 20)
+
+    screen.clear_row(0)
+    assert screen.take_damage().rows == {0: (0, 20)}
+
+    screen.clear_screen()
+    damage = screen.take_damage()
+    assert damage.full and list(damage.dirty_rows()) == [0, 1, 2, 3, 4]
+
+    screen.cls()
+    damage = screen.take_damage()
+    assert damage.full and damage.height == 0
+
+
+def test_parser_and_window_writes_are_damage():
+    screen = settled()
+    screen.print("\x1b[3;4Hab\x1b[K")
+    assert screen.take_damage().rows == {2: (3, 20)}
+
+    screen.window(6, 1, 4, 2).print("clipped text")
+    damage = screen.take_damage()
+    assert damage.rows == {1: (6, 10), 2: (6, 10)}
+
+
+def test_screen_ops_are_damage():
+    screen = settled()
+    pixelplot(screen, 3, 5, Color(255, 0, 0))
+    assert screen.take_damage().rows == {2: (3, 4)}
+
+    src = Screen(4)
+    src.print("abc\r\ndef")
+    assert src.height == 2
+    paste(screen, src, box=(10, 4, None, None))
+    damage = screen.take_damage()
+    assert damage.rows == {4: (10, 14), 5: (10, 14)}
+    assert damage.prev_height == 5 and damage.height == 6
+    assert list(damage.dirty_rows()) == [4, 5]
+
+
+def test_mark_dirty():
+    screen = settled()
+    screen.rows[1] = list(screen.rows[1])
+    screen.rows[1][0] = Cell("q")
+    screen.mark_dirty(1)
+    screen.mark_dirty(3, 2, 4)
+    assert screen.take_damage().rows == {1: (0, 20), 3: (2, 4)}
+
+
+if __name__ == "__main__":
+    test_new_rows_are_damage()
+    test_writes_record_column_spans()
+    test_clears_are_damage()
+    test_parser_and_window_writes_are_damage()
+    test_screen_ops_are_damage()
+    test_mark_dirty()
+    print("damage tests completed")
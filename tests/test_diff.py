@@ -0,0 +1,96 @@
+import pytest
+
+from libansiscreen.cell import Cell
+from libansiscreen.color.rgb import Color
+from libansiscreen.screen import Screen
+from libansiscreen.screen_ops.diff import (
+    DIFF_ATTRS, DIFF_BG, DIFF_CHAR, DIFF_FG, diff, diff_rows,
+)
+
+
+FRAME = (
+    "\x1b[1;33;44mheader line\x1b[0m\r\n"
+    "plain text row\r\n"
+    "\x1b[32mgreen \x1b[7minverse\x1b[0m tail\r\n"
+)
+
+
+def pair(backend):
+    old = Screen(30, backend=backend)
+    new = Screen(30, backend=backend)
+    old.print(FRAME)
+    new.print(FRAME)
+    return old, new
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_equal_screens(backend):
+    old, new = pair(backend)
+    assert diff(old, new) == {}
+    assert diff(old, old) == {}
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_change_spans_and_masks(backend):
+    old, new = pair(backend)
+    new.print("\x1b[1;1H\x1b[1;33;44mHEAD")             # chars only
+    new.put_cell(20, 1, char=None, fg=None, bg=Color(9, 9, 9), attrs=0)
+    new.print("\x1b[3;1H\x1b[0;1;32mgreen")           # attrs only
+    new.put_cell(7, 2, char="I", fg=Color(1, 1, 1), bg=Color(5, 5, 5), attrs=1)
+
+    result = diff(old, new)
+    assert result[0] == [(0, 4, DIFF_CHAR)]
+    assert result[1] == [(20, 21, DIFF_BG)]
+    assert result[2][0] == (0, 5, DIFF_ATTRS)
+    assert result[2][1] == (7, 8, DIFF_CHAR | DIFF_FG | DIFF_BG | DIFF_ATTRS)
+    assert sorted(result) == [0, 1, 2]
+
+
+def test_masks_match_cell_diff():
+    old, new = pair("list")
+    new.set_cell(3, 1, Cell("Q", Color(1, 2, 3), None, 0))
+    ((x0, x1, mask),) = diff(old, new)[1]
+    assert (x0, x1) == (3, 4)
+    assert mask == old.get_cell(3, 1).diff(new.get_cell(3, 1))
+
+
+def test_height_difference_compares_blank():
+    old, new = pair("list")
+    new.print("\x1b[6;3Hxy")
+    result = diff(old, new)
+    assert list(result) == [5]
+    assert result[5] == [(2, 4, DIFF_CHAR | DIFF_FG)]
+    assert diff(new, old)[5] == [(2, 4, DIFF_CHAR | DIFF_FG)]
+
+
+def test_rows_restricts_comparison():
+    old, new = pair("list")
+    new.take_damage()
+    new.print("\x1b[2;1Hx\x1b[3;1Hy")
+    damage = new.take_damage()
+    assert diff(old, new, rows=damage.dirty_rows()) == diff(old, new)
+    assert list(diff(old, new, rows=[2])) == [2]
+
+
+def test_shared_rows_are_skipped():
+    old, new = pair("list")
+    new.rows = list(old.rows)
+    assert diff_rows(old.rows[0], new.rows[0]) == []
+    assert diff(old, new) == {}
+
+
+def test_width_mismatch_rejected():
+    with pytest.raises(ValueError):
+        diff(Screen(10), Screen(11))
+
+
+if __name__ == "__main__":
+    for backend in ("list", "array"):
+        test_equal_screens(backend)
+        test_change_spans_and_masks(backend)
+    test_masks_match_cell_diff()
+    test_height_difference_compares_blank()
+    test_rows_restricts_comparison()
+    test_shared_rows_are_skipped()
+    test_width_mismatch_rejected()
+    print("diff tests completed")
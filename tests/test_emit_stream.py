@@ -0,0 +1,131 @@
+import io
+import sys
+from pathlib import Path
+
+from libansiscreen.renderer.ansi_emitter import ANSIEmitter, Box
+from libansiscreen.screen import Screen
+
+
+THETIS = Path(__file__).with_name("thetis.ans")
+
+
+class Sink:
+    """Binary sink that records each write and flush."""
+
+    def __init__(self):
+        self.writes = []
+        self.flushes = 0
+
+    def write(self, data):
+        self.writes.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        self.flushes += 1
+
+
+class CountingScreen(Screen):
+    reads = 0
+
+    def get_cell(self, x, y):
+        self.reads += 1
+        return super().get_cell(x, y)
+
+
+def load(path=THETIS) -> Screen:
+    screen = Screen(80)
+    screen.print(Path(path).read_bytes())
+    return screen
+
+
+def test_emit_iter_yields_rows(path=THETIS):
+    screen = load(path)
+    emitter = ANSIEmitter(dos_mode=True)
+    chunks = list(emitter.emit_iter(screen))
+    assert len(chunks) == screen.height
+    assert chunks[0].startswith("\x1b[0m")
+    assert all(chunk.endswith("\x1b[0m\n") for chunk in chunks)
+    assert "".join(chunks) == emitter.emit(screen)
+
+    box = Box(10, 5, 20, 3)
+    assert "".join(emitter.emit_iter(screen, box)) == emitter.emit(screen, box)
+    assert list(ANSIEmitter().emit_iter(Screen(10))) == ["\x1b[0m"]
+
+
+def test_first_row_is_ready_early():
+    screen = CountingScreen(40)
+    screen.print("a\r\n" * 100)
+    rows = ANSIEmitter().emit_iter(screen)
+    next(rows)
+    assert screen.reads == 40
+
+
+def test_emit_to_matches_emit(path=THETIS):
+    screen = load(path)
+    screen.print("\x1b[1;1Hé ü ✓")
+    emitter = ANSIEmitter()
+    expected = emitter.emit(screen).encode("utf-8", "surrogateescape")
+    buf = io.BytesIO()
+    assert emitter.emit_to(buf, screen) == len(expected)
+    assert buf.getvalue() == expected
+
+    cp437 = io.BytesIO()
+    dos = ANSIEmitter(dos_mode=True)
+    dos.emit_to(cp437, screen)
+    assert cp437.getvalue() == dos.emit_bytes(screen)
+
+
+def test_dos_mode_emits_cp437(path=THETIS):
+    screen = load(path)
+    emitter = ANSIEmitter(dos_mode=True)
+    data = emitter.emit_bytes(screen)
+    assert data == emitter.emit(screen).encode("cp437")
+    assert b"\xdb" in data
+    assert ANSIEmitter().emit_bytes(screen) == ANSIEmitter().emit(screen).encode("utf-8")
+    latin = ANSIEmitter(encoding="latin-1").emit_bytes(screen)
+    assert latin.count(b"?") > ANSIEmitter().emit_bytes(screen).count(b"?")
+
+
+def test_unmappable_glyphs_use_fallback():
+    screen = Screen(12)
+    screen.print("ok ✓ € ⌂ é")
+    emitter = ANSIEmitter(dos_mode=True, fallback={"✓": "v", "€": "∞€"})
+    row = emitter.emit_bytes(screen).split(b"\n")[0]
+    # "€" has no CP437 glyph and neither has its replacement
+    assert b"ok v ? \x7f \x82" in row
+    emitter.fallback = {"€": "E"}
+    assert b"ok ? E" in emitter.emit_bytes(screen)
+
+
+def test_flush_threshold():
+    screen = Screen(20)
+    screen.print("\x1b[31mrow\r\n" * 9 + "last")
+    emitter = ANSIEmitter()
+    expected = emitter.emit(screen).encode()
+
+    sink = Sink()
+    emitter.emit_to(sink, screen)
+    assert sink.writes == [expected]
+    assert sink.flushes == 1
+
+    sink = Sink()
+    emitter.emit_to(sink, screen, flush_threshold=0)
+    assert len(sink.writes) == screen.height
+    assert sink.flushes == screen.height + 1
+    assert b"".join(sink.writes) == expected
+
+    sink = Sink()
+    emitter.emit_to(sink, screen, flush_threshold=100)
+    assert all(len(w) >= 100 for w in sink.writes[:-1])
+    assert b"".join(sink.writes) == expected
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else THETIS
+    test_emit_iter_yields_rows(path)
+    test_first_row_is_ready_early()
+    test_emit_to_matches_emit(path)
+    test_dos_mode_emits_cp437(path)
+    test_unmappable_glyphs_use_fallback()
+    test_flush_threshold()
+    print("emit stream tests completed")
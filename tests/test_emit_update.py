@@ -0,0 +1,160 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+from libansiscreen.cell import ATTR_BOLD, ATTR_INVERSE, Cell
+from libansiscreen.color.rgb import Color
+from libansiscreen.color.palette import create_ansi_16_palette
+from libansiscreen.parser.sauce import load_ansi
+from libansiscreen.renderer.ansi_emitter import ANSIEmitter
+from libansiscreen.screen import Screen
+
+
+THETIS = Path(__file__).with_name("thetis.ans")
+
+MODES = [
+    {},
+    {"palette": create_ansi_16_palette()},
+    {"dos_mode": True},
+    {"dos_mode": True, "ice_mode": True},
+]
+
+
+def clone(screen: Screen) -> Screen:
+    out = Screen(screen.width)
+    out.rows = [list(row) for row in screen.rows]
+    return out
+
+
+def terminal(width: int, height: int, *chunks: str):
+    """What a terminal shows after the output chunks (parsed back)."""
+    # One spare column, so full rows do not wrap before their newline
+    term = Screen(width + 1)
+    for chunk in chunks:
+        term.print(chunk)
+    return [
+        [(c.char or " ", c.fg, c.bg, c.attrs) for c in term.rows[y][:width]]
+        for y in range(height)
+    ]
+
+
+def check(emitter: ANSIEmitter, prev: Screen, cur: Screen) -> str:
+    update = emitter.emit_update(prev, cur)
+    height = max(prev.height, cur.height)
+    shown = terminal(cur.width, height, "\x1b[H" + emitter.emit(prev), update)
+    expected = terminal(cur.width, height, "\x1b[H" + emitter.emit(cur))
+    assert shown == expected
+    return update
+
+
+def test_no_change_is_empty():
+    screen = Screen(20)
+    screen.print("\x1b[1;31mhello")
+    assert ANSIEmitter().emit_update(screen, screen) == ""
+    assert ANSIEmitter().emit_update(screen, clone(screen)) == ""
+
+
+def test_single_span():
+    prev = Screen(20)
+    prev.print("hello world\r\nsecond")
+    cur = clone(prev)
+    cur.print("\x1b[2;3H\x1b[32mXY")
+    update = check(ANSIEmitter(), prev, cur)
+    assert update == "\x1b[0m\x1b[2;3H\x1b[32mXY\x1b[0m"
+
+
+def test_short_gap_is_reprinted():
+    prev = Screen(20)
+    prev.print("abcdefgh")
+    cur = clone(prev)
+    cur.put_cell(1, 0, char="B", fg=Color(170, 170, 170), bg=Color(0, 0, 0))
+    cur.put_cell(3, 0, char="D", fg=Color(170, 170, 170), bg=Color(0, 0, 0))
+    update = check(ANSIEmitter(), prev, cur)
+    # Rewriting "c" is cheaper than a cursor move
+    assert update == "\x1b[0m\x1b[1;2HBcD"
+
+
+def test_relative_moves():
+    prev = Screen(40)
+    prev.ensure_height(5)
+    cur = clone(prev)
+    cur.print("\x1b[1;1Ha\x1b[1;30Hb\x1b[2;1Hc\x1b[4;2Hd")
+    update = check(ANSIEmitter(), prev, cur)
+    assert "\x1b[28C" in update        # forward on the same row
+    assert "\r\n" in update            # next row, column 0
+    assert update.count("H") == 1      # only the first move is absolute
+
+
+def test_attributes_turn_off():
+    prev = Screen(10)
+    prev.print("\x1b[1maaaa")
+    cur = clone(prev)
+    cur.put_cell(1, 0, char="b", fg=Color(170, 170, 170), bg=Color(0, 0, 0), attrs=ATTR_INVERSE)
+    cur.put_cell(2, 0, char="c", fg=Color(170, 170, 170), bg=Color(0, 0, 0), attrs=ATTR_BOLD)
+    check(ANSIEmitter(), prev, cur)
+
+
+def test_inherited_colors_resolve_along_the_row():
+    prev = Screen(10)
+    prev.print("\x1b[31mab")
+    cur = clone(prev)
+    # b inherits its fg from the cell before it
+    cur.rows[0][1] = Cell("b", None, Color(0, 0, 0), 0)
+    cur.mark_dirty(0, 1, 2)
+    update = check(ANSIEmitter(), prev, cur)
+    assert update == ""
+    cur.set_cell(0, 0, Cell("a", Color(0, 0, 170), Color(0, 0, 0), 0))
+    check(ANSIEmitter(), prev, cur)
+
+
+def test_rows_restricts_update():
+    prev = Screen(10)
+    prev.ensure_height(4)
+    cur = clone(prev)
+    cur.take_damage()
+    cur.print("\x1b[3;2Hxyz")
+    update = ANSIEmitter().emit_update(prev, cur, rows=cur.take_damage().dirty_rows())
+    assert update == ANSIEmitter().emit_update(prev, cur)
+
+
+def test_width_mismatch_rejected():
+    with pytest.raises(ValueError):
+        ANSIEmitter().emit_update(Screen(10), Screen(12))
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_random_updates_match_full_frames(mode, path=THETIS):
+    rng = random.Random(7)
+    base, _ = load_ansi(path)
+    emitter = ANSIEmitter(**mode)
+    colors = [Color(170, 0, 0), Color(255, 255, 85), Color(12, 34, 56), Color(0, 0, 170)]
+    full = update = 0
+    for _ in range(4):
+        cur = clone(base)
+        for _ in range(rng.choice([1, 5, 40])):
+            cur.put_cell(
+                rng.randrange(cur.width), rng.randrange(cur.height),
+                char=rng.choice("ab█ #"),
+                fg=rng.choice(colors), bg=rng.choice(colors + [Color(0, 0, 0)]),
+                attrs=rng.choice([0, 0, ATTR_BOLD, ATTR_INVERSE]),
+            )
+        cur.print("\x1b[11;4H\x1b[1;44;33mstatus text here")
+        update += len(check(emitter, base, cur))
+        full += len(emitter.emit(cur))
+    assert full >= 10 * update
+
+
+if __name__ == "__main__":
+    test_no_change_is_empty()
+    test_single_span()
+    test_short_gap_is_reprinted()
+    test_relative_moves()
+    test_attributes_turn_off()
+    test_inherited_colors_resolve_along_the_row()
+    test_rows_restricts_update()
+    test_width_mismatch_rejected()
+    for mode in MODES:
+        test_random_updates_match_full_frames(mode, sys.argv[1] if len(sys.argv) > 1 else THETIS)
+    print("emit_update tests completed")
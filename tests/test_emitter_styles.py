@@ -0,0 +1,93 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from libansiscreen.cell import Cell
+from libansiscreen.color.palette import create_ansi_16_palette, create_ansi_256_palette
+from libansiscreen.renderer import ansi_emitter
+from libansiscreen.renderer.ansi_emitter import ANSIEmitter, AnsiColorState, TerminalState
+from libansiscreen.screen import Screen
+
+
+THETIS = Path(__file__).with_name("thetis.ans")
+
+MODES = [
+    {},
+    {"palette": create_ansi_256_palette()},
+    {"palette": create_ansi_16_palette()},
+    {"dos_mode": True},
+    {"dos_mode": True, "ice_mode": True},
+]
+
+
+def reference_emit(emitter: ANSIEmitter, screen: Screen) -> str:
+    """emit() without the style table: compile and diff every cell."""
+    out = ["\x1b[0m"]
+    prev = TerminalState(AnsiColorState("ansi16", (7,)), AnsiColorState("ansi16", (0,)), 0)
+    for y in range(screen.height):
+        for x in range(screen.width):
+            cell = screen.get_cell(x, y) or Cell()
+            seq, prev = emitter._emit_transition(prev, emitter._compile_cell(prev, cell))
+            out.append(seq)
+            ch = "█" if emitter._dos_colors_match(prev.fg, prev.bg) else cell.char
+            out.append(ch or " ")
+        out.append("\x1b[0m\n")
+        prev = TerminalState(AnsiColorState("ansi16", (7, 0)), AnsiColorState("ansi16", (0, 0)), 0)
+    return "".join(out)
+
+
+def load(path=THETIS) -> Screen:
+    screen = Screen(80)
+    screen.print(Path(path).read_bytes())
+    return screen
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_matches_per_cell_reference(mode, path=THETIS):
+    screen = load(path)
+    emitter = ANSIEmitter(optimize_sgr=False, **mode)
+    expected = reference_emit(ANSIEmitter(**mode), screen)
+    assert emitter.emit(screen) == expected
+    # Second run is served from the warm table
+    assert emitter.emit(screen) == expected
+
+
+def test_states_are_interned_once():
+    screen = load()
+    emitter = ANSIEmitter()
+    emitter.emit(screen)
+    table = emitter._table
+    states = len(table.states)
+    emitter.emit(screen)
+    assert emitter._table is table
+    assert len(table.states) == states
+    assert len(set(table.states)) == states
+
+
+def test_reconfiguring_rebuilds_the_table():
+    screen = load()
+    emitter = ANSIEmitter()
+    emitter.emit(screen)
+    emitter.dos_mode = True
+    assert emitter.emit(screen) == ANSIEmitter(dos_mode=True).emit(screen)
+    emitter.palette = create_ansi_16_palette()
+    assert emitter.emit(screen) == ANSIEmitter(dos_mode=True, palette=emitter.palette).emit(screen)
+
+
+def test_bounded_memos_give_same_output(monkeypatch):
+    screen = load()
+    expected = ANSIEmitter().emit(screen)
+    monkeypatch.setattr(ansi_emitter._StyleTable, "MAX_MEMO", 8)
+    emitter = ANSIEmitter()
+    assert emitter.emit(screen) == expected
+    assert len(emitter._table.transitions) <= 8
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else THETIS
+    for mode in MODES:
+        test_matches_per_cell_reference(mode, path)
+    test_states_are_interned_once()
+    test_reconfiguring_rebuilds_the_table()
+    print("emitter style tests completed")
@@ -0,0 +1,87 @@
+import pytest
+
+from libansiscreen.cell import Cell
+from libansiscreen.color.rgb import Color
+from libansiscreen.screen import Screen
+
+
+FRAME = (
+    "\x1b[1;33;44mheader\x1b[0m\r\n"
+    "\x1b[38;2;1;2;3mtruecolor é\r\n"
+    "\x1b[7mwrapping text that runs past the edge"
+)
+
+
+def build(backend="list") -> Screen:
+    screen = Screen(20, backend=backend)
+    screen.print(FRAME)
+    return screen
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_equal_content_equal_hashes(backend):
+    a, b = build(backend), build(backend)
+    assert [a.row_hash(y) for y in range(a.height)] == [
+        b.row_hash(y) for y in range(b.height)
+    ]
+    assert a.digest() == b.digest()
+    # Rows past the end hash as blank
+    assert a.row_hash(100) == Screen(20, backend=backend).row_hash(0)
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_writes_invalidate_hashes(backend):
+    a, b = build(backend), build(backend)
+    before = a.digest()
+    a.put_cell(3, 1, char="#", fg=Color(1, 1, 1), bg=Color(2, 2, 2))
+    assert a.row_hash(1) != b.row_hash(1)
+    assert a.row_hash(0) == b.row_hash(0)
+    assert a.digest() != before
+
+    a.window(0, 2, 5, 1).print("zzzzz")
+    assert a.row_hash(2) != b.row_hash(2)
+
+    a.clear_screen()
+    b.clear_screen()
+    assert a.digest() == b.digest()
+
+
+def test_inherit_and_black_hash_differently():
+    a, b = Screen(4), Screen(4)
+    a.set_cell(0, 0, Cell("x", None, Color(0, 0, 0), 0))
+    b.set_cell(0, 0, Cell("x", Color(0, 0, 0), Color(0, 0, 0), 0))
+    # Cell equality treats None as black, the hash does not
+    assert a.get_cell(0, 0) == b.get_cell(0, 0)
+    assert a.row_hash(0) != b.row_hash(0)
+
+
+def test_frame_dedupe():
+    frames = []
+    seen = set()
+    screen = Screen(10)
+    for text in ["one", "two", "two", "one", "three"]:
+        screen.cls()
+        screen.print(text)
+        if screen.digest() not in seen:
+            seen.add(screen.digest())
+            frames.append(text)
+    assert frames == ["one", "two", "three"]
+
+
+def test_direct_row_writes_need_mark_dirty():
+    screen = build()
+    h = screen.row_hash(0)
+    screen.rows[0][0] = Cell("Q")
+    assert screen.row_hash(0) == h
+    screen.mark_dirty(0, 0, 1)
+    assert screen.row_hash(0) != h
+
+
+if __name__ == "__main__":
+    for backend in ("list", "array"):
+        test_equal_content_equal_hashes(backend)
+        test_writes_invalidate_hashes(backend)
+    test_inherit_and_black_hash_differently()
+    test_frame_dedupe()
+    test_direct_row_writes_need_mark_dirty()
+    print("hash tests completed")
@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+
+from libansiscreen.parser.index import ANSIIndex
+from libansiscreen.parser.sauce import load_ansi
+
+
+THETIS = Path(__file__).with_name("thetis.ans")
+
+
+def cells(rows):
+    return [[(c.char, c.fg, c.bg, c.attrs) for c in row] for row in rows]
+
+
+def synthetic() -> bytes:
+    parts = []
+    for i in range(300):
+        parts.append(f"\x1b[{31 + i % 7}mline {i} ünïcödé ░▒▓ ".encode("utf-8") * 2)
+        parts.append(b"\r\n")
+        if i % 50 == 10:
+            # Jump back up and overwrite, save/restore around it
+            parts.append(b"\x1b[s\x1b[%d;5H\x1b[1;44mPATCH\x1b[K\x1b[u" % (i - 5))
+        if i % 90 == 45:
+            parts.append(b"\x1b[3A\x1b[0J\x1b[0m")
+    parts.append(b"\x1b[2J\x1b[0mafter clear\r\n")
+    for i in range(40):
+        parts.append(b"tail %d\r\n" % i)
+    return b"".join(parts)
+
+
+def check_windows(data, width=80, interval=256, height=25, step=7, codec=None):
+    screen, _ = load_ansi(data, width=width, codec=codec)
+    with ANSIIndex(data, width=width, interval=interval, codec=codec) as index:
+        assert index.height == screen.height
+        for top in range(0, screen.height, step):
+            view = index.viewport(top, height)
+            expected = screen.rows[top:top + height]
+            assert view.height == len(expected)
+            assert cells(view.rows) == cells(expected), top
+
+
+def test_synthetic_viewports():
+    check_windows(synthetic())
+
+
+def test_narrow_width_wraps():
+    check_windows(synthetic(), width=33, interval=97, height=10, step=5)
+
+
+def test_replay_is_bounded():
+    data = synthetic()
+    with ANSIIndex(data, interval=512) as index:
+        assert len(index.checkpoints) > 10
+        segs = index.segments_for(60, 25)
+        assert sum(cp.end - cp.offset for cp in segs) < len(data) // 4
+
+
+def test_lru():
+    with ANSIIndex(synthetic(), cache_size=2) as index:
+        a = index.viewport(0)
+        assert index.viewport(0) is a
+        index.viewport(25)
+        index.viewport(50)
+        assert index.viewport(0) is not a
+
+
+def test_rep_at_segment_start():
+    # Every line ends in REP; 13-byte segments start on some of them
+    data = b"".join(b"%02d=\x1b[9b\r\n" % i for i in range(40))
+    with ANSIIndex(data, interval=13) as index:
+        assert any(data[cp.offset:cp.offset + 2] == b"\x1b[" for cp in index.checkpoints)
+    check_windows(data, interval=13, height=5, step=3)
+
+
+def test_thetis_viewports(path=THETIS):
+    check_windows(Path(path).read_bytes(), interval=1024, step=11)
+    with ANSIIndex(path) as index:
+        screen, _ = load_ansi(path)
+        assert cells(index.viewport(3, 10).rows) == cells(screen.rows[3:13])
+
+
+if __name__ == "__main__":
+    test_synthetic_viewports()
+    test_narrow_width_wraps()
+    test_replay_is_bounded()
+    test_lru()
+    test_rep_at_segment_start()
+    test_thetis_viewports(sys.argv[1] if len(sys.argv) > 1 else THETIS)
+    print("index tests completed")
@@ -0,0 +1,296 @@
+import io
+import mmap
+import tempfile
+
+import pytest
+
+from libansiscreen.screen import Screen
+from libansiscreen.parser.ansi_parser import ANSIParser, parse_stream
+from libansiscreen.color.rgb import Color
+from libansiscreen.cell import ATTR_BOLD
+
+
+# ------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------
+
+def cells(screen: Screen):
+    return [
+        [(c.char, c.fg, c.bg, c.attrs) for c in row]
+        for row in screen.rows
+    ]
+
+
+def reference_screen(width: int, text: str) -> Screen:
+    """
+    Per-character reference: what the parser produced before the
+    run fast path existed.
+    """
+    screen = Screen(width)
+    for ch in text:
+        if ch == "\n":
+            screen.newline()
+        elif ch == "\r":
+            screen.carriage_return()
+        else:
+            screen.put_char(ch)
+    return screen
+
+
+# ------------------------------------------------------------
+# Text runs
+# ------------------------------------------------------------
+
+def test_run_matches_per_char_reference():
+    text = "Hello, world!\r\n" + "x" * 25 + "\nwrap here\r\n"
+    screen = Screen(10)
+    ANSIParser(screen).feed(text)
+    ref = reference_screen(10, text)
+    assert cells(screen) == cells(ref)
+    assert (screen.cursor.x, screen.cursor.y) == (ref.cursor.x, ref.cursor.y)
+
+
+def test_run_wraps_at_width():
+    screen = Screen(4)
+    screen.print("abcdefghij")
+    assert "".join(c.char for c in screen.rows[0]) == "abcd"
+    assert "".join(c.char for c in screen.rows[1]) == "efgh"
+    assert screen.get_cell(0, 2).char == "i"
+    assert (screen.cursor.x, screen.cursor.y) == (2, 2)
+
+
+def test_run_exact_width_moves_to_next_row():
+    screen = Screen(4)
+    screen.print("abcd")
+    assert (screen.cursor.x, screen.cursor.y) == (0, 1)
+    assert screen.height == 2
+
+
+def test_run_keeps_graphics_state():
+    screen = Screen(20)
+    screen.print("\x1b[1;31;44mred\x1b[0mplain")
+    red = screen.get_cell(0, 0)
+    assert red.char == "r"
+    assert red.attrs == ATTR_BOLD
+    assert red.fg == Color(0xaa, 0x00, 0x00)
+    assert red.bg == Color(0x00, 0x00, 0xaa)
+    plain = screen.get_cell(3, 0)
+    assert plain.char == "p"
+    assert plain.attrs == 0
+    assert plain.fg == Color(0xaa, 0xaa, 0xaa)
+
+
+def test_put_text_uses_runs():
+    screen = Screen(8)
+    screen.put_text("ab\r\ncd\rX")
+    assert screen.get_cell(0, 1).char == "X"
+    assert screen.get_cell(1, 1).char == "d"
+
+
+def test_run_cells_are_read_only():
+    screen = Screen(8)
+    screen.print("\x1b[31maa")
+    cell = screen.get_cell(0, 0)
+    with pytest.raises(AttributeError):
+        cell.fg = Color(0, 0, 170)
+    changed = cell.copy()
+    changed.fg = Color(0, 0, 170)
+    screen.set_cell(0, 0, changed)
+    screen.print("a")
+    assert screen.get_cell(0, 0).fg == Color(0, 0, 170)
+    assert screen.get_cell(1, 0).fg == Color(170, 0, 0)
+    assert screen.get_cell(2, 0).fg == Color(170, 0, 0)
+
+
+# ------------------------------------------------------------
+# Byte-level input
+# ------------------------------------------------------------
+
+def test_bytes_utf8_matches_str():
+    text = "\x1b[33mé█ box\x1b[0m\r\nnext"
+    a = Screen(20)
+    ANSIParser(a).feed(text)
+    b = Screen(20)
+    ANSIParser(b).feed(text.encode("utf-8"))
+    assert cells(a) == cells(b)
+
+
+def test_cp437_box_drawing():
+    screen = Screen(10)
+    ANSIParser(screen, codec="cp437").feed(b"\xc9\xcd\xbb\x1b[1m\xdb\xb0")
+    chars = "".join(screen.get_cell(x, 0).char for x in range(5))
+    assert chars == "╔═╗█░"
+    assert screen.get_cell(3, 0).attrs == ATTR_BOLD
+
+
+def test_latin1_codec():
+    screen = Screen(10)
+    ANSIParser(screen, codec="latin-1").feed(b"caf\xe9")
+    assert screen.get_cell(3, 0).char == "é"
+
+
+def test_encoding_override_per_feed():
+    screen = Screen(10)
+    ANSIParser(screen).feed(b"\xdb", encoding="cp437")
+    assert screen.get_cell(0, 0).char == "█"
+
+
+def test_memoryview_and_mmap_input():
+    data = b"\x1b[31mhello\r\n\x1b[44mworld"
+    ref = Screen(20)
+    ANSIParser(ref).feed(data)
+
+    mv = Screen(20)
+    ANSIParser(mv).feed(memoryview(data))
+    assert cells(mv) == cells(ref)
+
+    with tempfile.TemporaryFile() as f:
+        f.write(data)
+        f.flush()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            mapped = Screen(20)
+            ANSIParser(mapped).feed(mm)
+    assert cells(mapped) == cells(ref)
+
+
+def test_unknown_codec_rejected():
+    with pytest.raises(ValueError):
+        ANSIParser(Screen(10), codec="ebcdic")
+
+
+# ------------------------------------------------------------
+# Streaming / chunk boundaries
+# ------------------------------------------------------------
+
+SAMPLE = (
+    "\x1b[1;31mRed \x1b[38;2;1;2;3mtrue ▀▄█ é\x1b[0m\r\n"
+    "\x1b[5Cmoved\x1b[44m bg \x1b[2Aup\x1b7saved\x1b8"
+).encode("utf-8")
+
+
+def test_csi_split_across_print_calls():
+    screen = Screen(10)
+    screen.print("\x1b[3")
+    screen.print("1mX")
+    cell = screen.get_cell(0, 0)
+    assert cell.char == "X"
+    assert cell.fg == Color(0xaa, 0x00, 0x00)
+
+
+def test_screen_keeps_one_parser():
+    screen = Screen(10)
+    screen.print("a")
+    parser = screen.parser
+    screen.print("b")
+    assert screen.parser is parser
+
+
+def test_every_chunk_size_matches_one_shot():
+    ref = Screen(20)
+    ANSIParser(ref).feed(SAMPLE)
+    for size in range(1, 8):
+        screen = Screen(20)
+        for i in range(0, len(SAMPLE), size):
+            screen.print(SAMPLE[i:i + size])
+        screen.parser.flush()
+        assert cells(screen) == cells(ref), size
+
+
+def test_flush_writes_dangling_partial_char():
+    screen = Screen(10)
+    screen.print("é".encode("utf-8")[:1])
+    assert screen.get_cell(0, 0).char is None
+    screen.parser.flush()
+    assert screen.get_cell(0, 0).char is not None
+    assert (screen.cursor.x, screen.cursor.y) == (1, 0)
+
+
+def test_parse_stream_binary_and_text():
+    ref = Screen(20)
+    ANSIParser(ref).feed(SAMPLE)
+    binary = parse_stream(io.BytesIO(SAMPLE), width=20, chunk_size=3)
+    assert cells(binary) == cells(ref)
+    text = parse_stream(io.StringIO(SAMPLE.decode("utf-8")), width=20, chunk_size=5)
+    assert cells(text) == cells(ref)
+
+
+CONTROL_NOISE = (
+    "\x1b]0;window title\x07"
+    "A\x1b]8;;https://example.com/\x1b\\link\x1b]8;;\x1b\\"
+    "\x1b[?25l\x1b[?1049h\x1b[>4;1m\x1b[38:2::1:2:3m\x1b[ q"
+    "\x1b(B\x1bPq#0;2;0;0;0" + "~-" * 4000 + "\x1b\\"
+    "\x1b_apc payload\x1b\\\x1b^pm\x1b\\\x1bXsos\x1b\\"
+    "\x1b[1;31mB\x1b[0m\r\n"
+)
+
+
+def test_control_strings_and_private_csi_skipped():
+    clean = Screen(20)
+    clean.print("Alink\x1b[1;31mB\x1b[0m\r\n")
+    for data in (CONTROL_NOISE, CONTROL_NOISE.encode("utf-8")):
+        screen = Screen(20)
+        screen.print(data)
+        assert cells(screen) == cells(clean)
+
+
+def test_control_strings_split_across_chunks():
+    ref = Screen(20)
+    ref.print(CONTROL_NOISE)
+    data = CONTROL_NOISE.encode("utf-8")
+    for size in (1, 2, 3, 7, 64):
+        screen = Screen(20)
+        for i in range(0, len(data), size):
+            screen.print(data[i:i + size])
+        assert cells(screen) == cells(ref), size
+
+
+def test_string_aborted_by_escape():
+    screen = Screen(10)
+    screen.print("\x1b]2;unterminated\x1b[1mX")
+    assert screen.get_cell(0, 0).char == "X"
+    assert screen.get_cell(0, 0).attrs == ATTR_BOLD
+
+
+def test_rep_repeats_last_character():
+    expected = Screen(10)
+    expected.print("abbbb\x1b[31mbbc")
+    for data in ("ab\x1b[3b\x1b[31m\x1b[2bc", "ab\x1b[3b\x1b[31m\x1b[2bc".encode("utf-8")):
+        screen = Screen(10)
+        screen.print(data)
+        assert cells(screen) == cells(expected)
+    screen = Screen(10)
+    screen.print("\x1b[5b█\x1b[b")
+    assert [screen.get_cell(x, 0).char for x in range(3)] == ["█", "█", None]
+
+
+def test_rep_count_is_clamped():
+    screen = Screen(80)
+    screen.print("x\x1b[50000000b")
+    # The first x plus 65535 repeats
+    assert (screen.height, screen.cursor.x) == (65536 // 80 + 1, 65536 % 80)
+
+
+if __name__ == "__main__":
+    test_run_matches_per_char_reference()
+    test_run_wraps_at_width()
+    test_run_exact_width_moves_to_next_row()
+    test_run_keeps_graphics_state()
+    test_put_text_uses_runs()
+    test_run_cells_are_read_only()
+    test_bytes_utf8_matches_str()
+    test_cp437_box_drawing()
+    test_latin1_codec()
+    test_encoding_override_per_feed()
+    test_memoryview_and_mmap_input()
+    test_unknown_codec_rejected()
+    test_csi_split_across_print_calls()
+    test_screen_keeps_one_parser()
+    test_every_chunk_size_matches_one_shot()
+    test_flush_writes_dangling_partial_char()
+    test_parse_stream_binary_and_text()
+    test_control_strings_and_private_csi_skipped()
+    test_control_strings_split_across_chunks()
+    test_string_aborted_by_escape()
+    test_rep_repeats_last_character()
+    test_rep_count_is_clamped()
+    print("parser tests completed")
@@ -0,0 +1,200 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+from libansiscreen.cell import (
+    ATTR_BLINK,
+    ATTR_BOLD,
+    ATTR_FAINT,
+    ATTR_INVERSE,
+    ATTR_STRIKE,
+    ATTR_UNDERLINE,
+)
+from libansiscreen.color.palette import create_ansi_16_palette, create_ansi_256_palette
+from libansiscreen.color.quantize import quantize_exact
+from libansiscreen.color.rgb import Color
+from libansiscreen.renderer.ansi_emitter import ANSIEmitter, Box
+from libansiscreen.renderer.row_compressor import RowCompression
+from libansiscreen.screen import Screen
+
+
+THETIS = Path(__file__).with_name("thetis.ans")
+PALETTE_16 = create_ansi_16_palette()
+GRAY, BLACK = Color(170, 170, 170), Color(0, 0, 0)
+VISIBLE = ATTR_INVERSE | ATTR_UNDERLINE | ATTR_STRIKE
+
+MODES = {
+    "truecolor": {},
+    "ansi256": {"palette": create_ansi_256_palette()},
+    "ansi16": {"palette": PALETTE_16},
+    "dos": {"dos_mode": True},
+    "dos+ice": {"dos_mode": True, "ice_mode": True},
+    "dos, no sgr optimizer": {"dos_mode": True, "optimize_sgr": False},
+    "no trim": {"compression": RowCompression(trim=False)},
+    "rep only": {"compression": RowCompression(trim=False, forward=False, repeat=True)},
+}
+
+
+def art(seed: int) -> Screen:
+    """Block art: colored shapes of repeated glyphs on a black field."""
+    rng = random.Random(seed)
+    colors = [Color(170, 0, 0), Color(0, 170, 170), Color(85, 85, 255), GRAY, BLACK]
+    screen = Screen(40)
+    for y in range(16):
+        x = 0
+        while x < 40:
+            n = rng.randint(1, 12)
+            if rng.random() < 0.5:
+                cell = dict(char=" ", fg=GRAY, bg=BLACK, attrs=0)
+            else:
+                cell = dict(char=rng.choice("█▀▄░#="), fg=rng.choice(colors),
+                            bg=rng.choice(colors), attrs=rng.choice([0, 0, ATTR_BOLD, ATTR_BLINK]))
+            for i in range(x, min(x + n, 40)):
+                screen.put_cell(i, y, **cell)
+            x += n
+    return screen
+
+
+def corpus(path=THETIS):
+    screen = Screen(80)
+    screen.print(Path(path).read_bytes())
+    yield Path(path).name, screen
+    for n in range(4):
+        yield f"art-{n}", art(n)
+
+
+def shown(text: str, width: int, height: int, dos: bool):
+    """Parse emitted text back; cells that look cleared compare equal."""
+    screen = Screen(width + 1)
+    screen.print(text)
+    cells = []
+    for y in range(height):
+        for x in range(width):
+            c = screen.get_cell(x, y)
+            fg = quantize_exact(c.fg, PALETTE_16) if c.fg else 7
+            bg = quantize_exact(c.bg, PALETTE_16) if c.bg else 0
+            char = c.char or " "
+            if dos:
+                bright = fg >= 8 or bool(c.attrs & ATTR_BOLD)
+                if char == "█" and fg == bg and not bright:
+                    char = " "
+                cell = (char, fg & 7, bright, bg & 7, bool(c.attrs & ATTR_BLINK),
+                        c.attrs & ~(ATTR_BOLD | ATTR_FAINT | ATTR_BLINK))
+            else:
+                cell = (char, c.fg, c.bg, c.attrs)
+            if char == " " and bg == 0 and not c.attrs & VISIBLE:
+                cell = None
+            cells.append(cell)
+    return cells
+
+
+def savings(mode, path=THETIS):
+    """(name, plain bytes, compressed bytes) per corpus file."""
+    encode = ANSIEmitter(**mode)._encode()
+    result = []
+    for name, screen in corpus(path):
+        plain = ANSIEmitter(**mode).emit(screen)
+        packed = ANSIEmitter(compress=True, **mode).emit(screen)
+        size = (screen.width, screen.height, mode.get("dos_mode", False))
+        assert shown(packed, *size) == shown(plain, *size), name
+        result.append((name, len(encode(plain)), len(encode(packed))))
+    return result
+
+
+@pytest.mark.parametrize("name", list(MODES))
+def test_corpus_savings(name, path=THETIS):
+    result = savings(MODES[name], path)
+    for file, plain, packed in result:
+        assert packed <= plain, file
+        print(f"{name:22} {file:12} {plain:8} -> {packed:8} "
+              f"({100 * (plain - packed) / plain:.1f}% saved)")
+    if MODES[name].get("dos_mode"):
+        # Block art in DOS mode: at least a quarter smaller
+        assert sum(p for _, _, p in result) * 4 < sum(p for _, p, _ in result) * 3
+
+
+def emit_row(text: str, width: int = 40, **mode) -> str:
+    screen = Screen(width)
+    screen.print(text)
+    return ANSIEmitter(compress=True, **mode).emit(screen)
+
+
+def test_trailing_blanks_and_blank_runs():
+    assert emit_row("ab") == "\x1b[0mab\n"
+    assert emit_row("a" + " " * 10 + "b", dos_mode=True) == "\x1b[0ma\x1b[10Cb\n"
+    assert emit_row("a" + " " * 20 + "b") == "\x1b[0ma\x1b[20Cb\n"
+    # A single space is cheaper than CUF
+    assert emit_row("a b") == "\x1b[0ma b\n"
+    # Spaces on a colored background are drawn
+    assert emit_row("\x1b[41m   \x1b[0mx") == "\x1b[0m\x1b[41m   \x1b[0mx\n"
+    assert emit_row("\x1b[4mu   \x1b[0m") == "\x1b[0m\x1b[4mu   \x1b[0m\n"
+    assert emit_row(" \r\nx") == "\x1b[0m\nx\n"
+
+
+def test_bright_solid_blocks_are_drawn():
+    # Bold black and bright black blocks are dark gray, not cleared
+    for text in ("\x1b[1;30m█████\x1b[0mX\x1b[1;30m████", "\x1b[90;100m███\x1b[0mX",
+                 "\x1b[1;30;40m   \x1b[0mX"):
+        for mode in ({}, {"dos_mode": True}, {"dos_mode": True, "ice_mode": True}):
+            screen = Screen(10)
+            screen.print(text)
+            plain = ANSIEmitter(**mode).emit(screen)
+            packed = ANSIEmitter(compress=True, **mode).emit(screen)
+            size = (10, 1, mode.get("dos_mode", False))
+            assert shown(packed, *size) == shown(plain, *size), (text, mode)
+    assert emit_row("\x1b[1;30m█████\x1b[0mX\x1b[1;30m████", dos_mode=True) == \
+        "\x1b[0m\x1b[1;30m█████\x1b[0mX\x1b[1;30m████\x1b[0m\n"
+    assert emit_row("\x1b[1;30m███\x1b[0mX") == "\x1b[0m\x1b[1;30m█\x1b[2b\x1b[0mX\n"
+    # Plain black blocks still look cleared
+    assert emit_row("\x1b[30;40m███\x1b[0mX", dos_mode=True) == "\x1b[0m\x1b[3CX\n"
+
+
+def test_blank_runs_priced_in_output_bytes():
+    # A black-on-black DOS block: one byte in CP437, three in UTF-8
+    text = "\x1b[31mR\x1b[30m \x1b[44mB"
+    assert emit_row(text, dos_mode=True) == "\x1b[0m\x1b[31mR\x1b[30m█\x1b[44mB\x1b[0m\n"
+    assert emit_row(text, dos_mode=True, encoding="utf-8") == \
+        "\x1b[0m\x1b[31mR\x1b[C\x1b[30;44mB\x1b[0m\n"
+
+
+def test_rep_decided_by_byte_cost():
+    assert emit_row("=" * 20) == "\x1b[0m=\x1b[19b\n"
+    assert emit_row("aaaa") == "\x1b[0maaaa\n"
+    # Three bytes per block in UTF-8, one in CP437
+    assert emit_row("███") == "\x1b[0m█\x1b[2b\n"
+    assert emit_row("███", compression=RowCompression(repeat=True), dos_mode=True) == "\x1b[0m███\n"
+    assert emit_row("=" * 20, dos_mode=True) == "\x1b[0m" + "=" * 20 + "\n"
+
+
+def test_compressed_rows_stream():
+    screen = next(corpus())[1]
+    emitter = ANSIEmitter(dos_mode=True, compress=True)
+    chunks = list(emitter.emit_iter(screen))
+    assert len(chunks) == screen.height
+    assert emitter.emit_bytes(screen) == "".join(chunks).encode("cp437")
+    box = Box(10, 5, 20, 3)
+    plain = ANSIEmitter(dos_mode=True).emit(screen, box)
+    assert shown(emitter.emit(screen, box), 20, 3, True) == shown(plain, 20, 3, True)
+
+
+def test_row_compression_defaults():
+    assert ANSIEmitter().row_compression() is None
+    assert ANSIEmitter(compress=True).row_compression() == RowCompression(repeat=True)
+    assert ANSIEmitter(compress=True, dos_mode=True).row_compression() == RowCompression()
+    custom = RowCompression(forward=False)
+    assert ANSIEmitter(compress=True, compression=custom).row_compression() is custom
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else THETIS
+    for name in MODES:
+        test_corpus_savings(name, path)
+    test_trailing_blanks_and_blank_runs()
+    test_bright_solid_blocks_are_drawn()
+    test_blank_runs_priced_in_output_bytes()
+    test_rep_decided_by_byte_cost()
+    test_compressed_rows_stream()
+    test_row_compression_defaults()
+    print("row compressor tests completed")
@@ -0,0 +1,97 @@
+import struct
+import tempfile
+from pathlib import Path
+
+from libansiscreen.parser.sauce import (
+    FLAG_ICE_COLORS,
+    load_ansi,
+    read_sauce,
+    split_sauce,
+)
+from libansiscreen.batch import convert_file, make_emitter
+
+
+def make_sauce(
+    *,
+    width=40,
+    height=30,
+    flags=FLAG_ICE_COLORS,
+    comments=(),
+    data_type=1,
+    file_type=1,
+) -> bytes:
+    record = struct.pack(
+        "<5s2s35s20s20s8sIBBHHHHBB22s",
+        b"SAUCE", b"00",
+        b"Test Art".ljust(35), b"artist".ljust(20), b"group".ljust(20),
+        b"20240101", 0, data_type, file_type,
+        width, height, 0, 0,
+        len(comments), flags, b"IBM VGA",
+    )
+    block = b""
+    if comments:
+        block = b"COMNT" + b"".join(c.ljust(64) for c in comments)
+    return b"\x1a" + block + record
+
+
+PAYLOAD = b"\x1b[1;33;44m\xdb\xdb\xb0 hi\x1b[0m\r\n"
+
+
+def test_read_sauce_fields():
+    data = PAYLOAD + make_sauce(comments=(b"first line", b"second"))
+    rec = read_sauce(data)
+    assert rec.title == "Test Art"
+    assert rec.author == "artist"
+    assert rec.width == 40
+    assert rec.height == 30
+    assert rec.ice_colors
+    assert rec.font == "IBM VGA"
+    assert rec.comments == ("first line", "second")
+    assert rec.emitter_options() == {"dos_mode": True, "ice_mode": True}
+
+
+def test_split_strips_record_comments_and_eof():
+    data = PAYLOAD + make_sauce(comments=(b"note",))
+    end, rec = split_sauce(data)
+    assert data[:end] == PAYLOAD
+    assert rec is not None
+
+
+def test_no_sauce():
+    end, rec = split_sauce(PAYLOAD)
+    assert rec is None
+    assert end == len(PAYLOAD)
+
+
+def test_load_preallocates_and_uses_cp437():
+    screen, rec = load_ansi(PAYLOAD + make_sauce(width=40, height=30, flags=0))
+    assert screen.width == 40
+    assert screen.height == 30
+    assert not rec.ice_colors
+    assert "".join(screen.get_cell(x, 0).char for x in range(3)) == "██░"
+    assert screen.get_cell(4, 0).char == "h"
+
+
+def test_load_from_path_and_auto_mode():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "art.ans"
+        src.write_bytes(PAYLOAD + make_sauce())
+        screen, rec = load_ansi(src)
+        assert screen.width == 40
+        assert rec.ice_colors
+
+        emitter = make_emitter("auto", rec)
+        assert emitter.dos_mode and emitter.ice_mode
+
+        result = convert_file(src, Path(tmp) / "out.ans", "auto")
+        assert result.ok, result.error
+        assert result.dest.read_bytes() == emitter.emit_bytes(screen)
+
+
+if __name__ == "__main__":
+    test_read_sauce_fields()
+    test_split_strips_record_comments_and_eof()
+    test_no_sauce()
+    test_load_preallocates_and_uses_cp437()
+    test_load_from_path_and_auto_mode()
+    print("sauce tests completed")
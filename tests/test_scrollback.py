@@ -0,0 +1,110 @@
+import pytest
+
+from libansiscreen.cell import Cell
+from libansiscreen.screen import Screen
+
+
+def text(screen: Screen, y: int) -> str:
+    return "".join(c.char or " " for c in screen.rows[y]).rstrip()
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_stream_stays_bounded(backend):
+    screen = Screen(20, backend=backend, max_height=10)
+    for i in range(1000):
+        screen.print(f"line {i}\r\n")
+        assert screen.height <= 10
+    assert screen.height == 10
+    assert screen.top_line == 991
+    assert (screen.cursor.x, screen.cursor.y) == (0, 9)
+    assert [text(screen, y) for y in range(9)] == [f"line {i}" for i in range(991, 1000)]
+    # Only the kept rows are owned by the screen
+    assert len(screen._owned) <= 10
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_coordinates_follow_dropped_rows(backend):
+    screen = Screen(10, backend=backend, max_height=4)
+    screen.print("a\r\nb\r\nc")
+    screen.cursor_save()
+    screen.print("\r\nd\r\ne\r\nf")
+    # Two rows dropped: "c" moved from row 2 to row 0, with the saved cursor
+    assert screen.top_line == 2
+    assert screen.get_cell(0, 0).char == "c"
+    assert screen.get_cell(0, 3).char == "f"
+    screen.cursor_restore()
+    assert (screen.cursor.x, screen.cursor.y) == (1, 0)
+
+    # Wrapping text scrolls as well
+    screen.print("\x1b[4;1H" + "x" * 25)
+    assert screen.height == 4
+    assert screen.top_line == 4
+    assert text(screen, 1) == "x" * 10
+    assert (screen.cursor.x, screen.cursor.y) == (5, 3)
+
+
+def test_cursor_goto_past_the_limit():
+    screen = Screen(10, max_height=5)
+    screen.print("top\x1b[100;3Hz")
+    assert screen.height == 5
+    assert screen.top_line == 95
+    assert (screen.cursor.x, screen.cursor.y) == (3, 4)
+    assert screen.get_cell(2, 4).char == "z"
+
+
+def test_trimming_reports_full_damage():
+    screen = Screen(10, max_height=3)
+    screen.print("a\r\nb\r\nc")
+    screen.take_damage()
+    before = screen.row_hash(0)
+    screen.print("\r\nd")
+    damage = screen.take_damage()
+    assert damage.full
+    # Hashes are keyed by row index and must not survive the shift
+    other = Screen(10)
+    other.print("b")
+    assert screen.row_hash(0) == other.row_hash(0) != before
+
+
+@pytest.mark.parametrize("max_height", [None, 8])
+def test_scroll_up_and_down(max_height):
+    screen = Screen(10, max_height=max_height)
+    screen.print("\r\n".join("abcdef"))
+    screen.cursor_goto(4, 2)
+    screen.scroll_up(2)
+    assert [text(screen, y) for y in range(6)] == ["c", "d", "e", "f", "", ""]
+    assert screen.top_line == 2
+    screen.scroll_down(3)
+    assert [text(screen, y) for y in range(6)] == ["", "", "", "c", "d", "e"]
+    assert (screen.height, screen.cursor.x, screen.cursor.y) == (6, 4, 2)
+    # Rows shared after a scroll are still copied on write
+    screen.set_cell(0, 0, Cell("!"))
+    assert text(screen, 0) == "!" and text(screen, 1) == ""
+
+
+def test_snapshot_keeps_top_line():
+    screen = Screen(10, max_height=2)
+    screen.print("a\r\nb\r\nc")
+    snap = screen.snapshot()
+    screen.print("\r\nd\r\ne")
+    screen.restore(snap)
+    assert screen.top_line == 1
+    assert [text(screen, y) for y in range(2)] == ["b", "c"]
+
+
+def test_invalid_max_height():
+    with pytest.raises(ValueError):
+        Screen(10, max_height=0)
+
+
+if __name__ == "__main__":
+    for backend in ("list", "array"):
+        test_stream_stays_bounded(backend)
+        test_coordinates_follow_dropped_rows(backend)
+    test_cursor_goto_past_the_limit()
+    test_trimming_reports_full_damage()
+    test_scroll_up_and_down(None)
+    test_scroll_up_and_down(8)
+    test_snapshot_keeps_top_line()
+    test_invalid_max_height()
+    print("scrollback tests completed")
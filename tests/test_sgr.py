@@ -0,0 +1,102 @@
+from libansiscreen.screen import Screen
+from libansiscreen.color.rgb import Color
+from libansiscreen.cell import ATTR_BOLD, ATTR_FAINT, ATTR_BLINK, ATTR_UNDERLINE
+from libansiscreen.parser.ansi_parser import ANSIParser
+from libansiscreen.parser.sgr import (
+    DEFAULT_FG,
+    DEFAULT_BG,
+    ANSI16,
+    ANSI256,
+    SGREngine,
+    apply_sgr,
+    parse_params,
+)
+
+RESET = (DEFAULT_FG, DEFAULT_BG, 0)
+
+
+def test_basic_codes():
+    fg, bg, attrs = apply_sgr(RESET, (1, 33, 44))
+    assert fg == ANSI16.index_to_rgb(3)
+    assert bg == ANSI16.index_to_rgb(4)
+    assert attrs == ATTR_BOLD
+
+
+def test_bright_and_default_colors():
+    fg, bg, _ = apply_sgr(RESET, (95, 102))
+    assert fg == ANSI16.index_to_rgb(13)
+    assert bg == ANSI16.index_to_rgb(10)
+    assert apply_sgr((fg, bg, 0), (39, 49)) == RESET
+
+
+def test_attribute_on_off():
+    state = apply_sgr(RESET, (1, 2, 4, 5))
+    assert state[2] == ATTR_BOLD | ATTR_FAINT | ATTR_UNDERLINE | ATTR_BLINK
+    state = apply_sgr(state, (22, 25))
+    assert state[2] == ATTR_UNDERLINE
+
+
+def test_reset_inside_list():
+    state = apply_sgr(RESET, (1, 31, 0, 32))
+    assert state == (ANSI16.index_to_rgb(2), DEFAULT_BG, 0)
+
+
+def test_extended_colors():
+    fg, bg, _ = apply_sgr(RESET, (38, 5, 196, 48, 2, 1, 2, 3))
+    assert fg == ANSI256.index_to_rgb(196)
+    assert bg == Color(1, 2, 3)
+
+
+def test_malformed_extended_colors_are_ignored():
+    assert apply_sgr(RESET, (38, 5, 300)) == RESET
+    assert apply_sgr(RESET, (48, 2, 999, 0, 0)) == RESET
+    assert apply_sgr(RESET, (38, 2, 1)) == RESET
+
+
+def test_parse_params():
+    assert parse_params("1;;33") == (1, 0, 33)
+    assert parse_params(b"") == (0,)
+
+
+def test_engine_caches_transitions():
+    engine = SGREngine()
+    a = engine.apply(*RESET, (1, 33, 44))
+    b = engine.apply_raw(*RESET, "1;33;44")
+    assert a == b
+    engine.apply_raw(*RESET, "1;33;44")
+    assert engine.hits == 1
+    assert engine.misses == 2
+
+
+def test_engine_cache_is_bounded():
+    engine = SGREngine(cache_size=8)
+    fg, bg, attrs = RESET
+    for i in range(30, 50):
+        fg, bg, attrs = engine.apply(fg, bg, attrs, (i,))
+    assert len(engine) == 8
+
+
+def test_parser_uses_engine():
+    engine = SGREngine()
+    screen = Screen(20)
+    parser = ANSIParser(screen, sgr=engine)
+    parser.feed("\x1b[0m\x1b[1;33;44mA\x1b[0mB\x1b[1;33;44mC")
+    a, c = screen.get_cell(0, 0), screen.get_cell(2, 0)
+    assert (a.fg, a.bg, a.attrs) == (c.fg, c.bg, c.attrs)
+    assert a.attrs == ATTR_BOLD
+    assert screen.get_cell(1, 0).attrs == 0
+    assert engine.hits == 1
+
+
+if __name__ == "__main__":
+    test_basic_codes()
+    test_bright_and_default_colors()
+    test_attribute_on_off()
+    test_reset_inside_list()
+    test_extended_colors()
+    test_malformed_extended_colors_are_ignored()
+    test_parse_params()
+    test_engine_caches_transitions()
+    test_engine_cache_is_bounded()
+    test_parser_uses_engine()
+    print("sgr tests completed")
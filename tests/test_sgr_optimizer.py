@@ -0,0 +1,170 @@
+import random
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+from libansiscreen.cell import (
+    ATTR_BLINK,
+    ATTR_BOLD,
+    ATTR_FAINT,
+    ATTR_INVERSE,
+    ATTR_ITALIC,
+    ATTR_STRIKE,
+    ATTR_UNDERLINE,
+)
+from libansiscreen.color.palette import create_ansi_16_palette, create_ansi_256_palette
+from libansiscreen.color.quantize import quantize_exact
+from libansiscreen.color.rgb import Color
+from libansiscreen.renderer.ansi_emitter import ANSIEmitter, SGRCompat
+from libansiscreen.screen import Screen
+
+
+THETIS = Path(__file__).with_name("thetis.ans")
+PALETTE_16 = create_ansi_16_palette()
+
+MODES = {
+    "truecolor": {},
+    "ansi256": {"palette": create_ansi_256_palette()},
+    "ansi16": {"palette": PALETTE_16},
+    "dos": {"dos_mode": True},
+    "dos+ice": {"dos_mode": True, "ice_mode": True},
+    "dos, full compat": {"dos_mode": True, "compat": SGRCompat()},
+    "no off codes": {"compat": SGRCompat(off_codes=False)},
+}
+
+COLORS = [
+    Color(170, 0, 0), Color(255, 85, 85), Color(0, 0, 170), Color(85, 85, 255),
+    Color(170, 170, 170), Color(0, 0, 0), Color(255, 255, 255), Color(12, 34, 56),
+]
+ATTRS = [
+    0, 0, ATTR_BOLD, ATTR_FAINT, ATTR_INVERSE, ATTR_BLINK,
+    ATTR_UNDERLINE | ATTR_BOLD, ATTR_ITALIC | ATTR_STRIKE,
+]
+
+
+def corpus(path=THETIS):
+    screen = Screen(80)
+    screen.print(Path(path).read_bytes())
+    yield Path(path).name, screen
+    rng = random.Random(2024)
+    for n in range(4):
+        screen = Screen(30)
+        for y in range(12):
+            for x in range(30):
+                screen.put_cell(x, y, char=rng.choice("ab #"), fg=rng.choice(COLORS),
+                                bg=rng.choice(COLORS), attrs=rng.choice(ATTRS))
+        yield f"random-{n}", screen
+
+
+def shown(text: str, width: int, height: int, dos: bool):
+    """Parse emitted text back; in DOS mode keep what a DOS terminal shows."""
+    screen = Screen(width + 1)
+    screen.print(text)
+    cells = []
+    for y in range(height):
+        for x in range(width):
+            c = screen.get_cell(x, y)
+            if not dos:
+                cells.append((c.char or " ", c.fg, c.bg, c.attrs))
+                continue
+            fg = quantize_exact(c.fg, PALETTE_16) if c.fg else 7
+            bg = quantize_exact(c.bg, PALETTE_16) if c.bg else 0
+            bright = fg >= 8 or bool(c.attrs & ATTR_BOLD)
+            cells.append((c.char or " ", fg & 7, bright, bg & 7, bool(c.attrs & ATTR_BLINK),
+                          c.attrs & ~(ATTR_BOLD | ATTR_FAINT | ATTR_BLINK)))
+    return cells
+
+
+def savings(mode, path=THETIS):
+    """(name, legacy bytes, optimized bytes) per corpus file."""
+    legacy_mode = {k: v for k, v in mode.items() if k != "compat"}
+    dos = mode.get("dos_mode", False)
+    result = []
+    for name, screen in corpus(path):
+        legacy = ANSIEmitter(optimize_sgr=False, **legacy_mode).emit(screen)
+        optimized = ANSIEmitter(**mode).emit(screen)
+        size = (screen.width, screen.height, dos)
+        assert shown(optimized, *size) == shown(legacy, *size), name
+        result.append((name, len(legacy), len(optimized)))
+    return result
+
+
+@pytest.mark.parametrize("name", list(MODES))
+def test_corpus_savings(name, path=THETIS):
+    result = savings(MODES[name], path)
+    for file, legacy, optimized in result:
+        assert optimized <= legacy, file
+        print(f"{name:16} {file:12} {legacy:8} -> {optimized:8} "
+              f"({100 * (legacy - optimized) / legacy:.1f}% saved)")
+    assert sum(o for _, _, o in result) < sum(l for _, l, _ in result)
+
+
+def sgr_codes(text: str) -> set:
+    """SGR codes used in `text`, without the arguments of 38 / 48."""
+    codes = set()
+    for params in re.findall(r"\x1b\[([0-9;]*)m", text):
+        args = [int(p) for p in params.split(";") if p]
+        i = 0
+        while i < len(args):
+            codes.add(args[i])
+            i += {(38, 5): 3, (48, 5): 3, (38, 2): 5, (48, 2): 5}.get(tuple(args[i:i + 2]), 1)
+    return codes
+
+
+def emit_row(text: str, **mode) -> str:
+    screen = Screen(5)
+    screen.print(text)
+    return ANSIEmitter(**mode).emit(screen)
+
+
+def test_targeted_off_codes():
+    text = "\x1b[1;4;31mA\x1b[24mB\x1b[0;32mC"
+    assert emit_row(text, optimize_sgr=False) == "\x1b[0m\x1b[1;4;31mA\x1b[0;1;31;40mB\x1b[0;32;40mC  \x1b[0m\n"
+    assert emit_row(text) == "\x1b[0m\x1b[1;4;31mA\x1b[24mB\x1b[0;32mC  \x1b[0m\n"
+    assert emit_row("\x1b[1;31mA\x1b[22mB").startswith("\x1b[0m\x1b[1;31mA\x1b[22mB")
+
+
+def test_dos_compat_avoids_off_codes():
+    text = "\x1b[1;31mA\x1b[0;31mB\x1b[0;7mC\x1b[27mD"
+    dos = emit_row(text, dos_mode=True)
+    assert dos == "\x1b[0m\x1b[1;31mA\x1b[0;31mB\x1b[0;7mC\x1b[0mD \x1b[0m\n"
+    assert emit_row(text, dos_mode=True, compat=SGRCompat()) == \
+        "\x1b[0m\x1b[1;31mA\x1b[22mB\x1b[0;7mC\x1b[0mD \x1b[0m\n"
+    for _, screen in corpus():
+        codes = sgr_codes(ANSIEmitter(dos_mode=True).emit(screen))
+        assert not codes & {22, 25, 39, 49}
+
+
+def test_compat_constraints():
+    strict = SGRCompat(off_codes=False, default_colors=False)
+    used = set()
+    for _, screen in corpus():
+        codes = sgr_codes(ANSIEmitter(compat=strict).emit(screen))
+        assert not codes & {22, 23, 24, 25, 27, 28, 29, 39, 49}
+        used |= sgr_codes(ANSIEmitter().emit(screen))
+    # The same corpus does use them when they are allowed
+    assert {22, 24, 27} <= used
+
+
+def test_sgr_compat_defaults():
+    assert ANSIEmitter().sgr_compat() == SGRCompat()
+    assert ANSIEmitter(dos_mode=True).sgr_compat() == SGRCompat(off_codes=False, default_colors=False)
+    assert ANSIEmitter(optimize_sgr=False).sgr_compat() is None
+    emitter = ANSIEmitter(dos_mode=True)
+    screen = next(corpus())[1]
+    emitter.emit(screen)
+    emitter.compat = SGRCompat()
+    assert emitter.emit(screen) == ANSIEmitter(dos_mode=True, compat=SGRCompat()).emit(screen)
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else THETIS
+    for name in MODES:
+        test_corpus_savings(name, path)
+    test_targeted_off_codes()
+    test_dos_compat_avoids_off_codes()
+    test_compat_constraints()
+    test_sgr_compat_defaults()
+    print("sgr optimizer tests completed")
@@ -0,0 +1,142 @@
+import pytest
+
+from libansiscreen.cell import Cell
+from libansiscreen.color.rgb import Color
+from libansiscreen.screen import Screen
+from libansiscreen.screen_ops.clip import copy
+from libansiscreen.screen_ops.pixelplot import pixelplot
+from libansiscreen.renderer.ansi_emitter import ANSIEmitter
+
+
+DOC = "".join(f"\x1b[3{y % 8}mline {y:03d} " + "=" * 20 + "\r\n" for y in range(50))
+
+
+def cells(screen: Screen):
+    return [[(c.char, c.fg, c.bg, c.attrs) for c in row] for row in screen.rows]
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_snapshot_is_isolated_from_later_writes(backend):
+    screen = Screen(40, backend=backend)
+    screen.print(DOC)
+    before = cells(screen)
+    snap = screen.snapshot()
+
+    screen.print("\x1b[3;5H\x1b[1;31medit")
+    screen.window(10, 7, 5, 2).print("window")
+    pixelplot(screen, 1, 20, Color(255, 0, 0))
+    screen.clear_row(30)
+    assert cells(screen) != before
+    assert cells(snap.to_screen()) == before
+
+    screen.restore(snap)
+    assert cells(screen) == before
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_rows_stay_shared_until_written(backend):
+    screen = Screen(40, backend=backend)
+    screen.print(DOC)
+    snap = screen.snapshot()
+    screen.set_cell(0, 4, Cell("x"))
+    screen.set_cell(1, 4, Cell("y"))
+
+    changed = [y for y in range(screen.height) if screen.rows[y] is not snap.rows[y]]
+    assert changed == [4]
+
+    # A second snapshot shares the copied row too
+    snap2 = screen.snapshot()
+    screen.set_cell(2, 9, Cell("z"))
+    assert screen.rows[4] is snap2.rows[4]
+    assert snap2.rows[9] is snap.rows[9] is not screen.rows[9]
+
+
+def test_restore_reports_only_changed_rows():
+    screen = Screen(40)
+    screen.print(DOC)
+    snap = screen.snapshot()
+    screen.print("\x1b[5;1Hx\x1b[12;1Hy")
+    screen.take_damage()
+
+    screen.restore(snap)
+    damage = screen.take_damage()
+    assert list(damage.dirty_rows()) == [4, 11]
+    # The restored rows are the snapshot's, untouched rows never moved
+    assert all(a is b for a, b in zip(screen.rows, snap.rows))
+
+
+def test_restore_cursor_graphics_and_height():
+    screen = Screen(20)
+    screen.print("\x1b[1;32mab")
+    screen.cursor_save()
+    snap = screen.snapshot()
+    screen.print("\x1b[0m\r\n\r\nmore rows\x1b[5;5H")
+    screen.cursor_save()
+    assert screen.height > snap.height
+
+    screen.restore(snap)
+    assert screen.height == snap.height
+    assert (screen.cursor.x, screen.cursor.y) == (2, 0)
+    screen.cursor_goto(9, 9)
+    screen.cursor_restore()
+    assert (screen.cursor.x, screen.cursor.y) == (2, 0)
+    assert screen.current_attrs == 1
+    screen.print("c")
+    assert screen.get_cell(2, 0).fg == screen.get_cell(0, 0).fg
+
+
+def test_restore_rejects_other_geometry():
+    snap = Screen(10).snapshot()
+    with pytest.raises(ValueError):
+        Screen(12).restore(snap)
+    with pytest.raises(ValueError):
+        Screen(10, backend="array").restore(snap)
+
+
+def test_undo_history():
+    screen = Screen(40)
+    screen.print(DOC)
+    history = []
+    frames = []
+    for i in range(10):
+        history.append(screen.snapshot())
+        screen.print(f"\x1b[{i + 1};1H\x1b[7mstep {i}")
+        frames.append(cells(screen))
+    # Each step copied exactly one row
+    rows = {id(row) for snap in history for row in snap.rows}
+    assert len(rows) == screen.height + 9
+    for i in reversed(range(10)):
+        assert cells(screen) == frames[i]
+        screen.restore(history[i])
+
+
+def test_snapshot_as_previous_frame():
+    screen = Screen(30)
+    screen.print(DOC)
+    snap = screen.snapshot()
+    screen.print("\x1b[0;33m\x1b[2;3HXYZ")
+    update = ANSIEmitter().emit_update(snap.to_screen(), screen)
+    assert update == "\x1b[0m\x1b[2;3H\x1b[33mXYZ\x1b[0m"
+
+
+def test_clip_copy_whole_screen(capsys):
+    screen = Screen(10)
+    screen.print("\x1b[31mhello\r\nworld")
+    buf = copy(screen)
+    assert capsys.readouterr().out == ""
+    assert cells(buf) == cells(screen)
+
+
+if __name__ == "__main__":
+    for backend in ("list", "array"):
+        test_snapshot_is_isolated_from_later_writes(backend)
+        test_rows_stay_shared_until_written(backend)
+    test_restore_reports_only_changed_rows()
+    test_restore_cursor_graphics_and_height()
+    test_restore_rejects_other_geometry()
+    test_undo_history()
+    test_snapshot_as_previous_frame()
+    screen = Screen(10)
+    screen.print("hello")
+    assert cells(copy(screen)) == cells(screen)
+    print("snapshot tests completed")
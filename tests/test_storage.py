@@ -0,0 +1,205 @@
+import gc
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from libansiscreen.cell import BLANK_CELL, Cell, ATTR_BOLD
+from libansiscreen.color.rgb import Color
+from libansiscreen.screen import Screen
+from libansiscreen.storage import ArrayRow, CellView
+from libansiscreen.parser.sauce import load_ansi
+from libansiscreen.renderer.ansi_emitter import ANSIEmitter
+
+
+THETIS = Path(__file__).with_name("thetis.ans")
+
+
+def cells(screen: Screen):
+    return [
+        [(c.char, c.fg, c.bg, c.attrs) for c in row]
+        for row in screen.rows
+    ]
+
+
+SAMPLE = (
+    "\x1b[1;33;44mhello\x1b[0m world \x1b[38;2;1;2;3mrgb\r\n"
+    "wrapping text that runs past the edge\r\n"
+    "\x1b[2;3H\x1b[7mX\x1b[K\x1b[4;1H\x1b[J\x00nul é"
+)
+
+
+def test_backends_parse_identically():
+    a = Screen(20)
+    b = Screen(20, backend="array")
+    a.print(SAMPLE)
+    b.print(SAMPLE)
+    assert isinstance(b.rows[0], ArrayRow)
+    assert cells(a) == cells(b)
+
+
+def test_cell_api_on_array_backend():
+    screen = Screen(10, backend="array")
+    screen.put_cell(2, 1, char="Z", fg=None, bg=Color(1, 2, 3), attrs=ATTR_BOLD)
+    screen.set_cell(3, 1, Cell("é", Color(9, 9, 9), None, 0))
+    view = screen.get_cell(2, 1)
+    assert isinstance(view, CellView)
+    assert view == Cell("Z", None, Color(1, 2, 3), ATTR_BOLD)
+    assert screen.get_cell(3, 1).char == "é"
+    assert screen.get_cell(3, 1).bg is None
+    assert screen.get_cell(0, 0) == Cell()
+    assert screen.get_cell(10, 0) is None
+
+    copy = view.copy()
+    assert type(copy) is Cell and copy == view
+    with pytest.raises(AttributeError):
+        view.char = "Q"
+
+    screen.clear_row(1)
+    assert screen.get_cell(2, 1) == Cell()
+
+
+def test_window_onto_array_screen():
+    a = Screen(30)
+    b = Screen(30, backend="array")
+    for screen in (a, b):
+        screen.ensure_height(6)
+        screen.window(4, 1, 10, 3, transparent_char={" "}).print(SAMPLE)
+    assert cells(a) == cells(b)
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        Screen(10, backend="numpy")
+
+
+def test_array_backend_memory():
+    def build(backend):
+        tracemalloc.start()
+        screen = Screen(80, backend=backend)
+        for y in range(200):
+            for x in range(80):
+                screen.put_cell(
+                    x, y, char="#",
+                    fg=Color(x, y, 0), bg=Color(0, x, y), attrs=0,
+                )
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return screen, size
+
+    a, list_size = build("list")
+    b, array_size = build("array")
+    assert cells(a) == cells(b)
+    assert list_size >= 5 * array_size
+
+
+def test_array_backend_memory_distinct_colors():
+    # Every cell in its own colors: the array backend keeps only packed
+    # ints, the Colors written into it are not kept alive
+    def build(backend):
+        rng = random.Random(7)
+        gc.collect()
+        tracemalloc.start()
+        screen = Screen(80, backend=backend)
+        for y in range(200):
+            for x in range(80):
+                screen.put_cell(
+                    x, y, char="#", attrs=0,
+                    fg=Color.from_packed(rng.getrandbits(24)),
+                    bg=Color.from_packed(rng.getrandbits(24)),
+                )
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return screen, size
+
+    b, array_size = build("array")
+    a, list_size = build("list")
+    assert cells(a) == cells(b)
+    assert list_size >= 5 * array_size
+
+
+def test_thetis_emits_identically(path=THETIS):
+    a, _ = load_ansi(path)
+    b = Screen(a.width, backend="array")
+    b.ensure_height(a.height)
+    with open(path, "rb") as f:
+        b.print(f.read().split(b"\x1a")[0])
+    b.parser.flush()
+    assert ANSIEmitter().emit(a) == ANSIEmitter().emit(b)
+
+
+@pytest.mark.parametrize("backend", ["list", "array"])
+def test_rows_stay_lazy_until_written(backend):
+    screen = Screen(40, backend=backend)
+    blank = screen._blank_row
+
+    # Reads never grow the screen or materialize rows
+    assert screen.get_cell(0, 5000) == Cell()
+    assert screen.height == 0
+
+    screen.ensure_height(1000)
+    screen.cursor_goto(3, 2000)
+    assert screen.height == 2001
+    assert all(row is blank for row in screen.rows)
+
+    screen.put_run("hi")
+    assert screen.rows[2000] is not blank
+    assert sum(row is not blank for row in screen.rows) == 1
+    assert screen.get_cell(4, 2000).char == "i"
+
+    screen.clear_screen()
+    assert all(row is blank for row in screen.rows)
+    assert screen.height == 2001
+
+
+def test_shared_blank_cell_is_copy_on_write():
+    screen = Screen(10)
+    cell = screen.get_cell(1, 1)
+    assert cell is BLANK_CELL
+    with pytest.raises(AttributeError):
+        cell.char = "x"
+    mutable = cell.copy()
+    mutable.char = "x"
+    screen.set_cell(1, 1, mutable)
+    assert screen.get_cell(1, 1).char == "x"
+    assert screen.get_cell(2, 1) is BLANK_CELL
+    with pytest.raises(TypeError):
+        screen._blank_row[0] = mutable
+
+
+def test_array_writes_see_cell_changes():
+    screen = Screen(8, backend="array")
+    cell = Cell("a")
+    screen.set_cell(0, 0, cell)
+    cell.char = "b"
+    cell.fg = Color(170, 0, 0)
+    screen.set_cell(1, 0, cell)
+    assert screen.get_cell(0, 0) == Cell("a")
+    assert screen.get_cell(1, 0) == Cell("b", Color(170, 0, 0))
+
+    # A view follows its slot, also when written elsewhere later
+    view = screen.get_cell(0, 0)
+    screen.set_cell(0, 0, Cell("z", attrs=ATTR_BOLD))
+    screen.set_cell(3, 0, view)
+    assert screen.get_cell(3, 0) == Cell("z", attrs=ATTR_BOLD)
+    screen.set_cell(0, 0, Cell("é\u0301"))
+    screen.set_cell(4, 0, view)
+    assert screen.get_cell(4, 0).char == "é\u0301"
+
+
+if __name__ == "__main__":
+    test_backends_parse_identically()
+    test_cell_api_on_array_backend()
+    test_window_onto_array_screen()
+    test_unknown_backend_rejected()
+    test_array_backend_memory()
+    test_array_backend_memory_distinct_colors()
+    test_thetis_emits_identically(sys.argv[1] if len(sys.argv) > 1 else THETIS)
+    test_rows_stay_lazy_until_written("list")
+    test_rows_stay_lazy_until_written("array")
+    test_shared_blank_cell_is_copy_on_write()
+    test_array_writes_see_cell_changes()
+    print("storage tests completed")
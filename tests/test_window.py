@@ -0,0 +1,78 @@
+from libansiscreen.screen import Screen
+from libansiscreen.screen_ops.window import ScreenWindow
+
+
+def cells(rows):
+    return [[(c.char, c.fg, c.bg, c.attrs) for c in row] for row in rows]
+
+
+OVERLAY = (
+    "\x1b[1;33;44m+------------+\r\n"
+    "|\x1b[0m overlay \x1b[31mtext that wraps past the box\r\n"
+    "\x1b[3;2H\x1b[7mgoto\x1b[K\r\n"
+    "\x1b[s\x1b[1;1Hx\x1b[u\x1b[32mlast row\r\nclipped row\r\n"
+)
+
+
+def background(width=40, height=12) -> Screen:
+    screen = Screen(width)
+    for y in range(height):
+        screen.print(f"\x1b[0m{chr(ord('a') + y) * width}")
+    return screen
+
+
+def test_window_matches_scratch_parse():
+    scratch = Screen(16)
+    scratch.print(OVERLAY)
+
+    screen = background()
+    before = cells(screen.rows)
+    screen.window(5, 3, 16, 4).print(OVERLAY)
+    after = cells(screen.rows)
+
+    # Cells the overlay wrote land in the box; everything else is kept
+    written = cells(scratch.rows)
+    for y in range(len(after)):
+        for x in range(screen.width):
+            inside = 5 <= x < 21 and 3 <= y < 7
+            if inside and written[y - 3][x - 5][0] is not None:
+                assert after[y][x] == written[y - 3][x - 5], (x, y)
+            else:
+                assert after[y][x] == before[y][x], (x, y)
+
+
+def test_window_clips_at_target_edges():
+    screen = background()
+    height = screen.height
+    window = ScreenWindow(screen, 30, -1, 16, None)
+    window.print("row0\r\n0123456789ABCDEF")
+    assert screen.height == height
+    assert "".join(c.char for c in screen.rows[0][30:]) == "0123456789"
+    assert window.cursor.y == 2
+
+
+def test_erase_stays_inside_window():
+    screen = background()
+    screen.window(2, 2, 4, 3).print("\x1b[2J\x1b[1;1Hab\x1b[J")
+    assert "".join(c.char or "." for c in screen.rows[2][:8]) == "ccab  cc"
+    # ED 2 only clears rows the window has reached
+    assert screen.rows[3][2].char == "d"
+
+
+def test_transparency_rules():
+    screen = background()
+    screen.window(0, 0, transparent_char={" "}, transparent_bg=True).print(
+        "\x1b[31;44mX Y"
+    )
+    row = screen.rows[0]
+    assert [c.char for c in row[:4]] == ["X", "a", "Y", "a"]
+    assert row[0].fg != row[3].fg
+    assert row[0].bg == row[3].bg
+
+
+if __name__ == "__main__":
+    test_window_matches_scratch_parse()
+    test_window_clips_at_target_edges()
+    test_erase_stays_inside_window()
+    test_transparency_rules()
+    print("window tests completed")